@@ -1,39 +1,39 @@
+"""
+Report (and optionally crop) whitespace borders of every image in a folder.
 
-from PIL import Image
+Usage:
+    python check_assets.py Portraits/Chapter-Introduction [--crop]
+
+Thin wrapper around slides_to_textbook.modules.asset_checker; the same check
+is available as `slides2tex whitespace`.
+"""
+
+import argparse
 from pathlib import Path
-import numpy as np
-
-def check_whitespace(folder):
-    p = Path(folder)
-    for img_path in p.glob("*.jpg"):
-        try:
-            img = Image.open(img_path)
-            img_np = np.array(img)
-            # Check for white rows/cols
-            # White is [255, 255, 255]
-            # We'll allow a small tolerance
-            is_white = np.all(img_np > 250, axis=2)
-            
-            rows_white = np.all(is_white, axis=1)
-            cols_white = np.all(is_white, axis=0)
-            
-            top_border = np.argmax(~rows_white)
-            bottom_border = len(rows_white) - np.argmax(~rows_white[::-1])
-            left_border = np.argmax(~cols_white)
-            right_border = len(cols_white) - np.argmax(~cols_white[::-1])
-            
-            height = img.height
-            width = img.width
-            
-            # Calculate whitespace percentage
-            whitespace_h = (top_border + (height - bottom_border)) / height
-            whitespace_w = (left_border + (width - right_border)) / width
-            
-            print(f"Image: {img_path.name}")
-            print(f"  Dimensions: {width}x{height}")
-            print(f"  Whitespace Top: {top_border}px, Bottom: {height - bottom_border}px ({whitespace_h:.1%} vertical)")
-            print(f"  Whitespace Left: {left_border}px, Right: {width - right_border}px ({whitespace_w:.1%} horizontal)")
-        except Exception as e:
-            print(f"Error checking {img_path.name}: {e}")
-
-check_whitespace("/Users/davidlary/Dropbox/Apps/Overleaf/MachineLearningBook/Portraits/Chapter-Introduction")
+
+from slides_to_textbook.modules.asset_checker import AssetChecker
+
+
+def check_whitespace(folder, crop=False):
+    report = AssetChecker(Path(folder)).run(crop=crop)
+    for result in report["images"]:
+        if "error" in result:
+            print(f"Error checking {result['path']}: {result['error']}")
+            continue
+        print(f"Image: {result['path']}")
+        print(f"  Dimensions: {result['width']}x{result['height']}")
+        if result["blank"]:
+            print("  Blank image")
+            continue
+        b = result["borders"]
+        print(f"  Whitespace Top: {b['top']}px, Bottom: {b['bottom']}px ({result['whitespace_vertical']:.1%} vertical)")
+        print(f"  Whitespace Left: {b['left']}px, Right: {b['right']}px ({result['whitespace_horizontal']:.1%} horizontal)")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", type=Path)
+    parser.add_argument("--crop", action="store_true", help="Crop images with too much whitespace")
+    args = parser.parse_args()
+    check_whitespace(args.folder, crop=args.crop)
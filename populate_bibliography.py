@@ -90,11 +90,27 @@ BIB_CONTENT = """
 """
 
 def main():
-    path = "/Users/davidlary/Dropbox/Apps/Overleaf/MachineLearningBook/bibliography.bib"
-    print(f"Populating bibliography at {path}")
-    with open(path, "w") as f:
-        f.write(BIB_CONTENT)
-    print("Done.")
+    """
+    Seed a book's bibliography database with the standard references.
+
+    Entries are merged into <book_dir>/bibliography.json; the next build
+    writes the ones the chapters actually cite to bibliography.bib.
+    """
+    import argparse
+    from pathlib import Path
+
+    from slides_to_textbook.modules.latex_components import BibliographyManager, parse_bibtex
+
+    parser = argparse.ArgumentParser(description="Seed a book's bibliography database")
+    parser.add_argument("book_dir", type=Path, help="Book output directory")
+    args = parser.parse_args()
+
+    bib = BibliographyManager(args.book_dir / "bibliography.json")
+    before = len(bib)
+    bib.add_entries(parse_bibtex(BIB_CONTENT))
+    path = bib.save()
+    print(f"Seeded {len(bib) - before} new entries ({len(bib)} total) into {path}")
+
 
 if __name__ == "__main__":
     main()
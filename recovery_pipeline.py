@@ -3,7 +3,8 @@ import os
 from pathlib import Path
 from slides_to_textbook.modules.topic_researcher import TopicResearcher
 from slides_to_textbook.modules.pdf_analyzer import PDFAnalyzer
-from slides_to_textbook.modules.image_generators import PortraitGenerator, FigureRecreator
+from slides_to_textbook.modules.figure_service import FigureService
+from slides_to_textbook.modules.portrait_service import PortraitService
 
 # Setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -13,9 +14,6 @@ OUTPUT_DIR = Path("/Users/davidlary/Dropbox/Apps/Overleaf/MachineLearningBook/Fi
 PORTRAIT_DIR = OUTPUT_DIR / "Portraits"
 LECTURE_PATH = Path("/Users/davidlary/Dropbox/Lectures/2026/5336/Lecture-1.pdf")
 
-def safe_filename(name):
-    return f"{name.replace(' ', '')}.jpg"
-
 def main():
     logger.info("Starting Recovery Pipeline...")
     
@@ -36,39 +34,27 @@ def main():
         
     people.sort() # sort for clean logs
     
-    # 2. Finish Portraits
-    pg = PortraitGenerator(PORTRAIT_DIR)
-    
+    # 2. Finish Portraits (existing ones are skipped; shared image client retries and dedups)
     logger.info(f"Checking {len(people)} people...")
-    for person in people:
-        fname = safe_filename(person)
-        if (PORTRAIT_DIR / fname).exists():
-            logger.info(f"[SKIP] {person} exists.")
-            continue
-            
-        logger.info(f"[GENERATE] {person}")
-        try:
-            pg.generate_portrait(person)
-        except Exception as e:
-            logger.error(f"Failed to generate {person}: {e}")
+    portraits = PortraitService(PORTRAIT_DIR).generate(people)
+    for person, result in portraits.items():
+        if result["error"]:
+            logger.error(f"Failed to generate {person}: {result['error']}")
+        else:
+            logger.info(f"[{result['status'].upper()}] {person}")
 
     # 3. Finish Figures
-    fg = FigureRecreator(OUTPUT_DIR)
     logger.info(f"Checking {len(concepts)} concepts...")
-    
-    for concept in concepts:
-        fname = f"Fig-{concept.replace(' ', '')}.png"
-        if (OUTPUT_DIR / fname).exists():
-             logger.info(f"[SKIP] {concept} exists.")
-             continue
-             
-        logger.info(f"[GENERATE] {concept}")
-        desc = f"A complex, labeled scientific visualization illustrating the concept of '{concept}'. Include typical metrics, decision boundaries, or structural diagrams as appropriate for a university textbook."
-        try:
-            fg.recreate_figure(desc, fname)
-        except Exception as e:
-             logger.error(f"Failed to generate {concept}: {e}")
-             
+    figures = {
+        f"Fig-{concept.replace(' ', '')}.png": f"A complex, labeled scientific visualization illustrating the concept of '{concept}'. Include typical metrics, decision boundaries, or structural diagrams as appropriate for a university textbook."
+        for concept in concepts
+    }
+    for fname, result in FigureService(OUTPUT_DIR).generate(figures).items():
+        if result["error"]:
+            logger.error(f"Failed to generate {fname}: {result['error']}")
+        else:
+            logger.info(f"[{result['status'].upper()}] {fname}")
+
     logger.info("Recovery Complete.")
 
 if __name__ == "__main__":
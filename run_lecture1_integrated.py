@@ -1,14 +1,13 @@
 """
 Complete Integrated Pipeline for Lecture 1
 
-This version includes full integration with standalone PortraitGenerator CLI.
+This version generates portraits in-process with PortraitService.
 """
 
 import os
 import logging
 import json
 import sys
-import subprocess
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -20,6 +19,8 @@ from slides_to_textbook.modules.pdf_analyzer import PDFAnalyzer
 from slides_to_textbook.modules.topic_researcher import TopicResearcher
 from slides_to_textbook.modules.content_author import ContentAuthor
 from slides_to_textbook.modules.portrait_preprocessor import PortraitPreprocessor
+from slides_to_textbook.modules.portrait_service import PortraitService
+from slides_to_textbook.modules.portrait_store import PortraitStore
 from slides_to_textbook.modules.latex_builder import LaTeXBuilder
 from slides_to_textbook.modules.latex_components import MarginNoteGenerator, BibliographyManager
 from slides_to_textbook.modules.progress_tracker import ProgressTracker
@@ -32,7 +33,11 @@ OUTPUT_DIR = Path("/Users/davidlary/Dropbox/Apps/Overleaf/MachineLearningBook")
 
 def generate_portraits_for_people(people_list, output_dir, logger):
     """
-    Generate portraits using standalone CLI with smart existence checking.
+    Generate portraits in-process with a bounded pool of concurrent requests.
+
+    Existing portraits are skipped and portraits already in the shared
+    PortraitStore are hardlinked; each new portrait is written as soon as it
+    completes, so one slow person does not hold back the rest.
 
     Args:
         people_list: List of people names
@@ -42,71 +47,18 @@ def generate_portraits_for_people(people_list, output_dir, logger):
     Returns:
         Dict mapping person name to portrait path
     """
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Check which portraits already exist
-    existing_portraits = {}
-    missing_people = []
-
-    for person in people_list:
-        # Expected filename format: PersonName_Painting.png
-        filename = f"{person.replace(' ', '')}_Painting.png"
-        portrait_path = output_dir / filename
-
-        if portrait_path.exists():
-            logger.info(f"Portrait already exists: {filename}")
-            existing_portraits[person] = portrait_path
-        else:
-            missing_people.append(person)
-
-    # Generate only missing portraits
-    if missing_people:
-        logger.info(f"Generating {len(missing_people)} missing portraits...")
+    def report(person, result):
+        logger.info(f"[{result['status']}] {person}" + (f": {result['error']}" if result['error'] else ""))
 
-        # Use CLI batch generation
-        cmd = ["portrait-generator", "batch"] + missing_people
-        cmd += ["--output-dir", str(output_dir)]
-        cmd += ["--styles", "Painting"]
+    service = PortraitService(output_dir, max_workers=4, timeout=180, store=PortraitStore())
+    results = service.generate(people_list, on_progress=report)
 
-        logger.info(f"Running: {' '.join(cmd)}")
-
-        try:
-            # Calculate timeout: ~2-3 min per portrait
-            timeout_seconds = max(600, len(missing_people) * 180)  # 3 minutes per portrait, min 10 min
-            logger.info(f"Timeout set to {timeout_seconds}s for {len(missing_people)} portraits")
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout_seconds,
-                check=True
-            )
-
-            logger.info("Portrait generation completed successfully")
-            logger.debug(f"CLI output: {result.stdout}")
-
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Portrait generation failed: {e}")
-            logger.error(f"CLI stderr: {e.stderr}")
-            # Don't raise - continue with partial portraits
-            logger.warning("Continuing with partially generated portraits")
-
-        except subprocess.TimeoutExpired as e:
-            logger.error(f"Portrait generation timed out after {timeout_seconds}s")
-            logger.warning("Continuing with partially generated portraits")
-            # Don't raise - some portraits may have been generated
-
-    # Build complete portrait map
     portrait_map = {}
-    for person in people_list:
-        filename = f"{person.replace(' ', '')}_Painting.png"
-        portrait_path = output_dir / filename
-
-        if portrait_path.exists():
-            portrait_map[person] = portrait_path
+    for person, result in results.items():
+        if result["path"] is not None:
+            portrait_map[person] = result["path"]
         else:
-            logger.warning(f"Portrait still missing after generation: {filename}")
+            logger.warning(f"Portrait still missing after generation: {person} ({result['status']})")
 
     return portrait_map
 
@@ -196,7 +148,7 @@ def main():
     # NOTE: Figure generation removed (not working)
     # Only portraits remain
 
-    # 5. Generate Portraits Using Integrated CLI
+    # 5. Generate Portraits In-Process
     # -------------------------------------------
     portrait_dir = OUTPUT_DIR / "Portraits" / "Chapter-Introduction"
     logger.info(f"Portrait directory: {portrait_dir}")
@@ -33,6 +33,7 @@ setup(
         "pylatex>=1.4.0",
         # Utilities
         "pillow>=10.0.0",
+        "numpy>=1.24.0",
         "requests>=2.31.0",
         "click>=8.1.0",
         "python-dotenv>=1.0.0",
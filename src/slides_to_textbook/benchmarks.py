@@ -0,0 +1,355 @@
+"""
+Micro-benchmarks for performance-sensitive pipeline stages.
+
+Each benchmark builds synthetic input, times the operation and returns a
+dict of measurements so results can be logged or compared between runs.
+"""
+
+import logging
+import random
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_WORDS = (
+    "the model learns a mapping from inputs to outputs by minimising a loss "
+    "over training data while regularisation controls variance and bias"
+).split()
+
+
+def _synthetic_paragraph(rng: random.Random, n_words: int = 80) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n_words)) + "."
+
+
+def _reference_inject_missing_assets(content: str, assets_map: Dict[str, Any]) -> str:
+    """The original per-asset ContentAuthor._inject_missing_assets, kept as a baseline."""
+    if not assets_map:
+        return content
+    portrait_pattern = r'\\automarginnote\{\\includegraphics\[width=\\linewidth\]\{Portraits/[^}]+\}\}'
+    content = re.sub(portrait_pattern, '', content)
+
+    for concept, filename in assets_map.get("figures", {}).items():
+        if concept.lower() in content.lower() and f"Figures/{filename}" not in content:
+            figure_code = f"\n\\begin{{figure}}[h]\n\\centering\n\\includegraphics[width=0.9\\linewidth]{{Figures/{filename}}}\n\\caption{{{concept}}}\n\\label{{fig:{concept.replace(' ', '')}}}\n\\end{{figure}}\n"
+            paragraphs = content.split("\n\n")
+            new_paragraphs = []
+            inserted = False
+            for p in paragraphs:
+                new_paragraphs.append(p)
+                if not inserted and concept.lower() in p.lower():
+                    new_paragraphs.append(figure_code)
+                    inserted = True
+            if not inserted:
+                content += figure_code
+            else:
+                content = "\n\n".join(new_paragraphs)
+
+    for person, filename in assets_map.get("portraits", {}).items():
+        if person.lower() in content.lower() and filename not in content:
+            note_code = f"\\automarginnote{{\\includegraphics[width=\\linewidth]{{{filename}}}}}"
+            pattern = re.compile(re.escape(person), re.IGNORECASE)
+            content = pattern.sub(lambda m: f"{m.group(0)}{note_code}", content, count=1)
+    return content
+
+
+def bench_asset_injection(size_kb: int = 500, n_assets: int = 200, seed: int = 0) -> Dict[str, Any]:
+    """
+    Time ContentAuthor._inject_missing_assets on a synthetic chapter against
+    the original per-asset implementation.
+
+    Half of the assets are figures keyed by concept, half are portraits keyed
+    by person; every name is mentioned once somewhere in the chapter.
+    """
+    from slides_to_textbook.modules.content_author import ContentAuthor
+
+    rng = random.Random(seed)
+    n_figures = n_assets // 2
+    concepts = [f"Concept{i} Analysis" for i in range(n_figures)]
+    people = [f"Person{i} Surname{i}" for i in range(n_assets - n_figures)]
+    assets_map = {
+        "figures": {c: f"Fig-{c.replace(' ', '')}.png" for c in concepts},
+        "portraits": {p: f"Portraits/Chapter-Bench/{p.replace(' ', '')}_Painting.png" for p in people},
+    }
+
+    paragraphs = []
+    size = 0
+    while size < size_kb * 1024:
+        paragraph = _synthetic_paragraph(rng)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    names = concepts + people
+    for name in names:
+        idx = rng.randrange(len(paragraphs))
+        paragraphs[idx] = f"{paragraphs[idx]} As shown by {name}, this matters."
+    content = "\n\n".join(paragraphs)
+
+    start = time.perf_counter()
+    reference = _reference_inject_missing_assets(content, assets_map)
+    reference_seconds = time.perf_counter() - start
+
+    author = ContentAuthor()
+    start = time.perf_counter()
+    result = author._inject_missing_assets(content, assets_map)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "benchmark": "asset_injection",
+        "input_bytes": len(content),
+        "assets": n_assets,
+        "seconds": elapsed,
+        "mb_per_s": len(content) / (1024 * 1024) / elapsed if elapsed else float("inf"),
+        "output_bytes": len(result),
+        "reference_seconds": reference_seconds,
+        "reference_bytes": len(reference),
+        "speedup": reference_seconds / elapsed if elapsed else float("inf"),
+    }
+
+
+def _reference_extract_with_patterns(content: str) -> List[Dict[str, Any]]:
+    """The original two-sweep PortraitPreprocessor._extract_with_patterns, kept as a baseline."""
+    from slides_to_textbook.modules.portrait_preprocessor import PatternNameExtractor
+
+    people = []
+    seen_names = set()
+    false_positives = set(PatternNameExtractor.STOP_PHRASES)
+
+    date_pattern = r'([A-Z][a-z]+ [A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s*\((\d{4})[–\-]'
+    for match in re.finditer(date_pattern, content):
+        name = match.group(1)
+        if name not in seen_names and name not in false_positives and len(name.split()) >= 2:
+            people.append({"name": name, "context": f"Born {match.group(2)}"})
+            seen_names.add(name)
+
+    bio_pattern = r'([A-Z][a-z]+ [A-Z][a-z]+)(?:\'s|,| developed| discovered| invented| proposed| created| introduced)'
+    for match in re.finditer(bio_pattern, content):
+        name = match.group(1)
+        if name not in seen_names and name not in false_positives and len(name.split()) >= 2:
+            start_pos = match.end()
+            context = content[start_pos:start_pos + 50].split('.')[0]
+            people.append({"name": name, "context": context.strip()})
+            seen_names.add(name)
+    return people
+
+
+def _synthetic_chapter(rng: random.Random, size_kb: int, n_people: int) -> str:
+    cues = [" developed a method", "'s work on learning", ", who proposed rules", " introduced the idea"]
+    firsts = ["Alan", "Ada", "Grace", "John", "Marvin", "Claude", "Norbert", "Frank", "Donald", "Herbert",
+              "Judea", "Yoshua", "Geoffrey", "Richard", "Vladimir", "Leslie", "Arthur", "Tom", "Corinna", "Ronald"]
+    lasts = ["Turing", "Lovelace", "Hopper", "Mccarthy", "Minsky", "Shannon", "Wiener", "Rosenblatt", "Hebb",
+             "Simon", "Pearl", "Bengio", "Hinton", "Sutton", "Vapnik", "Valiant", "Samuel", "Mitchell", "Cortes", "Fisher"]
+    people = [f"{firsts[i % 20]} {lasts[i // 20 % 20]}" for i in range(n_people)]
+    paragraphs = []
+    size = 0
+    while size < size_kb * 1024:
+        paragraph = _synthetic_paragraph(rng)
+        if rng.random() < 0.3:
+            person = rng.choice(people)
+            if rng.random() < 0.5:
+                paragraph += f" {person} ({rng.randrange(1700, 1990)}-{rng.randrange(1750, 2020)}) studied Machine Learning."
+            else:
+                paragraph += f" {person}{rng.choice(cues)}. Deep Learning, Neural Networks and Computer Vision followed."
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def bench_person_patterns(size_kb: int = 2048, n_people: int = 300, seed: int = 0) -> Dict[str, Any]:
+    """
+    Throughput of pattern-based person extraction on a synthetic book-length
+    text, PatternNameExtractor against the original two-sweep implementation.
+    """
+    from slides_to_textbook.modules.portrait_preprocessor import PATTERN_EXTRACTOR
+
+    content = _synthetic_chapter(random.Random(seed), size_kb, n_people)
+    mb = len(content) / (1024 * 1024)
+
+    start = time.perf_counter()
+    reference = _reference_extract_with_patterns(content)
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    people = PATTERN_EXTRACTOR.extract(content)
+    seconds = time.perf_counter() - start
+
+    return {
+        "benchmark": "person_patterns",
+        "input_bytes": len(content),
+        "people": len(people),
+        "reference_people": len(reference),
+        "seconds": seconds,
+        "mb_per_s": mb / seconds if seconds else float("inf"),
+        "reference_seconds": reference_seconds,
+        "reference_mb_per_s": mb / reference_seconds if reference_seconds else float("inf"),
+        "speedup": reference_seconds / seconds if seconds else float("inf"),
+    }
+
+
+def _reference_generate_bibtex(entries: List[Dict[str, Any]]) -> str:
+    """The original BibliographyManager.generate_bibtex (string concatenation)."""
+    bib_content = ""
+    for e in entries:
+        etype = e.get('entry_type', 'misc')
+        bib_content += f"@{etype}{{{e['ID']},\n"
+        for field, value in e.items():
+            if field in ['ID', 'entry_type']:
+                continue
+            if field == 'author':
+                if isinstance(value, list):
+                    bib_content += f"  author = {{{' and '.join(value)}}},\n"
+                else:
+                    bib_content += f"  author = {{{str(value).replace('; ', ' and ')}}},\n"
+            else:
+                bib_content += f"  {field} = {{{value}}},\n"
+        bib_content += "}\n\n"
+    return bib_content
+
+
+def bench_bibtex_writer(n_entries: int = 10000, seed: int = 0) -> Dict[str, Any]:
+    """
+    Serialize a synthetic bibliography with BibliographyManager (cold and
+    with cached entries) against the original concatenating generator.
+    """
+    import io
+
+    from slides_to_textbook.modules.latex_components import BibliographyManager
+
+    rng = random.Random(seed)
+    surnames = ["Hinton", "LeCun", "Bengio", "Sutton", "Mitchell", "Bishop", "Vapnik", "Schmidhuber"]
+    bib = BibliographyManager()
+    for i in range(n_entries):
+        bib.add_entry({
+            "title": f"{_synthetic_paragraph(rng, 8)} {i}",
+            "author": [f"A. {rng.choice(surnames)}", f"B. {rng.choice(surnames)}"],
+            "year": str(rng.randint(1950, 2025)),
+            "journal": "Journal of Machine Learning Research",
+            "entry_type": "article",
+        })
+
+    start = time.perf_counter()
+    reference = _reference_generate_bibtex(bib.entries)
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bib.write_bibtex(io.StringIO())
+    cold_seconds = time.perf_counter() - start
+
+    buffer = io.StringIO()
+    start = time.perf_counter()
+    bib.write_bibtex(buffer)
+    cached_seconds = time.perf_counter() - start
+
+    return {
+        "benchmark": "bibtex_writer",
+        "entries": len(bib),
+        "output_bytes": len(buffer.getvalue()),
+        "reference_bytes": len(reference),
+        "reference_seconds": reference_seconds,
+        "cold_seconds": cold_seconds,
+        "cached_seconds": cached_seconds,
+        "speedup": reference_seconds / cached_seconds if cached_seconds else float("inf"),
+    }
+
+
+def bench_margin_schedule(n_lines: int = 3000, n_people: int = 60, seed: int = 0) -> Dict[str, Any]:
+    """Time MarginNoteScheduler.reschedule on a synthetic chapter with portrait notes."""
+    from slides_to_textbook.modules.margin_scheduler import MarginNoteScheduler
+
+    rng = random.Random(seed)
+    people = [f"Person{chr(65 + i % 26)}{i} Surname{chr(65 + i % 26)}{i}" for i in range(n_people)]
+    lines = [_synthetic_paragraph(rng, 12) for _ in range(n_lines)]
+    for person in people:
+        for _ in range(rng.randint(1, 6)):
+            idx = rng.randrange(n_lines)
+            lines[idx] += f" {person} showed this."
+        idx = rng.randrange(n_lines)
+        lines[idx] += (
+            f"\\automarginnote{{\\includegraphics[width=\\linewidth]"
+            f"{{Portraits/Bench/{person.replace(' ', '')}_Painting.png}}}}"
+        )
+    text = "\n".join(lines)
+
+    scheduler = MarginNoteScheduler()
+    start = time.perf_counter()
+    result = scheduler.reschedule(text)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "benchmark": "margin_schedule",
+        "lines": n_lines,
+        "notes": n_people,
+        "placed": result.count("\\automarginnote"),
+        "seconds": elapsed,
+    }
+
+
+def bench_preamble_format(n_chapters: int = 3, engine: str = "pdflatex", seed: int = 0) -> Dict[str, Any]:
+    """
+    Compile time of a small synthetic book cold and with the precompiled
+    preamble format. Skipped when the engine is not installed.
+    """
+    from slides_to_textbook.modules.book_compiler import FORMAT_NAME, BookCompiler
+    from slides_to_textbook.modules.latex_builder import LaTeXBuilder
+
+    if shutil.which(engine) is None:
+        return {"benchmark": "preamble_format", "skipped": f"{engine} not found"}
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        book_dir = Path(tmp)
+        builder = LaTeXBuilder(book_dir)
+        chapters = []
+        for i in range(n_chapters):
+            chapter = {
+                "title": f"Chapter {i}",
+                "safe_title": f"Chapter{i}",
+                "content": "\n\n".join(_synthetic_paragraph(rng) for _ in range(20)),
+                "file_name": f"Chapter-{i}.tex",
+            }
+            builder.build_chapter(chapter)
+            chapters.append(chapter)
+        builder.build_book("Benchmark Book", chapters)
+
+        cold = BookCompiler(book_dir, engine=engine, use_format=False).compile(force=True)
+        compiler = BookCompiler(book_dir, engine=engine)
+        start = time.perf_counter()
+        fmt = compiler.ensure_format()
+        format_build_seconds = time.perf_counter() - start
+        warm = compiler.compile(force=True)
+
+    return {
+        "benchmark": "preamble_format",
+        "chapters": n_chapters,
+        "format": fmt == FORMAT_NAME,
+        "cold_seconds": cold["seconds"],
+        "cold_passes": cold["passes"],
+        "format_build_seconds": format_build_seconds,
+        "format_seconds": warm["seconds"],
+        "format_passes": warm["passes"],
+        "success": cold["success"] and warm["success"],
+        "speedup": cold["seconds"] / warm["seconds"] if warm["seconds"] else float("inf"),
+    }
+
+
+BENCHMARKS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "asset_injection": bench_asset_injection,
+    "person_patterns": bench_person_patterns,
+    "preamble_format": bench_preamble_format,
+    "bibtex_writer": bench_bibtex_writer,
+    "margin_schedule": bench_margin_schedule,
+}
+
+
+def run_benchmarks(names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Run the named benchmarks (all by default) and return their results."""
+    results = {}
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark: {name}")
+        logger.info(f"Running benchmark: {name}")
+        results[name] = BENCHMARKS[name]()
+    return results
@@ -1,5 +1,513 @@
-def main():
-    print("SlidesToTextbook CLI")
+"""
+Command-line interface for SlidesToTextbook.
+
+Subcommands:
+    analyze     Extract a topic outline from lecture PDFs
+    research    Add historical context and citations to topic JSON files
+    portraits   Extract people from PDFs/LaTeX and generate their portraits
+    author      Write a chapter from a (researched) topic JSON file
+    build       Assemble main.tex from the chapter files in the output directory
+    validate    Run the QualityValidator over a book directory
+    compile     Incrementally compile the book (or preview chapters) to PDF
+    assets      Write print-size variants of the book's images
+    whitespace  Report and crop whitespace borders of images
+    citations   Check chapter citation keys against bibliography.bib
+    layout      Spread portrait margin notes across chapters
+    run         Build a whole book from a book config file
+    bench       Run performance micro-benchmarks
+    regenerate  Regenerate selected sections of an existing chapter in place
+
+Heavy modules (AI clients, pdfplumber, Jinja) are imported inside each
+subcommand so that `slides2tex --help` and light commands start quickly.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("slides2tex")
+
+
+def _load_json(path: Optional[Path]) -> Dict[str, Any]:
+    if path is None:
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, data: Any) -> Path:
+    from slides_to_textbook.utils.file_utils import atomic_write_text
+    return atomic_write_text(path, json.dumps(data, indent=2))
+
+
+def _cache(args: argparse.Namespace, namespace: str):
+    from slides_to_textbook.utils.cache import DiskCache
+    return DiskCache(args.cache_dir, namespace, enabled=not args.no_cache)
+
+
+def _map_concurrently(func: Callable, items: List[Any], workers: int) -> List[Any]:
+    """Apply func to items with a bounded thread pool, preserving order."""
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(func, items))
+
+
+def _load_assets(path: Optional[Path]):
+    assets = _load_json(path)
+    assets_map = {
+        "figures": assets.get("figures", {}),
+        "portraits": assets.get("portraits", {})
+    }
+    return assets_map, assets.get("citations", {})
+
+
+# ----------------------------------------------------------------------
+# Subcommands
+
+def _cmd_analyze(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.pdf_analyzer import PDFAnalyzer
+    from slides_to_textbook.utils.cache import make_key
+    from slides_to_textbook.utils.file_utils import hash_file
+
+    analyzer = PDFAnalyzer()
+    cache = _cache(args, "analyze")
+
+    def analyze(pdf: Path) -> Path:
+        key = make_key("analyze", hash_file(pdf))
+        topic = cache.get_json(key)
+        if topic is None:
+            topic = analyzer.analyze_pdf(str(pdf))["analysis"]
+            cache.set_json(key, topic)
+        else:
+            logger.info(f"Using cached analysis for {pdf.name}")
+        return _write_json(args.output_dir / f"{pdf.stem}.topic.json", topic)
+
+    for out in _map_concurrently(analyze, args.pdfs, args.workers):
+        print(f"✓ {out}")
+    return 0
+
+
+def _cmd_research(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.topic_researcher import TopicResearcher
+    from slides_to_textbook.utils.cache import make_key
+
+    researcher = TopicResearcher()
+    cache = _cache(args, "research")
+
+    def research(topic_path: Path) -> Path:
+        topic = _load_json(topic_path)
+        key = make_key("research", topic)
+        enriched = cache.get_json(key)
+        if enriched is None:
+            enriched = researcher.research_topic(topic)
+            cache.set_json(key, enriched)
+        else:
+            logger.info(f"Using cached research for {topic_path.name}")
+        return _write_json(args.output_dir / topic_path.name, enriched)
+
+    for out in _map_concurrently(research, args.topics, args.workers):
+        print(f"✓ {out}")
+    return 0
+
+
+def _cmd_portraits(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.portrait_preprocessor import PortraitPreprocessor
+
+    result = PortraitPreprocessor().process_and_generate(
+        input_path=args.inputs,
+        output_dir=args.output_dir,
+        use_ai=not args.no_ai,
+        dry_run=args.dry_run,
+        max_workers=args.workers
+    )
+    print(f"✓ {len(args.inputs)} sources: {len(result['people'])} people -> {result['json_path']}")
+    for person, portrait in result["portraits"].items():
+        mark = "✗" if portrait["error"] else "✓"
+        print(f"{mark} {person}: {portrait['status']} ({portrait['seconds']:.1f}s)")
+    return 0 if args.dry_run or result["generated"] else 1
+
+
+def _cmd_author(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.book_orchestrator import safe_chapter_name
+    from slides_to_textbook.modules.content_author import ContentAuthor
+    from slides_to_textbook.modules.latex_builder import LaTeXBuilder
+
+    topic = _load_json(args.topic_json)
+    if args.title:
+        topic["title"] = args.title
+    topic.setdefault("equations", [])
+    assets_map, citation_map = _load_assets(args.assets_json)
+
+    author = ContentAuthor(prompt_token_budget=args.prompt_budget)
+    content = author.generate_chapter_content(topic, assets_map=assets_map, citation_map=citation_map)
+
+    title = topic.get("title", "Untitled")
+    safe_title = safe_chapter_name(title)
+    chapter_data = {
+        "title": title,
+        "safe_title": safe_title,
+        "content": content,
+        "file_name": f"Chapter-{safe_title}.tex"
+    }
+    LaTeXBuilder(args.output_dir, cache_dir=args.cache_dir).build_chapter(chapter_data)
+    print(f"✓ {args.output_dir / chapter_data['file_name']}")
+    return 0
+
+
+def _cmd_build(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.latex_builder import LaTeXBuilder
+
+    chapter_files = args.chapters or sorted(p.name for p in args.output_dir.glob("Chapter-*.tex"))
+    if not chapter_files:
+        raise ValueError(f"No chapter files found in {args.output_dir}")
+
+    chapters = [{"file_name": name} for name in chapter_files]
+    LaTeXBuilder(args.output_dir, cache_dir=args.cache_dir).build_book(args.book_title, chapters)
+    print(f"✓ {args.output_dir / 'main.tex'} ({len(chapters)} chapters)")
+    return 0
+
+
+def _cmd_validate(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.quality_validator import QualityValidator
+
+    validator = QualityValidator(
+        args.output_dir,
+        compile_chapters=args.compile,
+        engine=args.engine,
+        max_workers=args.workers if args.workers_set else None
+    )
+    report = validator.validate()
+    for err in report["errors"]:
+        print(f"✗ {err}")
+    for warn in report["warnings"]:
+        print(f"! {warn}")
+    print(f"Validation {report['status']}")
+    return 0 if report["status"] == "passed" else 1
+
+
+def _cmd_assets(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.asset_pipeline import AssetPipeline
+
+    pipeline = AssetPipeline(args.output_dir, dpi=args.dpi, max_workers=args.workers, jpeg_quality=args.quality)
+    records = pipeline.run()
+    source_bytes = sum(r["source_bytes"] for r in records.values())
+    variant_bytes = sum(r["variant_bytes"] for r in records.values())
+    print(f"✓ {len(records)} images: {source_bytes / 1e6:.1f} MB -> {variant_bytes / 1e6:.1f} MB ({pipeline.manifest_path})")
+    return 0
+
+
+def _cmd_compile(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.book_compiler import BookCompiler
+
+    compiler = BookCompiler(args.output_dir, engine=args.engine, use_format=not args.no_format)
+    result = compiler.compile(only=args.only, force=args.force)
+    if result["skipped"]:
+        print(f"✓ {result['pdf'].name} is up to date")
+        return 0
+    for step in result["steps"]:
+        print(f"  {step['step']:<14} {step['seconds']:6.1f}s")
+    for err in result["errors"]:
+        location = f"{err['file'] or ''}:{err['line'] or '?'}"
+        print(f"✗ {location} {err['message']}")
+    mark = "✓" if result["success"] else "✗"
+    print(f"{mark} {result['pdf'].name} ({result['passes']} passes, {result['seconds']:.1f}s; changed: {', '.join(result['changed']) or 'nothing'})")
+    return 0 if result["success"] else 1
+
+
+def _cmd_whitespace(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.asset_checker import AssetChecker
+
+    checker = AssetChecker(args.output_dir, threshold=args.threshold, max_workers=args.workers)
+    report = checker.run(crop=args.crop, report_path=args.report)
+    for result in report["images"]:
+        if result["flagged"]:
+            action = "cropped" if result["cropped"] else "flagged"
+            print(f"! {result['path']}: {result['whitespace']:.1%} whitespace ({action})")
+    summary = report["summary"]
+    print(f"✓ {summary['scanned']} images scanned, {summary['flagged']} flagged, {summary['cropped']} cropped")
+    return 0
+
+
+def _cmd_citations(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.citation_checker import CitationChecker, suggestion_hint
+
+    report = CitationChecker(args.output_dir, cutoff=args.cutoff).check(fix=args.fix)
+    for item in report["unknown"]:
+        if args.fix and item["suggestion"]:
+            print(f"✓ {item['file']}:{item['line']}: {item['key']} -> {item['suggestion']}")
+        else:
+            print(f"✗ {item['file']}:{item['line']}: unknown key {item['key']}{suggestion_hint(item)}")
+    for key in report["unused"]:
+        print(f"! unused: {key}")
+    remaining = len(report["unknown"]) - report["fixed"]
+    print(f"{sum(report['cited'].values())} citations resolved, {remaining} unknown, {len(report['unused'])} unused")
+    return 1 if remaining else 0
+
+
+def _cmd_layout(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.margin_scheduler import MarginNoteScheduler
+    from slides_to_textbook.modules.people_registry import PeopleRegistry
+
+    chapters = args.chapters or sorted(args.output_dir.glob("Chapter-*.tex"))
+    if not chapters:
+        raise ValueError(f"No chapter files found in {args.output_dir}")
+    registry = PeopleRegistry(args.output_dir / "people.json")
+    scheduler = MarginNoteScheduler(min_spacing=args.min_spacing, registry=registry)
+    for chapter in chapters:
+        scheduler.reschedule_file(chapter)
+        print(f"✓ {chapter}")
+    return 0
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.book_orchestrator import BookOrchestrator, load_book_config
+
+    config = load_book_config(args.config)
+    if args.output_dir_set:
+        config["output_dir"] = str(args.output_dir)
+    if args.workers_set:
+        config["workers"] = {stage: args.workers for stage in config["workers"]}
+    if args.prompt_budget is not None:
+        config["prompt_token_budget"] = args.prompt_budget
+    if args.cache_dir_set:
+        config["cache_dir"] = str(args.cache_dir)
+
+    result = BookOrchestrator(config).run()
+    failed = 0
+    for chapter in result["chapters"]:
+        mark = "✓" if chapter["status"] == "completed" else "✗"
+        failed += chapter["status"] != "completed"
+        print(f"{mark} {chapter['title']}")
+    print(f"Finished in {result['seconds']:.1f}s")
+    return 1 if failed else 0
+
+
+def _cmd_bench(args: argparse.Namespace) -> int:
+    from slides_to_textbook.benchmarks import run_benchmarks
+
+    results = run_benchmarks(args.names or None)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+def _cmd_regenerate(args: argparse.Namespace) -> int:
+    from slides_to_textbook.modules.content_author import ContentAuthor
+
+    topic_data = _load_json(args.topic_json)
+    assets_map, citation_map = _load_assets(args.assets_json)
+
+    author = ContentAuthor(prompt_token_budget=args.prompt_budget)
+    regenerated = author.regenerate_sections(
+        args.chapter,
+        args.sections,
+        topic_data,
+        assets_map=assets_map,
+        citation_map=citation_map,
+        max_workers=args.workers
+    )
+    print(f"✓ Regenerated {len(regenerated)} section(s) in {args.chapter}")
+    for title in regenerated:
+        print(f"  - {title}")
+    return 0
+
+
+# ----------------------------------------------------------------------
+# Parser
+
+class _TrackSet(argparse.Action):
+    """Store the value and remember that the flag was given explicitly."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        setattr(namespace, self.dest, values)
+        setattr(namespace, f"{self.dest}_set", True)
+
+
+def _common_parser() -> argparse.ArgumentParser:
+    from slides_to_textbook.utils.cache import default_cache_dir
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "-o", "--output-dir",
+        type=Path,
+        default=Path("."),
+        action=_TrackSet,
+        help="Directory for generated files (default: current directory)"
+    )
+    common.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=4,
+        action=_TrackSet,
+        help="Maximum concurrent jobs (default: 4)"
+    )
+    common.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        action=_TrackSet,
+        help="Directory for cached AI results and compiled templates (default: %(default)s)"
+    )
+    common.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and do not write cached results"
+    )
+    common.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Enable debug logging"
+    )
+    common.set_defaults(output_dir_set=False, workers_set=False, cache_dir_set=False)
+    return common
+
+
+def _add_prompt_budget(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--prompt-budget",
+        type=int,
+        help="Token budget for context items in each section prompt (default: unlimited)"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = _common_parser()
+    parser = argparse.ArgumentParser(
+        prog="slides2tex",
+        description="Convert PDF lecture slides to LaTeX textbooks"
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    analyze = subparsers.add_parser("analyze", parents=[common], help="Extract topic outlines from lecture PDFs")
+    analyze.add_argument("pdfs", type=Path, nargs="+", help="Lecture PDF files")
+    analyze.set_defaults(func=_cmd_analyze)
+
+    research = subparsers.add_parser("research", parents=[common], help="Add historical context and citations to topics")
+    research.add_argument("topics", type=Path, nargs="+", help="Topic JSON files from 'analyze'")
+    research.set_defaults(func=_cmd_research)
+
+    portraits = subparsers.add_parser("portraits", parents=[common], help="Extract people and generate their portraits")
+    portraits.add_argument("inputs", type=Path, nargs="+", help="PDF or .tex files")
+    portraits.add_argument("--no-ai", action="store_true", help="Use pattern matching instead of AI")
+    portraits.add_argument("--dry-run", action="store_true", help="Only extract names, don't generate portraits")
+    portraits.set_defaults(func=_cmd_portraits)
+
+    author = subparsers.add_parser("author", parents=[common], help="Write a chapter from a topic JSON file")
+    author.add_argument("topic_json", type=Path, help="Researched topic JSON file")
+    author.add_argument("--title", help="Override the chapter title")
+    author.add_argument("--assets-json", type=Path, help="JSON with 'figures', 'portraits' and 'citations' maps")
+    _add_prompt_budget(author)
+    author.set_defaults(func=_cmd_author)
+
+    build = subparsers.add_parser("build", parents=[common], help="Assemble main.tex from chapter files")
+    build.add_argument("chapters", nargs="*", help="Chapter file names in order (default: Chapter-*.tex in output dir)")
+    build.add_argument("--book-title", default="Textbook", help="Book title")
+    build.set_defaults(func=_cmd_build)
+
+    validate = subparsers.add_parser("validate", parents=[common], help="Validate a generated book directory")
+    validate.add_argument("--compile", action="store_true",
+                          help="Also compile every chapter standalone, in parallel (default -j: CPU count)")
+    validate.add_argument("--engine", default="pdflatex", help="LaTeX engine for --compile (default: pdflatex)")
+    validate.set_defaults(func=_cmd_validate)
+
+    run = subparsers.add_parser("run", parents=[common], help="Build a whole book from a config file")
+    run.add_argument("config", type=Path, help="Book config JSON (see book_config.example.json)")
+    _add_prompt_budget(run)
+    run.set_defaults(func=_cmd_run)
+
+    assets = subparsers.add_parser("assets", parents=[common], help="Prepare print-size variants of book images")
+    assets.add_argument("--dpi", type=int, default=300, help="Print resolution (default: 300)")
+    assets.add_argument("--quality", type=int, default=85, help="JPEG quality for photographic images (default: 85)")
+    assets.set_defaults(func=_cmd_assets)
+
+    compile_ = subparsers.add_parser("compile", parents=[common], help="Incrementally compile the book to PDF")
+    compile_.add_argument("--only", nargs="+", metavar="CHAPTER",
+                          help="Preview only these chapters via \\includeonly (writes preview.pdf)")
+    compile_.add_argument("--force", action="store_true", help="Compile even if no input changed")
+    compile_.add_argument("--engine", default="pdflatex", help="LaTeX engine (default: pdflatex)")
+    compile_.add_argument("--no-format", action="store_true",
+                          help="Do not use the precompiled preamble format")
+    compile_.set_defaults(func=_cmd_compile)
+
+    whitespace = subparsers.add_parser("whitespace", parents=[common], help="Report and crop whitespace borders of images")
+    whitespace.add_argument("--threshold", type=float, default=0.05,
+                            help="Whitespace fraction above which an image is flagged (default: 0.05)")
+    whitespace.add_argument("--crop", action="store_true", help="Crop flagged images in place")
+    whitespace.add_argument("--report", type=Path, help="Report path (default: <output-dir>/whitespace_report.json)")
+    whitespace.set_defaults(func=_cmd_whitespace)
+
+    citations = subparsers.add_parser("citations", parents=[common], help="Check citation keys against bibliography.bib")
+    citations.add_argument("--fix", action="store_true", help="Rewrite near-miss keys to the matching bibliography key")
+    citations.add_argument("--cutoff", type=float, default=0.85,
+                           help="Minimum similarity for a near-miss match (default: 0.85)")
+    citations.set_defaults(func=_cmd_citations)
+
+    layout = subparsers.add_parser("layout", parents=[common], help="Spread portrait margin notes across chapters")
+    layout.add_argument("chapters", nargs="*", type=Path, help="Chapter files (default: all in the output directory)")
+    layout.add_argument("--min-spacing", type=int, default=40,
+                        help="Minimum lines between two margin notes (default: 40)")
+    layout.set_defaults(func=_cmd_layout)
+
+    bench = subparsers.add_parser("bench", parents=[common], help="Run performance micro-benchmarks")
+    bench.add_argument("names", nargs="*", help="Benchmarks to run (default: all)")
+    bench.set_defaults(func=_cmd_bench)
+
+    regen = subparsers.add_parser(
+        "regenerate",
+        parents=[common],
+        help="Regenerate selected sections of an existing chapter in place"
+    )
+    regen.add_argument("chapter", type=Path, help="Chapter .tex file to update")
+    regen.add_argument(
+        "-s", "--section",
+        dest="sections",
+        action="append",
+        required=True,
+        help="Section title to regenerate (repeat for several sections)"
+    )
+    regen.add_argument(
+        "--topic-json",
+        type=Path,
+        required=True,
+        help="Topic analysis JSON (title, description, concepts, people, research)"
+    )
+    regen.add_argument(
+        "--assets-json",
+        type=Path,
+        help="JSON with 'figures', 'portraits' and 'citations' maps"
+    )
+    _add_prompt_budget(regen)
+    regen.set_defaults(func=_cmd_regenerate)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not getattr(args, "func", None):
+        parser.print_help()
+        return 1
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    try:
+        return args.func(args)
+    except (ValueError, FileNotFoundError) as e:
+        logger.error(str(e))
+        return 1
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Asset Checker Module
+
+Whitespace detection and auto-crop for a whole asset directory. Borders are
+found with vectorized NumPy reductions on a downsampled preview of each
+image (JPEGs are decoded at reduced size directly), images are scanned in
+parallel, and the results are written to a JSON report.
+
+whitespace_borders() is the one whitespace rule of the package; AssetPipeline
+crops print variants with whitespace_bbox(), its full-resolution form.
+"""
+
+import io
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from slides_to_textbook.utils.file_utils import atomic_write_bytes, atomic_write_text
+
+REPORT_NAME = "whitespace_report.json"
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+# Derived print variants (written by AssetPipeline); never scanned or cropped
+PRINT_DIR = "Print"
+
+
+def whitespace_borders(pixels: np.ndarray, white_level: int = 250) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Whitespace border widths (top, bottom, left, right) of an image array.
+
+    A pixel is whitespace when every channel is above white_level. Returns
+    None if the whole image is whitespace.
+    """
+    content = pixels <= white_level
+    if content.ndim == 3:
+        content = content.any(axis=2)
+    rows = content.any(axis=1)
+    cols = content.any(axis=0)
+    if not rows.any():
+        return None
+    top = int(rows.argmax())
+    bottom = int(rows[::-1].argmax())
+    left = int(cols.argmax())
+    right = int(cols[::-1].argmax())
+    return top, bottom, left, right
+
+
+def on_white(image: Image.Image) -> Image.Image:
+    """RGB image with transparent pixels composited onto white, so they count as whitespace."""
+    if "A" in image.getbands() or "transparency" in image.info:
+        rgba = image.convert("RGBA")
+        image = Image.alpha_composite(Image.new("RGBA", rgba.size, "white"), rgba)
+    return image.convert("RGB")
+
+
+def whitespace_bbox(image: Image.Image, white_level: int = 250) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Bounding box (left, upper, right, lower) of the content of an image.
+
+    Measured at full resolution with the whitespace_borders() rule. Returns
+    None for an entirely blank image.
+    """
+    borders = whitespace_borders(np.asarray(on_white(image)), white_level)
+    if borders is None:
+        return None
+    top, bottom, left, right = borders
+    return left, top, image.width - right, image.height - bottom
+
+
+def load_preview(path: Path, preview_size: int = 256) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """
+    Downsampled RGB preview of an image and the image's full size.
+
+    Transparent pixels are composited onto white so they count as whitespace.
+    """
+    with Image.open(path) as image:
+        full_size = image.size
+        image.draft("RGB", (preview_size, preview_size))
+        preview = on_white(image)
+        preview.thumbnail((preview_size, preview_size), Image.Resampling.BOX)
+        return np.asarray(preview), full_size
+
+
+def scan_image(path: Path, preview_size: int = 256, white_level: int = 250) -> Dict[str, Any]:
+    """
+    Measure the whitespace borders of one image.
+
+    Borders are measured on the preview and scaled to full-size pixels. The
+    preview pixel next to the content may be partly content, so it is not
+    counted and crops keep a small margin.
+    """
+    pixels, (width, height) = load_preview(path, preview_size)
+    scale_y = height / pixels.shape[0]
+    scale_x = width / pixels.shape[1]
+
+    result: Dict[str, Any] = {"path": str(path), "width": width, "height": height}
+    borders = whitespace_borders(pixels, white_level)
+    if borders is None:
+        result.update(blank=True, borders=None, whitespace=1.0, crop=None)
+        return result
+
+    top, bottom, left, right = (max(b - 1, 0) for b in borders)
+    top, bottom = math.floor(top * scale_y), math.floor(bottom * scale_y)
+    left, right = math.floor(left * scale_x), math.floor(right * scale_x)
+    content_area = (width - left - right) * (height - top - bottom)
+    result.update(
+        blank=False,
+        borders={"top": top, "bottom": bottom, "left": left, "right": right},
+        whitespace_vertical=(top + bottom) / height,
+        whitespace_horizontal=(left + right) / width,
+        whitespace=1 - content_area / (width * height),
+        crop=[left, top, width - right, height - bottom],
+    )
+    return result
+
+
+def crop_image(path: Path, box: List[int]) -> None:
+    """Crop an image in place (atomically, keeping its format)."""
+    with Image.open(path) as image:
+        image_format = image.format
+        cropped = image.crop(tuple(box))
+        buffer = io.BytesIO()
+        if image_format == "JPEG":
+            cropped.save(buffer, image_format, quality=95, dpi=image.info.get("dpi", (300, 300)))
+        else:
+            cropped.save(buffer, image_format or "PNG")
+    atomic_write_bytes(path, buffer.getvalue())
+
+
+class AssetChecker:
+    """
+    Check (and optionally crop) every image under a directory.
+
+    Args:
+        root: Directory to scan recursively
+        threshold: Whitespace fraction of the image area above which an image
+            is flagged (and cropped when crop=True)
+        white_level: Grey level above which a pixel counts as whitespace
+        preview_size: Longest side of the preview the borders are measured on
+        max_workers: Images scanned concurrently
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        threshold: float = 0.05,
+        white_level: int = 250,
+        preview_size: int = 256,
+        max_workers: int = 8
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.threshold = threshold
+        self.white_level = white_level
+        self.preview_size = preview_size
+        self.max_workers = max_workers
+
+    def find_images(self) -> List[Path]:
+        """All source images under the root (print variants excluded)."""
+        return sorted(
+            p for p in self.root.rglob("*")
+            if p.suffix.lower() in IMAGE_SUFFIXES
+            and p.relative_to(self.root).parts[0] != PRINT_DIR
+        )
+
+    def _check(self, path: Path, crop: bool) -> Dict[str, Any]:
+        try:
+            result = scan_image(path, self.preview_size, self.white_level)
+        except Exception as e:
+            self.logger.warning(f"Could not scan {path}: {e}")
+            return {"path": path.relative_to(self.root).as_posix(), "error": str(e), "flagged": False, "cropped": False}
+
+        result["path"] = path.relative_to(self.root).as_posix()
+        result["flagged"] = not result["blank"] and result["whitespace"] > self.threshold
+        result["cropped"] = False
+        if crop and result["flagged"]:
+            crop_image(path, result["crop"])
+            result["cropped"] = True
+        return result
+
+    def run(self, crop: bool = False, report_path: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Scan every image, crop flagged ones if requested, and write the report.
+
+        Returns:
+            Report dict with per-image results and summary counts
+        """
+        images = self.find_images()
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="whitespace") as pool:
+            results = list(pool.map(lambda p: self._check(p, crop), images))
+
+        report = {
+            "root": str(self.root),
+            "generated": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "threshold": self.threshold,
+            "white_level": self.white_level,
+            "images": results,
+            "summary": {
+                "scanned": len(results),
+                "flagged": sum(r["flagged"] for r in results),
+                "cropped": sum(r["cropped"] for r in results),
+                "blank": sum(bool(r.get("blank")) for r in results),
+                "errors": sum("error" in r for r in results),
+            },
+        }
+        report_path = Path(report_path) if report_path else self.root / REPORT_NAME
+        atomic_write_text(report_path, json.dumps(report, indent=2))
+        self.logger.info(f"Whitespace check: {report['summary']} -> {report_path}")
+        return report
@@ -0,0 +1,224 @@
+"""
+Asset Pipeline Module
+
+Prepares generated images for print. Each image is auto-cropped to its
+content, downsampled to the width it is actually printed at, and
+photographic images are re-encoded as optimized JPEG. Derived variants are
+written under <asset_root>/Print/ and recorded in an image manifest, so
+LaTeX embeds small files instead of full-size PNGs.
+"""
+
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from slides_to_textbook.modules.asset_checker import IMAGE_SUFFIXES, PRINT_DIR, whitespace_bbox
+from slides_to_textbook.utils.file_utils import atomic_write_bytes, atomic_write_text, hash_file
+
+MANIFEST_NAME = "image_manifest.json"
+
+# Printed width in inches by top-level asset directory. Portraits sit in the
+# margin column and figures span 0.9\linewidth of the text block (letterpaper
+# geometry from main.tex.jinja2).
+PRINT_WIDTHS = {"Portraits": 1.8, "Figures": 4.8}
+DEFAULT_PRINT_WIDTH = 4.8
+
+# Serialises manifest read-modify-write across pipelines sharing a root
+_manifest_lock = threading.Lock()
+
+
+def is_photographic(image: Image.Image, min_colors: int = 4096) -> bool:
+    """
+    True for photos and paintings, False for line art, plots and diagrams.
+
+    Judged by the number of distinct colours in a small thumbnail; images
+    with transparency are always kept lossless.
+    """
+    if "A" in image.getbands() or "transparency" in image.info:
+        return False
+    thumb = image.convert("RGB")
+    thumb.thumbnail((128, 128))
+    colors = thumb.getcolors(maxcolors=thumb.width * thumb.height)
+    return colors is not None and len(colors) >= min_colors
+
+
+def process_image(
+    source: Path,
+    dest_stem: Path,
+    width_px: int,
+    dpi: int = 300,
+    jpeg_quality: int = 85,
+    crop_threshold: int = 250
+) -> Dict[str, Any]:
+    """
+    Write the print variant of one image.
+
+    Args:
+        source: Original image
+        dest_stem: Variant path without suffix (.jpg or .png is added)
+        width_px: Maximum width in pixels (print width x dpi)
+
+    Returns:
+        Record describing the variant (path, size, bytes, format, crop box)
+    """
+    with Image.open(source) as image:
+        image.load()
+        source_size = image.size
+
+        box = whitespace_bbox(image, crop_threshold)
+        crop = box if box and box != (0, 0, *image.size) else None
+        if crop:
+            image = image.crop(crop)
+
+        if image.width > width_px:
+            height = max(1, round(image.height * width_px / image.width))
+            image = image.resize((width_px, height), Image.Resampling.LANCZOS)
+
+        photographic = is_photographic(image)
+        buffer = io.BytesIO()
+        if photographic:
+            image.convert("RGB").save(
+                buffer, "JPEG", quality=jpeg_quality, optimize=True, progressive=True, dpi=(dpi, dpi)
+            )
+            suffix = ".jpg"
+        else:
+            image.save(buffer, "PNG", optimize=True, dpi=(dpi, dpi))
+            suffix = ".png"
+        variant_size = image.size
+
+    variant = atomic_write_bytes(dest_stem.parent / f"{dest_stem.name}{suffix}", buffer.getvalue())
+    return {
+        "variant": variant,
+        "source_size": list(source_size),
+        "variant_size": list(variant_size),
+        "variant_bytes": len(buffer.getvalue()),
+        "format": "jpeg" if photographic else "png",
+        "crop": list(crop) if crop else None,
+    }
+
+
+class AssetPipeline:
+    """
+    Batch print preparation for an asset tree (a book output directory).
+
+    Args:
+        asset_root: Directory holding Portraits/ and Figures/
+        dpi: Print resolution
+        max_workers: Images processed concurrently
+        jpeg_quality: Quality for photographic variants
+        crop_threshold: Level above which pixels count as whitespace (see
+            asset_checker.whitespace_borders)
+    """
+
+    def __init__(
+        self,
+        asset_root: Union[str, Path],
+        dpi: int = 300,
+        max_workers: int = 4,
+        jpeg_quality: int = 85,
+        crop_threshold: int = 250
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.asset_root = Path(asset_root)
+        self.dpi = dpi
+        self.max_workers = max_workers
+        self.jpeg_quality = jpeg_quality
+        self.crop_threshold = crop_threshold
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.asset_root / MANIFEST_NAME
+
+    def load_manifest(self) -> Dict[str, Any]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+        manifest.setdefault("images", {})
+        return manifest
+
+    def print_width_px(self, source: Path) -> int:
+        top = Path(source).relative_to(self.asset_root).parts[0]
+        return round(PRINT_WIDTHS.get(top, DEFAULT_PRINT_WIDTH) * self.dpi)
+
+    def variant_stem(self, source: Path) -> Path:
+        relative = Path(source).relative_to(self.asset_root)
+        return self.asset_root / PRINT_DIR / relative.with_suffix("")
+
+    def find_images(self) -> List[Path]:
+        """All source images under the root (print variants excluded)."""
+        return sorted(
+            p for p in self.asset_root.rglob("*")
+            if p.suffix.lower() in IMAGE_SUFFIXES
+            and p.relative_to(self.asset_root).parts[0] != PRINT_DIR
+        )
+
+    def run(self, paths: Optional[Iterable[Path]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Produce print variants for paths (default: every image under the root).
+
+        Images whose content and settings match the manifest are skipped.
+
+        Returns:
+            {relative source path: manifest record} for the requested images
+        """
+        sources = [Path(p) for p in paths] if paths is not None else self.find_images()
+        manifest = self.load_manifest()
+        records: Dict[str, Dict[str, Any]] = {}
+        jobs = []
+
+        for source in dict.fromkeys(sources):
+            relative = source.relative_to(self.asset_root).as_posix()
+            settings = {
+                "dpi": self.dpi,
+                "width_px": self.print_width_px(source),
+                "jpeg_quality": self.jpeg_quality,
+                "crop_threshold": self.crop_threshold,
+            }
+            digest = hash_file(source)
+            known = manifest["images"].get(relative)
+            if (known and known.get("sha256") == digest and known.get("settings") == settings
+                    and (self.asset_root / known["variant"]).exists()):
+                records[relative] = known
+            else:
+                jobs.append((source, relative, digest, settings))
+
+        def work(job) -> Tuple[str, Dict[str, Any]]:
+            source, relative, digest, settings = job
+            result = process_image(
+                source,
+                self.variant_stem(source),
+                settings["width_px"],
+                dpi=self.dpi,
+                jpeg_quality=self.jpeg_quality,
+                crop_threshold=self.crop_threshold
+            )
+            result["variant"] = result["variant"].relative_to(self.asset_root).as_posix()
+            return relative, {
+                "sha256": digest,
+                "source_bytes": source.stat().st_size,
+                "settings": settings,
+                **result,
+            }
+
+        if jobs:
+            self.logger.info(f"Preparing {len(jobs)} images for print ({self.max_workers} workers)")
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="assets") as pool:
+                for relative, record in pool.map(work, jobs):
+                    records[relative] = record
+
+            with _manifest_lock:
+                manifest = self.load_manifest()
+                manifest["images"].update({rel: records[rel] for _, rel, _, _ in jobs})
+                atomic_write_text(self.manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+
+            saved = sum(records[rel]["source_bytes"] - records[rel]["variant_bytes"] for _, rel, _, _ in jobs)
+            self.logger.info(f"Print variants written: {len(jobs)} images, {saved / 1024:.0f} KB saved")
+
+        return records
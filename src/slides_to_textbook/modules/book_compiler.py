@@ -0,0 +1,348 @@
+"""
+Book Compiler Module
+
+Incremental PDF builds of the book written by LaTeXBuilder. The compiler
+hashes the chapter files, main.tex and bibliography.bib after every run and
+only recompiles when something changed. It reruns LaTeX until
+cross-references settle (latexmk-style), runs bibtex only when the
+bibliography changed, and can preview single chapters via \\includeonly
+without touching main.tex. Every run reports per-step timings.
+
+The static part of the preamble (everything before \\endofdump in
+main.tex) is dumped once into a precompiled format with mylatexformat and
+loaded by later compiles instead of reparsing 30-odd packages. The format is
+rebuilt whenever that preamble text or the engine changes.
+
+For validation, compile_chapters() renders every chapter as a standalone
+document with the book's preamble and compiles them in parallel, each in
+its own temporary directory.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from slides_to_textbook.utils.file_utils import atomic_write_text, hash_file
+
+STATE_NAME = ".compile_state.json"
+PREVIEW_JOB = "preview"
+FORMAT_NAME = "preamble"
+ENDOFDUMP = "\\csname endofdump\\endcsname"
+BEGIN_DOCUMENT = "\\begin{document}"
+
+# Log messages asking for another LaTeX pass
+_RERUN = re.compile(r"Rerun to get|Label\(s\) may have changed")
+# "! Undefined control sequence." or "./Chapter-X.tex:42: Undefined control sequence."
+_ERROR = re.compile(r"^(?:! (?P<msg>.+)|(?P<file>[^:\s]+\.tex):(?P<line>\d+): (?P<fmsg>.+))$", re.MULTILINE)
+_LINE = re.compile(r"^l\.(\d+)", re.MULTILINE)
+
+
+def parse_log_errors(log_text: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Errors from a LaTeX log: [{"message", "file", "line"}] (file/line may be None).
+    """
+    errors = []
+    for match in _ERROR.finditer(log_text):
+        if match.group("file"):
+            errors.append({
+                "message": match.group("fmsg").strip(),
+                "file": match.group("file"),
+                "line": int(match.group("line")),
+            })
+        else:
+            line = _LINE.search(log_text, match.end(), match.end() + 2000)
+            errors.append({
+                "message": match.group("msg").strip(),
+                "file": None,
+                "line": int(line.group(1)) if line else None,
+            })
+        if len(errors) >= limit:
+            break
+    return errors
+
+
+def static_preamble(main_tex: str) -> Optional[str]:
+    """The part of main.tex that goes into the format, or None without an \\endofdump marker."""
+    index = main_tex.find(ENDOFDUMP)
+    return main_tex[:index] if index >= 0 else None
+
+
+def standalone_chapter(main_tex: str, chapter: str) -> str:
+    """A document with the book's preamble and only one chapter (name without .tex)."""
+    index = main_tex.find(BEGIN_DOCUMENT)
+    if index < 0:
+        raise ValueError("main.tex has no \\begin{document}")
+    return f"{main_tex[:index]}{BEGIN_DOCUMENT}\n\\input{{{chapter}}}\n\\end{{document}}\n"
+
+
+class BookCompiler:
+    """
+    Compile a book directory produced by LaTeXBuilder.
+
+    Args:
+        book_dir: Directory with main.tex, Chapter-*.tex and bibliography.bib
+        engine: LaTeX engine executable
+        max_passes: Upper bound on LaTeX passes per run
+        timeout: Seconds allowed for each engine/bibtex call
+        use_format: Compile against a precompiled preamble format when
+            main.tex marks its static preamble with \\endofdump
+    """
+
+    def __init__(
+        self,
+        book_dir: Union[str, Path],
+        engine: str = "pdflatex",
+        max_passes: int = 4,
+        timeout: float = 600,
+        use_format: bool = True
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.book_dir = Path(book_dir)
+        self.engine = engine
+        self.max_passes = max_passes
+        self.timeout = timeout
+        self.use_format = use_format
+
+    @property
+    def state_path(self) -> Path:
+        return self.book_dir / STATE_NAME
+
+    def load_state(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def source_hashes(self) -> Dict[str, str]:
+        """Content hashes of every input that affects the PDF."""
+        files = [self.book_dir / "main.tex", self.book_dir / "bibliography.bib"]
+        files += sorted(self.book_dir.glob("Chapter-*.tex"))
+        return {f.name: hash_file(f) for f in files if f.exists()}
+
+    def changed_files(self, job: str = "main") -> List[str]:
+        """Inputs added, removed or modified since the last successful run of job."""
+        previous = self.load_state().get(job, {}).get("hashes", {})
+        current = self.source_hashes()
+        return sorted(name for name in set(previous) | set(current) if previous.get(name) != current.get(name))
+
+    def ensure_format(self, result: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Build the preamble format if it is missing or stale.
+
+        Returns the format name to pass as -fmt, or None to compile without
+        one (disabled, no \\endofdump marker, or the dump failed). A failed
+        dump is remembered and only retried once the preamble changes.
+        """
+        if not self.use_format:
+            return None
+        preamble = static_preamble((self.book_dir / "main.tex").read_text(encoding="utf-8"))
+        if preamble is None:
+            return None
+
+        digest = hashlib.sha256(f"{self.engine}\n{preamble}".encode("utf-8")).hexdigest()
+        fmt_path = self.book_dir / f"{FORMAT_NAME}.fmt"
+        state = self.load_state()
+        known = state.get("format", {})
+        if known.get("hash") == digest and (fmt_path.exists() or not known.get("ok")):
+            return FORMAT_NAME if known.get("ok") else None
+
+        steps = {"success": True, "steps": []}
+        cmd = [
+            self.engine, "-ini", "-interaction=nonstopmode", f"-jobname={FORMAT_NAME}",
+            f"&{self.engine}", "mylatexformat.ltx", "main.tex",
+        ]
+        self._run("format", cmd, steps)
+        ok = steps["success"] and fmt_path.exists()
+        if result is not None:
+            result["steps"] += steps["steps"]
+        if not ok:
+            self.logger.warning(f"Could not dump the preamble format (see {FORMAT_NAME}.log); compiling without it")
+
+        state = self.load_state()
+        state["format"] = {"hash": digest, "ok": ok}
+        atomic_write_text(self.state_path, json.dumps(state, indent=2, sort_keys=True))
+        return FORMAT_NAME if ok else None
+
+    def compile(self, only: Optional[Sequence[str]] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Compile the book, or preview only some chapters.
+
+        Args:
+            only: Chapter names (e.g. "Chapter-Introduction") to include via
+                \\includeonly; the preview is written to preview.pdf
+            force: Compile even if nothing changed
+
+        Returns:
+            {"success", "skipped", "pdf", "changed", "passes", "steps": [{"step", "seconds"}],
+             "seconds", "errors"}
+        """
+        if not (self.book_dir / "main.tex").exists():
+            raise FileNotFoundError(f"main.tex not found in {self.book_dir}")
+        chapters = [Path(name).stem for name in only] if only else []
+        job = PREVIEW_JOB if chapters else "main"
+        state = self.load_state()
+        job_state = state.get(job, {})
+        hashes = self.source_hashes()
+        changed = self.changed_files(job)
+        pdf = self.book_dir / f"{job}.pdf"
+
+        result: Dict[str, Any] = {
+            "job": job,
+            "success": True,
+            "skipped": False,
+            "pdf": pdf,
+            "changed": changed,
+            "passes": 0,
+            "steps": [],
+            "seconds": 0.0,
+            "errors": [],
+        }
+        same_chapters = job_state.get("only", []) == chapters
+        if not force and not changed and same_chapters and job_state.get("success") and pdf.exists():
+            self.logger.info(f"{job}.pdf is up to date")
+            result["skipped"] = True
+            return result
+
+        start = time.perf_counter()
+        if chapters:
+            source = f"\\includeonly{{{','.join(chapters)}}}\\input{{main.tex}}"
+        else:
+            source = "main.tex"
+
+        fmt = self.ensure_format(result)
+        state = self.load_state()
+        log = self._latex(source, job, result, fmt)
+        has_bib = (self.book_dir / "bibliography.bib").exists()
+        needs_bibtex = "bibliography.bib" in changed or not (self.book_dir / f"{job}.bbl").exists()
+        if result["success"] and has_bib and needs_bibtex:
+            # bibtex exits with 1 when it only has warnings
+            self._run("bibtex", ["bibtex", job], result, ok_codes=(0, 1))
+            log = self._latex(source, job, result, fmt)
+
+        while result["success"] and _RERUN.search(log) and result["passes"] < self.max_passes:
+            log = self._latex(source, job, result, fmt)
+
+        result["seconds"] = time.perf_counter() - start
+        if not result["success"]:
+            result["errors"] = parse_log_errors(log)
+
+        state[job] = {
+            "hashes": hashes if result["success"] else job_state.get("hashes", {}),
+            "success": result["success"],
+            "only": chapters,
+        }
+        atomic_write_text(self.state_path, json.dumps(state, indent=2, sort_keys=True))
+
+        timings = ", ".join(f"{s['step']} {s['seconds']:.1f}s" for s in result["steps"])
+        status = "succeeded" if result["success"] else f"failed ({len(result['errors'])} errors)"
+        self.logger.info(f"Compile {job} {status} in {result['seconds']:.1f}s: {timings}")
+        return result
+
+    def compile_chapters(
+        self,
+        chapters: Optional[Sequence[str]] = None,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Compile each chapter as a standalone document, in parallel.
+
+        Every chapter gets one LaTeX pass in an isolated temporary directory
+        (the book directory stays on the input path for figures and chapter
+        files), using the preamble format when available. Nothing in the
+        book directory is written apart from the format.
+
+        Args:
+            chapters: Chapter names (default: every Chapter-*.tex)
+            max_workers: Concurrent compiles (default: CPU count)
+
+        Returns:
+            {chapter: {"success", "seconds", "errors"}}
+        """
+        main_tex = (self.book_dir / "main.tex").read_text(encoding="utf-8")
+        if chapters is None:
+            chapters = [p.stem for p in sorted(self.book_dir.glob("Chapter-*.tex"))]
+        else:
+            chapters = [Path(name).stem for name in chapters]
+        fmt = self.ensure_format()
+
+        book_dir = str(self.book_dir.resolve())
+        env = dict(os.environ)
+        # A trailing separator keeps the default search paths
+        env["TEXINPUTS"] = book_dir + os.pathsep + env.get("TEXINPUTS", "")
+        env["TEXFORMATS"] = book_dir + os.pathsep + env.get("TEXFORMATS", "")
+
+        def work(chapter: str) -> Dict[str, Any]:
+            result: Dict[str, Any] = {"success": True, "steps": [], "passes": 0}
+            with tempfile.TemporaryDirectory(prefix=f"{chapter}-") as tmp:
+                tmp_dir = Path(tmp)
+                (tmp_dir / "standalone.tex").write_text(standalone_chapter(main_tex, chapter), encoding="utf-8")
+                log = self._latex("standalone.tex", chapter, result, fmt, cwd=tmp_dir, env=env)
+            return {
+                "success": result["success"],
+                "seconds": sum(step["seconds"] for step in result["steps"]),
+                "errors": [] if result["success"] else parse_log_errors(log),
+            }
+
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(chapters) or 1))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chapter-tex") as pool:
+            results = dict(zip(chapters, pool.map(work, chapters)))
+
+        failed = [name for name, r in results.items() if not r["success"]]
+        self.logger.info(
+            f"Compiled {len(chapters)} chapters standalone in {time.perf_counter() - start:.1f}s "
+            f"({workers} workers, {len(failed)} failed)"
+        )
+        return results
+
+    def _latex(
+        self,
+        source: str,
+        job: str,
+        result: Dict[str, Any],
+        fmt: Optional[str] = None,
+        cwd: Optional[Path] = None,
+        env: Optional[Dict[str, str]] = None
+    ) -> str:
+        result["passes"] += 1
+        cmd = [self.engine, "-interaction=nonstopmode", "-file-line-error", f"-jobname={job}"]
+        if fmt:
+            cmd.append(f"-fmt={fmt}")
+        cmd.append(source)
+        self._run(f"{self.engine} #{result['passes']}", cmd, result, cwd=cwd, env=env)
+        log_path = (cwd or self.book_dir) / f"{job}.log"
+        return log_path.read_text(encoding="latin-1") if log_path.exists() else ""
+
+    def _run(
+        self,
+        step: str,
+        cmd: List[str],
+        result: Dict[str, Any],
+        ok_codes: Sequence[int] = (0,),
+        cwd: Optional[Path] = None,
+        env: Optional[Dict[str, str]] = None
+    ):
+        if shutil.which(cmd[0]) is None:
+            raise FileNotFoundError(f"{cmd[0]} not found on PATH")
+        start = time.perf_counter()
+        try:
+            completed = subprocess.run(
+                cmd, cwd=cwd or self.book_dir, env=env, capture_output=True, text=True,
+                errors="replace", timeout=self.timeout
+            )
+            ok = completed.returncode in ok_codes
+        except subprocess.TimeoutExpired:
+            self.logger.error(f"{step} timed out after {self.timeout}s")
+            ok = False
+        result["steps"].append({"step": step, "seconds": time.perf_counter() - start})
+        if not ok:
+            result["success"] = False
@@ -0,0 +1,378 @@
+"""
+Book Orchestrator Module
+
+Runs the full pipeline (analysis, research, portraits, authoring and LaTeX
+build) for every lecture of a course. Per-chapter stages form a dependency
+graph, so independent chapters proceed in parallel, bounded by per-stage
+worker limits from a single JSON config file.
+"""
+
+import json
+import logging
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from slides_to_textbook.modules.asset_pipeline import AssetPipeline
+from slides_to_textbook.modules.content_author import ContentAuthor
+from slides_to_textbook.modules.latex_builder import LaTeXBuilder
+from slides_to_textbook.modules.latex_components import BibliographyManager, cited_keys, rename_citations
+from slides_to_textbook.modules.pdf_analyzer import PDFAnalyzer
+from slides_to_textbook.modules.people_registry import PeopleRegistry
+from slides_to_textbook.modules.portrait_preprocessor import PortraitPreprocessor
+from slides_to_textbook.modules.portrait_service import PortraitService
+from slides_to_textbook.modules.portrait_store import PortraitStore
+from slides_to_textbook.modules.progress_tracker import ProgressTracker
+from slides_to_textbook.modules.topic_researcher import TopicResearcher
+
+# Stage -> stages of the same chapter it depends on
+STAGE_DEPENDENCIES = {
+    "analyze": [],
+    "research": ["analyze"],
+    "portraits": ["analyze"],
+    "author": ["research", "portraits"],
+    "build": ["author"],
+}
+
+DEFAULT_WORKERS = {
+    "analyze": 4,
+    "research": 4,
+    "portraits": 2,
+    "author": 4,
+    "build": 2,
+}
+
+
+def load_book_config(config_path: Path) -> Dict[str, Any]:
+    """
+    Load a book config file.
+
+    Expected structure:
+        {
+            "book_title": "Machine Learning",
+            "output_dir": "MachineLearningBook",
+            "lectures": [
+                {"pdf": "Lecture-1.pdf", "title": "Introduction"},
+                {"pdf": "Lecture-2.pdf", "topic_json": "lecture2_topic.json"}
+            ],
+            "workers": {"analyze": 4, "research": 4, "portraits": 2, "author": 4, "build": 2}
+        }
+
+    Relative paths are resolved against the config file's directory.
+    """
+    config_path = Path(config_path)
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    if not config.get("lectures"):
+        raise ValueError(f"No lectures listed in {config_path}")
+    if not config.get("output_dir"):
+        raise ValueError(f"No output_dir set in {config_path}")
+
+    base = config_path.parent
+    config["output_dir"] = str(base / config["output_dir"])
+    for lecture in config["lectures"]:
+        for key in ("pdf", "topic_json"):
+            if lecture.get(key):
+                lecture[key] = str(base / lecture[key])
+
+    unknown = set(config.get("workers", {})) - set(STAGE_DEPENDENCIES)
+    if unknown:
+        raise ValueError(f"Unknown stages in workers: {sorted(unknown)}")
+    config["workers"] = {**DEFAULT_WORKERS, **config.get("workers", {})}
+    return config
+
+
+def safe_chapter_name(title: str) -> str:
+    """'Neural Networks' -> 'NeuralNetworks' (used for file and directory names)."""
+    return re.sub(r'[^A-Za-z0-9]', '', title) or "Untitled"
+
+
+class BookOrchestrator:
+    """
+    Generates every chapter of a book and assembles main.tex at the end.
+    """
+
+    def __init__(self, config: Dict[str, Any], tracker: Optional[ProgressTracker] = None):
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.book_title = config.get("book_title", "Textbook")
+        self.output_dir = Path(config["output_dir"])
+        self.lectures = config["lectures"]
+        self.workers = {**DEFAULT_WORKERS, **config.get("workers", {})}
+        self.tracker = tracker
+
+        self.analyzer = PDFAnalyzer()
+        self.researcher = TopicResearcher()
+        self.preprocessor = PortraitPreprocessor()
+        self.author = ContentAuthor(prompt_token_budget=config.get("prompt_token_budget"))
+        self.builder = LaTeXBuilder(self.output_dir, cache_dir=config.get("cache_dir"))
+        # Persists across runs; chapters add their citations incrementally
+        self.bib_manager = BibliographyManager(self.output_dir / "bibliography.json")
+        # One identity per person across all chapters of the book
+        self.people = PeopleRegistry(self.output_dir / "people.json")
+        # Shared across chapters and books so each person is generated once
+        self.portrait_store = PortraitStore(config.get("portrait_store"))
+        self.asset_pipeline = AssetPipeline(
+            self.output_dir,
+            dpi=config.get("print_dpi", 300),
+            max_workers=config.get("asset_workers", 4)
+        )
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the pipeline for all lectures.
+
+        Returns:
+            Dict with per-chapter state ("chapters") and total wall time ("seconds")
+        """
+        start = time.perf_counter()
+        chapters = [self._new_chapter(i, lecture) for i, lecture in enumerate(self.lectures)]
+        self.logger.info(f"Building '{self.book_title}' from {len(chapters)} lectures (workers: {self.workers})")
+
+        self._run_graph(chapters)
+
+        completed = [c for c in chapters if c["status"] == "completed"]
+        failed = [c for c in chapters if c["status"] == "failed"]
+        if completed:
+            self._merge_bibliographies(completed)
+            self.builder.build_book(self.book_title, [self._chapter_data(c) for c in completed])
+            self._write_bibliography()
+        if len(self.people):
+            self.people.save()
+        if failed:
+            self.logger.error(f"{len(failed)} chapter(s) failed: {[c['title'] for c in failed]}")
+
+        elapsed = time.perf_counter() - start
+        self.logger.info(f"Book build finished in {elapsed:.1f}s ({len(completed)}/{len(chapters)} chapters)")
+        return {"chapters": chapters, "seconds": elapsed}
+
+    # ------------------------------------------------------------------
+    # Scheduling
+
+    def _new_chapter(self, index: int, lecture: Dict[str, Any]) -> Dict[str, Any]:
+        title = lecture.get("title") or Path(lecture.get("pdf") or lecture.get("topic_json", f"Chapter{index + 1}")).stem
+        return {
+            "index": index,
+            "lecture": lecture,
+            "title": title,
+            "status": "pending",
+            "stages": {stage: {"status": "pending", "seconds": None, "error": None} for stage in STAGE_DEPENDENCIES},
+            "topic": None,
+            "people": [],
+            "assets_map": {"figures": {}, "portraits": {}},
+            "citations": [],
+            "citation_map": {},
+            "content": None,
+        }
+
+    def _run_graph(self, chapters: List[Dict[str, Any]]):
+        pools = {
+            stage: ThreadPoolExecutor(max_workers=max(1, self.workers[stage]), thread_name_prefix=stage)
+            for stage in STAGE_DEPENDENCIES
+        }
+        in_flight = {}
+
+        def submit(chapter: Dict[str, Any], stage: str):
+            chapter["stages"][stage]["status"] = "running"
+            chapter["status"] = "running"
+            in_flight[pools[stage].submit(self._run_stage, stage, chapter)] = (chapter, stage)
+
+        try:
+            for chapter in chapters:
+                for stage, deps in STAGE_DEPENDENCIES.items():
+                    if not deps:
+                        submit(chapter, stage)
+
+            while in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    chapter, stage = in_flight.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        chapter["stages"][stage]["status"] = "failed"
+                        chapter["stages"][stage]["error"] = str(e)
+                        chapter["status"] = "failed"
+                        self.logger.error(f"[{chapter['title']}] {stage} failed: {e}")
+                        self._track(chapter, error=f"{stage} failed: {e}")
+                        continue
+
+                    chapter["stages"][stage]["status"] = "completed"
+                    if chapter["status"] == "failed":
+                        continue
+                    for next_stage, deps in STAGE_DEPENDENCIES.items():
+                        ready = stage in deps and all(chapter["stages"][d]["status"] == "completed" for d in deps)
+                        if ready and chapter["stages"][next_stage]["status"] == "pending":
+                            submit(chapter, next_stage)
+
+                    if all(s["status"] == "completed" for s in chapter["stages"].values()):
+                        chapter["status"] = "completed"
+                        self._track(chapter)
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+
+    def _run_stage(self, stage: str, chapter: Dict[str, Any]):
+        start = time.perf_counter()
+        try:
+            getattr(self, f"_stage_{stage}")(chapter)
+        finally:
+            chapter["stages"][stage]["seconds"] = time.perf_counter() - start
+        self.logger.info(f"[{chapter['title']}] {stage} done in {chapter['stages'][stage]['seconds']:.1f}s")
+
+    def _track(self, chapter: Dict[str, Any], error: Optional[str] = None):
+        """Record chapter outcome in the progress tracker (scheduler thread only)."""
+        if not self.tracker:
+            return
+        self.tracker.add_chapter(chapter["title"])
+        if error:
+            self.tracker.update_chapter(chapter["title"], status="failed")
+            self.tracker.log_error(f"[{chapter['title']}] {error}")
+        else:
+            self.tracker.update_chapter(
+                chapter["title"],
+                status="completed",
+                word_count=len((chapter["content"] or "").split()),
+                portraits=len(chapter["assets_map"]["portraits"]),
+                citations=len(chapter["citation_map"]),
+            )
+
+    # ------------------------------------------------------------------
+    # Stages
+
+    def _stage_analyze(self, chapter: Dict[str, Any]):
+        lecture = chapter["lecture"]
+        if lecture.get("topic_json"):
+            with open(lecture["topic_json"], 'r', encoding='utf-8') as f:
+                topic = json.load(f)
+        elif lecture.get("pdf"):
+            topic = self.analyzer.analyze_pdf(lecture["pdf"])["analysis"]
+        else:
+            raise ValueError("Lecture needs a 'pdf' or 'topic_json' entry")
+
+        if lecture.get("title"):
+            topic["title"] = lecture["title"]
+        chapter["title"] = topic.get("title") or chapter["title"]
+        topic.setdefault("equations", [])
+        chapter["topic"] = topic
+
+    def _stage_research(self, chapter: Dict[str, Any]):
+        topic = chapter["topic"]
+        if "research" not in topic:
+            topic = self.researcher.research_topic(topic)
+
+        # Provisional keys: citations already in the book keep theirs, new ones
+        # get a key the book does not use yet (so renaming them at merge time
+        # cannot touch a citation of an existing entry) until
+        # _merge_bibliographies runs
+        citations = [dict(c) for c in topic.get("research", {}).get("citations", [])]
+        local = BibliographyManager()
+        citation_map = {}
+        for citation in citations:
+            title, doi, year = citation.get("title"), citation.get("doi"), citation.get("year")
+            key = self.bib_manager.find(title, doi, year) or local.find(title, doi, year)
+            if key is None:
+                key = local.add_entry({**citation, "ID": self.bib_manager.free_key(citation, taken=local)})
+            citation_map[title] = key
+        chapter["research"] = topic.get("research", {})
+        chapter["citations"] = citations
+        chapter["citation_map"] = citation_map
+
+    def _merge_bibliographies(self, chapters: List[Dict[str, Any]]):
+        """
+        Add the chapters' citations to the book bibliography in chapter order,
+        so suffixed keys (Hinton2006a) do not depend on which chapter finished
+        first, and rebuild chapters whose provisional keys changed.
+        """
+        for chapter in chapters:
+            renames = {}
+            for citation in chapter["citations"]:
+                title = citation.get("title")
+                key = self.bib_manager.add_entry(dict(citation))
+                provisional = chapter["citation_map"].get(title)
+                if provisional and provisional != key:
+                    renames[provisional] = key
+                chapter["citation_map"][title] = key
+            if renames and chapter["content"]:
+                chapter["content"] = rename_citations(chapter["content"], renames)
+                self._stage_build(chapter)
+
+    def _write_bibliography(self):
+        """
+        Prune the bibliography to the keys the chapters cite and regenerate
+        bibliography.bib, but only if the cited set or the entries changed.
+        """
+        used = set()
+        for tex_file in self.output_dir.glob("Chapter-*.tex"):
+            used.update(cited_keys(tex_file.read_text(encoding="utf-8")))
+        bib = self.bib_manager
+        removed = bib.prune(used)
+        if removed:
+            self.logger.info(f"Pruned {len(removed)} uncited bibliography entries")
+
+        if bib.changed or sorted(used) != bib.used or not (self.output_dir / "bibliography.bib").exists():
+            bib.used = sorted(used)
+            self.builder.write_bibliography(bib)
+            bib.save()
+        else:
+            self.logger.info("Bibliography unchanged")
+
+    def _stage_portraits(self, chapter: Dict[str, Any]):
+        people = list(chapter["topic"].get("people", []))
+        pdf = chapter["lecture"].get("pdf")
+        if pdf and self.config.get("extract_people", True):
+            try:
+                extracted = [p["name"] for p in self.preprocessor.extract_from_pdf(Path(pdf), use_ai=True)]
+                people = people + extracted
+            except Exception as e:
+                self.logger.warning(f"[{chapter['title']}] name extraction failed, using topic people: {e}")
+        people = self.people.canonicalize(people)
+        chapter["people"] = people
+
+        if not people:
+            return
+        portrait_dir = self.output_dir / "Portraits" / f"Chapter-{safe_chapter_name(chapter['title'])}"
+        portraits = self._generate_portraits(people, portrait_dir)
+        if self.config.get("print_assets", False):
+            # Reference the downsampled print variants instead of the originals
+            records = self.asset_pipeline.run(portraits.values())
+            portraits = {
+                person: self.output_dir / records[path.relative_to(self.output_dir).as_posix()]["variant"]
+                for person, path in portraits.items()
+            }
+        for person, path in portraits.items():
+            chapter["assets_map"]["portraits"][person] = str(path.relative_to(self.output_dir))
+
+    def _stage_author(self, chapter: Dict[str, Any]):
+        topic = {**chapter["topic"], "research": chapter.get("research", {}), "people": chapter["people"]}
+        chapter["content"] = self.author.generate_chapter_content(
+            topic,
+            assets_map=chapter["assets_map"],
+            citation_map=chapter["citation_map"]
+        )
+
+    def _stage_build(self, chapter: Dict[str, Any]):
+        self.builder.build_chapter(self._chapter_data(chapter))
+
+    def _chapter_data(self, chapter: Dict[str, Any]) -> Dict[str, Any]:
+        safe_title = safe_chapter_name(chapter["title"])
+        return {
+            "title": chapter["title"],
+            "safe_title": safe_title,
+            "content": chapter["content"] or "",
+            "file_name": f"Chapter-{safe_title}.tex",
+        }
+
+    def _generate_portraits(self, people: List[str], output_dir: Path) -> Dict[str, Path]:
+        """Generate missing portraits in-process and map people to existing files."""
+        service = PortraitService(
+            output_dir,
+            max_workers=self.config.get("portrait_workers", 4),
+            timeout=self.config.get("portrait_timeout", 180),
+            store=self.portrait_store
+        )
+        results = service.generate(people)
+        return {person: r["path"] for person, r in results.items() if r["path"] is not None}
@@ -0,0 +1,145 @@
+"""
+Citation Checker Module
+
+Verifies that every \\cite-family key in the chapters exists in
+bibliography.bib. The bibliography is loaded once into a key index, all
+chapters are scanned in a single pass, and the result lists unknown keys
+(with their file and line) and bibliography entries nobody cites.
+
+Unknown keys that are near-misses of a real key ('lecun2015' for
+'LeCun2015', 'Hinton2006' for 'Hinton2006a') get a suggestion and can be
+rewritten in place. A near-miss with several equally close keys
+('Hinton2006' with both 'Hinton2006a' and 'Hinton2006b' in the
+bibliography) only lists its candidates and is never rewritten.
+"""
+
+import bisect
+import difflib
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from slides_to_textbook.modules.latex_components import iter_citations, parse_bibtex
+from slides_to_textbook.utils.file_utils import atomic_write_text
+
+_NEWLINE = re.compile(r"\n")
+
+
+def suggestion_hint(item: Dict[str, Any]) -> str:
+    """' (did you mean X?)' / ' (ambiguous: X, Y)' for an entry of check()["unknown"]."""
+    if item["suggestion"]:
+        return f" (did you mean {item['suggestion']}?)"
+    if item["candidates"]:
+        return f" (ambiguous: {', '.join(item['candidates'])})"
+    return ""
+
+
+class CitationChecker:
+    """
+    Check the citation keys of a book directory.
+
+    Args:
+        book_dir: Directory with Chapter-*.tex and bibliography.bib
+        bib_path: Bibliography to check against (default: book_dir/bibliography.bib)
+        cutoff: Minimum similarity (0-1) for a near-miss suggestion
+    """
+
+    def __init__(self, book_dir: Union[str, Path], bib_path: Optional[Union[str, Path]] = None, cutoff: float = 0.85):
+        self.logger = logging.getLogger(__name__)
+        self.book_dir = Path(book_dir)
+        self.bib_path = Path(bib_path) if bib_path else self.book_dir / "bibliography.bib"
+        self.cutoff = cutoff
+        self.keys = self._load_keys()
+        self._by_lower = {key.lower(): key for key in self.keys}
+        self._candidates: Dict[str, List[str]] = {}
+
+    def _load_keys(self) -> List[str]:
+        if not self.bib_path.exists():
+            return []
+        return [entry["ID"] for entry in parse_bibtex(self.bib_path.read_text(encoding="utf-8"))]
+
+    def candidates(self, key: str) -> List[str]:
+        """
+        Known keys an unknown key may have meant: its case-insensitive match,
+        else every near-miss with the best similarity (ties included).
+        """
+        if key not in self._candidates:
+            match = self._by_lower.get(key.lower())
+            if match is not None:
+                found = [match]
+            else:
+                matcher = difflib.SequenceMatcher(b=key.lower())
+                scored = []
+                for lower, known in self._by_lower.items():
+                    matcher.set_seq1(lower)
+                    if (matcher.real_quick_ratio() >= self.cutoff and matcher.quick_ratio() >= self.cutoff
+                            and matcher.ratio() >= self.cutoff):
+                        scored.append((matcher.ratio(), known))
+                best = max((ratio for ratio, _ in scored), default=None)
+                found = [known for ratio, known in scored if ratio == best]
+            self._candidates[key] = found
+        return self._candidates[key]
+
+    def suggest(self, key: str) -> Optional[str]:
+        """The known key an unknown key most likely meant, or None if there is no single best one."""
+        found = self.candidates(key)
+        return found[0] if len(found) == 1 else None
+
+    def check(self, fix: bool = False) -> Dict[str, Any]:
+        """
+        Scan every chapter.
+
+        Args:
+            fix: Rewrite unknown keys that have a suggestion to the suggested key
+
+        Returns:
+            {"cited", "unknown": [{"key", "file", "line", "suggestion", "candidates"}],
+             "unused": [keys], "fixed": count}
+        """
+        known = set(self.keys)
+        cited: Dict[str, int] = {}
+        unknown: List[Dict[str, Any]] = []
+        fixed = 0
+
+        for tex_file in sorted(self.book_dir.glob("Chapter-*.tex")):
+            text = tex_file.read_text(encoding="utf-8")
+            line_starts = None
+            replacements = []
+            for key, offset in iter_citations(text):
+                if key == "*":
+                    continue  # \nocite{*}
+                if key in known:
+                    cited[key] = cited.get(key, 0) + 1
+                    continue
+                suggestion = self.suggest(key)
+                if line_starts is None:
+                    line_starts = [0] + [m.end() for m in _NEWLINE.finditer(text)]
+                unknown.append({
+                    "key": key,
+                    "file": tex_file.name,
+                    "line": bisect.bisect_right(line_starts, offset),
+                    "suggestion": suggestion,
+                    "candidates": self.candidates(key),
+                })
+                if fix and suggestion:
+                    replacements.append((offset, key, suggestion))
+                    cited[suggestion] = cited.get(suggestion, 0) + 1
+
+            if replacements:
+                for offset, key, suggestion in reversed(replacements):
+                    text = text[:offset] + suggestion + text[offset + len(key):]
+                atomic_write_text(tex_file, text)
+                fixed += len(replacements)
+
+        report = {
+            "cited": cited,
+            "unknown": unknown,
+            "unused": [key for key in self.keys if key not in cited],
+            "fixed": fixed,
+        }
+        self.logger.info(
+            f"Citations: {sum(cited.values())} resolved, {len(unknown)} unknown "
+            f"({fixed} fixed), {len(report['unused'])} unused"
+        )
+        return report
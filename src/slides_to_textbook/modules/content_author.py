@@ -1,12 +1,43 @@
+import bisect
 import logging
 import re
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 from slides_to_textbook.utils.api_clients import AIClient
+from slides_to_textbook.utils.file_utils import atomic_write_text
+from slides_to_textbook.utils.prompt_budget import PromptAssembler, estimate_tokens
+from slides_to_textbook.utils.text_matching import MultiPatternMatcher
+
+SECTION_PATTERN = re.compile(r'\\section\{([^}]*)\}[ \t]*\n?')
+
+
+def split_sections(content: str) -> List[Tuple[str, int, int]]:
+    """
+    Locate \\section{...} blocks in chapter content.
+
+    Returns (title, body_start, body_end) for each section, where the body
+    runs from just after the header line to the next \\section or the end.
+    """
+    headers = list(SECTION_PATTERN.finditer(content))
+    sections = []
+    for i, match in enumerate(headers):
+        body_end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+        sections.append((match.group(1).strip(), match.end(), body_end))
+    return sections
 
 class ContentAuthor:
-    def __init__(self):
+    def __init__(self, prompt_token_budget: Optional[int] = None):
+        """
+        Args:
+            prompt_token_budget: Maximum estimated tokens of context (history,
+                concepts, people, citations) per section prompt. None sends
+                everything, as before.
+        """
         self.logger = logging.getLogger(__name__)
         self.ai_client = AIClient()
+        self.prompt_assembler = PromptAssembler(prompt_token_budget)
+        self.prompt_stats: List[Dict[str, Any]] = []
 
     def generate_chapter_content(self, topic_data: Dict[str, Any], assets_map: Dict[str, Any] = None, citation_map: Dict[str, str] = None) -> str:
         """
@@ -35,10 +66,90 @@ class ContentAuthor:
         
         return full_content
 
+    def regenerate_sections(
+        self,
+        chapter_path: Path,
+        section_titles: List[str],
+        topic_data: Dict[str, Any],
+        assets_map: Dict[str, Any] = None,
+        citation_map: Dict[str, str] = None,
+        max_workers: int = 4
+    ) -> List[str]:
+        """
+        Regenerate the named sections of an existing chapter file in place.
+
+        Only the requested sections are sent to the model; the rest of the file
+        is kept byte-for-byte and the result is written atomically. If a title
+        occurs more than once, its first occurrence is regenerated.
+
+        Returns:
+            The titles of the sections that were regenerated
+        """
+        chapter_path = Path(chapter_path)
+        content = chapter_path.read_text(encoding="utf-8")
+        sections = split_sections(content)
+        available = [title for title, _, _ in sections]
+
+        missing = [t for t in section_titles if t not in available]
+        if missing:
+            raise ValueError(
+                f"Sections not found in {chapter_path.name}: {missing}. "
+                f"Available: {available}"
+            )
+
+        targets = list(dict.fromkeys(section_titles))
+        self.logger.info(f"Regenerating {len(targets)} section(s) of {chapter_path.name}")
+
+        def generate(title: str) -> str:
+            if title == "Introduction":
+                body = self._generate_section(title, topic_data, context="historical_context", assets_map=assets_map, citation_map=citation_map)
+            else:
+                body = self._generate_section(title, topic_data, assets_map=assets_map, citation_map=citation_map)
+                body = self._clean_content(body, title)
+            return body
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets)))) as pool:
+            bodies = dict(zip(targets, pool.map(generate, targets)))
+
+        # Only inject assets that are not already placed elsewhere in the chapter
+        selected = {available.index(t) for t in targets}
+        untouched_parts = []
+        cursor = 0
+        for i, (_, start, end) in enumerate(sections):
+            if i in selected:
+                untouched_parts.append(content[cursor:start])
+                cursor = end
+        untouched_parts.append(content[cursor:])
+        untouched = "".join(untouched_parts)
+        if assets_map:
+            assets_map = {
+                "figures": {k: v for k, v in assets_map.get("figures", {}).items() if f"Figures/{v}" not in untouched},
+                "portraits": {k: v for k, v in assets_map.get("portraits", {}).items() if v not in untouched},
+            }
+
+        parts = []
+        cursor = 0
+        for i, (title, start, end) in enumerate(sections):
+            if i not in selected:
+                continue
+            body = self._inject_missing_assets(bodies[title], assets_map)
+            parts.append(content[cursor:start])
+            parts.append(body.rstrip() + "\n\n")
+            cursor = end
+        parts.append(content[cursor:])
+
+        atomic_write_text(chapter_path, "".join(parts))
+        self.logger.info(f"Rewrote {chapter_path}")
+        return targets
+
     def _inject_missing_assets(self, content: str, assets_map: Dict[str, Any]) -> str:
         """
         Post-process content to ensure all relevant assets are included.
         If a concept/person is mentioned but the asset code is missing, append it.
+
+        All names and asset paths are located in one multi-pattern pass and
+        the output is assembled in a single rebuild, so cost stays linear in
+        chapter size regardless of how many assets are mapped.
         """
         if not assets_map: return content
 
@@ -48,60 +159,90 @@ class ContentAuthor:
         content = re.sub(portrait_pattern, '', content)
         self.logger.info("Stripped AI-inserted portrait margin notes to avoid duplicates")
         
-        # 1. Figures
-        for concept, filename in assets_map.get("figures", {}).items():
-            # Check if concept is in text (case insensitive)
-            if concept.lower() in content.lower():
-                # Check if figure is already included
-                if f"Figures/{filename}" not in content:
-                    self.logger.info(f"Injecting missing figure for concept: {concept}")
-                    # Simple injection: Append to the end of the section/text or near the first mention?
-                    # Appending to the text block avoids breaking paragraphs.
-                    # Ideally, we'd split paragraphs, but for robustness, let's append.
-                    figure_code = f"\n\\begin{{figure}}[h]\n\\centering\n\\includegraphics[width=0.9\\linewidth]{{Figures/{filename}}}\n\\caption{{{concept}}}\n\\label{{fig:{concept.replace(' ', '')}}}\n\\end{{figure}}\n"
-                    
-                    # Try to insert after the paragraph containing the first mention
-                    # Split by double newline (paragraphs)
-                    paragraphs = content.split("\n\n")
-                    new_paragraphs = []
-                    inserted = False
-                    for p in paragraphs:
-                        new_paragraphs.append(p)
-                        if not inserted and concept.lower() in p.lower():
-                            new_paragraphs.append(figure_code)
-                            inserted = True
-                    
-                    if not inserted:
-                        # Append to the end of the text if not inserted inline
-                        # But typically we want it near the text. 
-                        # Let's try to append to the last paragraph that contains the keyword, 
-                        # or just append to end of section if logical.
-                        # Simple robust fallback: Append to the end.
-                        content += figure_code
-                    else:
-                        content = "\n\n".join(new_paragraphs)
-
-        # 2. Portraits (Margin Notes)
-        for person, filename in assets_map.get("portraits", {}).items():
-             if person.lower() in content.lower():
-                 # Check if portrait is already injected (filename already contains full path from OUTPUT_DIR)
-                 if filename not in content:
-                     self.logger.info(f"Injecting portrait for: {person}")
-                     note_code = f"\\automarginnote{{\\includegraphics[width=\\linewidth]{{{filename}}}}}"
-                     # Find first mention and replace name with Name + Note? 
-                     # Or just insert unique note. Margin notes float, so placement matters less but should be close.
-                     # Let's simple replace the first occurrence of the name with "Name\automarginnote{...}"
-                     # But name might be part of a sentence.
-                     
-                     # Regex replace first occurrence ensuring word boundary
-                     try:
-                         pattern = re.compile(re.escape(person), re.IGNORECASE)
-                         # Use lambda to avoid backslash escaping issues in the replacement string
-                         content = pattern.sub(lambda m: f"{m.group(0)}{note_code}", content, count=1)
-                     except Exception as e:
-                         self.logger.error(f"Failed to inject portrait for {person}: {e}")
+        figures = list(assets_map.get("figures", {}).items())
+        portraits = list(assets_map.get("portraits", {}).items())
+        if not figures and not portraits:
+            return content
 
-        return content
+        # One automaton over every concept/person name (case-insensitive) and
+        # every asset path (verified case-sensitively below), so a single scan
+        # finds the first mention of everything.
+        figure_paths = [f"Figures/{filename}" for _, filename in figures]
+        portrait_paths = [filename for _, filename in portraits]
+        patterns = [c for c, _ in figures] + [p for p, _ in portraits] + figure_paths + portrait_paths
+        matcher = MultiPatternMatcher(patterns)
+
+        # Figures only need their first mention; portraits keep every mention
+        # because an earlier note can split a longer name (see below).
+        first_mention: Dict[int, Tuple[int, int]] = {}
+        mentions: Dict[int, List[Tuple[int, int]]] = {}
+        present = set()
+        n_names = len(figures) + len(portraits)
+        for start, end, pattern_id in matcher.iter_matches(content):
+            if pattern_id < len(figures):
+                if pattern_id not in first_mention:
+                    first_mention[pattern_id] = (start, end)
+            elif pattern_id < n_names:
+                mentions.setdefault(pattern_id, []).append((start, end))
+            elif pattern_id not in present and content[start:end] == patterns[pattern_id]:
+                present.add(pattern_id)
+
+        # Insertions are (offset, order, rank, text); portraits sort before
+        # figures at the same offset so a note stays attached to the name it
+        # follows.
+        insertions: List[Tuple[int, int, int, str]] = []
+        paragraph_breaks = [m.start() for m in re.finditer(r"\n\n", content)]
+        injected = set()
+
+        # 1. Figures: after the paragraph containing the first mention
+        for i, (concept, filename) in enumerate(figures):
+            path = f"Figures/{filename}"
+            if i not in first_mention or n_names + i in present or path in injected:
+                continue
+            injected.add(path)
+            self.logger.info(f"Injecting missing figure for concept: {concept}")
+            figure_code = f"\n\\begin{{figure}}[h]\n\\centering\n\\includegraphics[width=0.9\\linewidth]{{{path}}}\n\\caption{{{concept}}}\n\\label{{fig:{concept.replace(' ', '')}}}\n\\end{{figure}}\n"
+            mention_start = first_mention[i][0]
+            idx = bisect.bisect_left(paragraph_breaks, mention_start)
+            offset = paragraph_breaks[idx] if idx < len(paragraph_breaks) else len(content)
+            insertions.append((offset, 1, i, "\n\n" + figure_code))
+
+        # 2. Portraits (Margin Notes): directly after the first mention of the
+        # name. Notes are placed as if inserted one after another in
+        # assets_map order: a mention split by an earlier note ("Neural" +
+        # note + " Network") no longer counts, and a later note on the same
+        # offset goes in front of the earlier ones.
+        placed: List[int] = []
+        for j, (person, filename) in enumerate(portraits):
+            pattern_id = len(figures) + j
+            # Filename already contains full path from OUTPUT_DIR
+            if n_names + len(figures) + j in present or filename in injected:
+                continue
+            for start, end in mentions.get(pattern_id, ()):
+                idx = bisect.bisect_right(placed, start)
+                if idx == len(placed) or placed[idx] >= end:
+                    break
+            else:
+                continue
+            injected.add(filename)
+            bisect.insort(placed, end)
+            self.logger.info(f"Injecting portrait for: {person}")
+            note_code = f"\\automarginnote{{\\includegraphics[width=\\linewidth]{{{filename}}}}}"
+            insertions.append((end, 0, -j, note_code))
+
+        if not insertions:
+            return content
+
+        # Single rebuild of the output
+        insertions.sort(key=lambda item: item[:3])
+        parts = []
+        cursor = 0
+        for offset, _, _, text in insertions:
+            parts.append(content[cursor:offset])
+            parts.append(text)
+            cursor = offset
+        parts.append(content[cursor:])
+        return "".join(parts)
 
     def _generate_section(self, section_title: str, topic_data: Dict[str, Any], context: str = "", assets_map: Dict[str, Any] = None, citation_map: Dict[str, str] = None) -> str:
         """
@@ -114,7 +255,6 @@ class ContentAuthor:
         # Note: assets_map paths are already relative to OUTPUT_DIR (e.g., "Portraits/Chapter-X/Name.png")
         figures_info = "\n".join([f"- Concept '{k}': Use \\begin{{figure}}[h] \\centering \\includegraphics[width=0.9\\linewidth]{{Figures/{v}}} \\caption{{{k}}} \\label{{fig:{k.replace(' ', '')}}} \\end{{figure}}" for k, v in assets_map.get('figures', {}).items()])
         portraits_info = "\n".join([f"- Person '{k}': Use \\automarginnote{{\\includegraphics[width=\\linewidth]{{{v}}}}}" for k, v in assets_map.get('portraits', {}).items()])
-        citations_info = "\n".join([f"- {title}: use \\citep{{{key}}}" for title, key in citation_map.items()])
 
         system_prompt = """
         You are an expert textbook author writing in the style of the Air Quality V3 textbook.
@@ -193,20 +333,58 @@ class ContentAuthor:
         - Use LaTeX formatting: $math$, \\textit{}, \\textbf{}
         """
         
-        topic_context = ""
+        history = ""
         if context == "historical_context":
-            topic_context = f"Historical Context: {topic_data.get('research', {}).get('historical_context', '')}"
-            
-        prompt = f"""
+            history = topic_data.get('research', {}).get('historical_context', '')
+
+        # Rank context by relevance to this section and fit it into the budget
+        groups = {
+            "history": history.split("\n\n") if history else [],
+            "concepts": list(topic_data.get('concepts', [])),
+            "people": list(topic_data.get('people', [])),
+            "citations": [f"- {title}: use \\citep{{{key}}}" for title, key in citation_map.items()],
+        }
+        selected = self.prompt_assembler.select(section_title, groups)
+
+        prompt = self._build_prompt(section_title, topic_data, selected)
+        if self.prompt_assembler.token_budget is not None:
+            full_tokens = estimate_tokens(self._build_prompt(section_title, topic_data, groups))
+            used_tokens = estimate_tokens(prompt)
+            self.prompt_stats.append({
+                "section": section_title,
+                "full_tokens": full_tokens,
+                "prompt_tokens": used_tokens,
+                "saved_tokens": full_tokens - used_tokens,
+            })
+            self.logger.info(
+                f"Prompt for '{section_title}': ~{used_tokens} tokens "
+                f"(saved ~{full_tokens - used_tokens} vs full prompt)"
+            )
+
+        try:
+            return self.ai_client.generate_text(prompt, system_prompt, model="claude")
+        except Exception as e:
+            self.logger.error(f"Failed to generate section {section_title}: {e}")
+            return f"% Error generating section {section_title}"
+
+    def _build_prompt(self, section_title: str, topic_data: Dict[str, Any], context_items: Dict[str, List[str]]) -> str:
+        """Render the section prompt from the (possibly budgeted) context items."""
+        topic_context = ""
+        if context_items["history"]:
+            history = "\n\n".join(context_items["history"])
+            topic_context = f"Historical Context: {history}"
+        citations_info = "\n".join(context_items["citations"])
+
+        return f"""
         Write a comprehensive, engaging textbook section for "{section_title}" in the chapter "{topic_data.get('title')}".
 
         CONTEXT:
         {topic_data.get('description', '')}
         {topic_context}
 
-        KEY CONCEPTS TO COVER: {', '.join(topic_data.get('concepts', []))}
+        KEY CONCEPTS TO COVER: {', '.join(context_items['concepts'])}
 
-        KEY PEOPLE TO MENTION: {', '.join(topic_data.get('people', []))}
+        KEY PEOPLE TO MENTION: {', '.join(context_items['people'])}
         - Mention people naturally in the narrative using \\textit{{Name}}
         - Include their contributions and historical context
         - Portraits will be automatically added - you just write the text
@@ -231,12 +409,6 @@ class ContentAuthor:
         Write the textbook prose directly below (no meta-commentary):
         """
 
-        try:
-            return self.ai_client.generate_text(prompt, system_prompt, model="claude")
-        except Exception as e:
-            self.logger.error(f"Failed to generate section {section_title}: {e}")
-            return f"% Error generating section {section_title}"
-
     def _clean_content(self, content: str, section_title: str) -> str:
         """
         Clean the raw AI output:
@@ -0,0 +1,100 @@
+"""
+Figure Service Module
+
+Regenerates figures from text descriptions through the shared image client
+(utils.image_clients.get_shared_image_client), so figure requests get the
+same retries, bounded concurrency, single-flight and prompt-keyed cache as
+portraits. Figures that already exist are left alone.
+"""
+
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from slides_to_textbook.modules.portrait_service import EXISTS, FAILED, GENERATED
+from slides_to_textbook.utils.file_utils import atomic_write_bytes
+from slides_to_textbook.utils.image_clients import get_shared_image_client
+
+
+class FigureService:
+    """
+    Generate missing figures concurrently.
+
+    Args:
+        output_dir: Directory the figures are written to
+        client: Image client (defaults to get_shared_image_client())
+        max_workers: Maximum concurrent generation requests
+        resolution: Output size in pixels (width, height)
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        client=None,
+        max_workers: int = 4,
+        resolution: Tuple[int, int] = (1600, 1200)
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = Path(output_dir)
+        self.client = client
+        self.max_workers = max_workers
+        self.resolution = resolution
+
+    def build_prompt(self, description: str) -> str:
+        return f"""{description}
+        STYLE: Clean, labeled scientific illustration for a university textbook. White background.
+        REQUIREMENTS: Legible labels. No borders. No watermark.
+        """
+
+    def generate(self, figures: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate missing figures.
+
+        Args:
+            figures: {filename: description}
+
+        Returns:
+            {filename: {"status", "path", "error"}} where status is one of
+            "exists", "generated" or "failed"
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        results: Dict[str, Dict[str, Any]] = {}
+        missing = {}
+        for filename, description in figures.items():
+            path = self.output_dir / filename
+            if path.exists():
+                results[filename] = {"status": EXISTS, "path": path, "error": None}
+            else:
+                missing[filename] = description
+        if not missing:
+            return results
+
+        client = self.client or get_shared_image_client()
+        if client is None:
+            for filename in missing:
+                results[filename] = {"status": FAILED, "path": None,
+                                     "error": "No image client configured (missing GOOGLE_API_KEY)"}
+            return results
+
+        def work(item: Tuple[str, str]) -> Tuple[str, Dict[str, Any]]:
+            filename, description = item
+            path = self.output_dir / filename
+            try:
+                image = client.generate(self.build_prompt(description), resolution=self.resolution)
+                buffer = io.BytesIO()
+                if path.suffix.lower() in (".jpg", ".jpeg"):
+                    image.convert("RGB").save(buffer, format="JPEG", quality=95)
+                else:
+                    image.save(buffer, format="PNG")
+                atomic_write_bytes(path, buffer.getvalue())
+                self.logger.info(f"Figure ready: {filename}")
+                return filename, {"status": GENERATED, "path": path, "error": None}
+            except Exception as e:
+                self.logger.error(f"Figure failed: {filename}: {e}")
+                return filename, {"status": FAILED, "path": None, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="figure") as pool:
+            results.update(pool.map(work, missing.items()))
+        return results
@@ -1,30 +1,74 @@
+import functools
+import json
 import logging
 import shutil
+import threading
 import jinja2
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, Union
+
+from slides_to_textbook.modules.latex_components import BibliographyManager
+from slides_to_textbook.utils.cache import default_cache_dir
+from slides_to_textbook.utils.file_utils import atomic_write_chunks_if_changed, atomic_write_text, hash_file
+
+BUILD_MANIFEST = ".build_manifest.json"
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
+TEMPLATES = ("main.tex.jinja2", "chapter.tex.jinja2")
+
+
+@functools.lru_cache(maxsize=None)
+def get_template_env(cache_dir: Optional[Path] = None) -> jinja2.Environment:
+    """
+    The Jinja environment shared by every LaTeXBuilder in the process.
+
+    Parsed templates stay in the environment's cache, and compiled bytecode
+    is cached on disk (<cache_dir>/jinja, default_cache_dir() if not given)
+    so new processes skip compilation. One environment per cache dir.
+    """
+    bytecode_cache = None
+    cache_dir = (Path(cache_dir) if cache_dir else default_cache_dir()) / "jinja"
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(str(cache_dir))
+    except OSError as e:
+        logging.getLogger(__name__).warning(f"Template bytecode cache disabled: {e}")
+
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(str(TEMPLATE_DIR)),
+        bytecode_cache=bytecode_cache,
+        variable_start_string='<<',
+        variable_end_string='>>',
+        block_start_string='((*',
+        block_end_string='*))',
+        comment_start_string='<#',
+        comment_end_string='#>'
+    )
+    for name in TEMPLATES:
+        env.get_template(name)
+    return env
+
 
 class LaTeXBuilder:
-    def __init__(self, output_dir: Path):
+    """
+    Renders main.tex, the chapter files and bibliography.bib.
+
+    Files are only written when their rendered content changed, atomically,
+    so unchanged files keep their mtime (no sync churn, no needless
+    recompiles). Hashes of what was written are kept in .build_manifest.json;
+    a no-op rebuild touches nothing, not even the manifest.
+    """
+    def __init__(self, output_dir: Path, cache_dir: Optional[Path] = None):
         self.logger = logging.getLogger(__name__)
-        self.output_dir = output_dir
+        self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._manifest_lock = threading.Lock()
+        self._manifest = self._load_manifest()
         
-        # Setup Jinja
-        template_dir = Path(__file__).parent.parent / "templates"
-        self.env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(str(template_dir)),
-            variable_start_string='<<',
-            variable_end_string='>>',
-            block_start_string='((*',
-            block_end_string='*))',
-            comment_start_string='<#',
-            comment_end_string='#>'
-        )
+        self.env = get_template_env(cache_dir)
 
-    def build_book(self, book_title: str, chapters: List[Dict[str, Any]]):
+    def build_book(self, book_title: str, chapters: List[Dict[str, Any]]) -> bool:
         """
-        Assemble the main.tex file.
+        Assemble the main.tex file. Returns True if it was (re)written.
         """
         self.logger.info(f"Building book: {book_title}")
         
@@ -34,32 +78,85 @@ class LaTeXBuilder:
         
         # 2. Render main.tex
         template = self.env.get_template("main.tex.jinja2")
-        rendered = template.render(
-            book_title=book_title,
-            chapters=chapters
-        )
-        
+        context = {"title": book_title, "book_title": book_title, "chapters": chapters}
+
         main_file = self.output_dir / "main.tex"
-        main_file.write_text(rendered)
-        self.logger.info(f"Written main.tex to {main_file}")
+        written = self._write_stream("main.tex", template.generate(**context))
+        if written:
+            self.logger.info(f"Written main.tex to {main_file}")
+        else:
+            self.logger.info(f"main.tex unchanged: {main_file}")
+        return written
 
-    def build_chapter(self, chapter_data: Dict[str, Any]):
+    def build_chapter(self, chapter_data: Dict[str, Any]) -> bool:
         """
-        Write a single chapter file.
+        Write a single chapter file. Returns True if it was (re)written.
         chapter_data must include 'title', 'safe_title', 'content', 'file_name'
         """
         self.logger.info(f"Building chapter: {chapter_data['title']}")
         
         template = self.env.get_template("chapter.tex.jinja2")
-        rendered = template.render(chapter=chapter_data)
-        
+
         # Remove extension from file_name if present for write, 
         # but usage in main.tex typically assumes file without extension or with it.
         # Let's assume file_name has .tex
-        
-        out_file = self.output_dir / chapter_data['file_name']
-        out_file.write_text(rendered)
 
-    def write_bibliography(self, bib_content: str):
-        bib_file = self.output_dir / "bibliography.bib"
-        bib_file.write_text(bib_content)
+        # Chapters can be several hundred KB; stream them instead of rendering to one string
+        return self._write_stream(chapter_data['file_name'], template.generate(chapter=chapter_data))
+
+    def write_bibliography(self, bib_content: Union[str, BibliographyManager]) -> bool:
+        """Write bibliography.bib from a string or, streamed entry by entry, a BibliographyManager."""
+        if isinstance(bib_content, BibliographyManager):
+            return self._write_stream("bibliography.bib", bib_content.iter_bibtex())
+        return self._write("bibliography.bib", bib_content)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.output_dir / BUILD_MANIFEST
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """{file name: {"sha256", "size", "mtime_ns"}} of files this builder wrote."""
+        try:
+            return json.loads(self.manifest_path.read_text(encoding="utf-8")).get("files", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _unchanged(self, name: str, digest: str) -> bool:
+        """True if output_dir/name already holds content with this digest."""
+        path = self.output_dir / name
+        known = self._manifest.get(name)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        if known and (known["size"], known["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return known["sha256"] == digest
+        # Edited outside the builder (or not in the manifest yet): compare contents
+        return hash_file(path) == digest
+
+    def _write(self, name: str, text: str) -> bool:
+        """Write text to output_dir/name unless it already has that content."""
+        return self._write_stream(name, [text])
+
+    def _write_stream(self, name: str, chunks: Iterable[str]) -> bool:
+        """
+        Write chunks to output_dir/name unless it already has that content.
+
+        The chunks are rendered once, streamed into a temporary file and
+        hashed on the way; the temporary file replaces the old one only if
+        the hash differs, so the full text is never held in memory and an
+        unchanged file keeps its mtime.
+        """
+        path = self.output_dir / name
+        digest, written = atomic_write_chunks_if_changed(
+            path,
+            (chunk.encode("utf-8") for chunk in chunks),
+            lambda digest: self._unchanged(name, digest)
+        )
+        stat = path.stat()
+        entry = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        with self._manifest_lock:
+            if self._manifest.get(name) != entry:
+                self._manifest[name] = entry
+                atomic_write_text(self.manifest_path, json.dumps({"files": self._manifest}, indent=2, sort_keys=True))
+        return written
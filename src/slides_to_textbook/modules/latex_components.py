@@ -1,4 +1,27 @@
-from typing import List, Dict, Any
+import io
+import json
+import re
+import unicodedata
+from pathlib import Path
+from typing import List, Dict, Any, Container, Iterable, Iterator, Optional, Set, TextIO, Tuple, Union
+
+from slides_to_textbook.utils.file_utils import atomic_write_text
+
+DB_VERSION = 1
+
+# BibTeX/LaTeX specials escaped in field values, unless already escaped or
+# inside $...$ math
+_BIBTEX_SPECIALS = re.compile(r"(\$[^$]*\$)|(?<!\\)([&%#_])")
+_NEEDS_ESCAPE = re.compile(r"[&%#_]")
+# Fields written verbatim (typeset with \url or resolved as-is)
+VERBATIM_FIELDS = {"url", "doi", "eprint"}
+_SKIP_FIELDS = {"ID", "entry_type"}
+
+# \cite, \citep, \citet*, \citep[see][p. 3]{a,b}, \nocite{...}
+_CITE = re.compile(r"\\(?:no)?cite[a-zA-Z]*\*?(?:\s*\[[^\]]*\]){0,2}\s*\{([^}]*)\}")
+_BIB_ENTRY = re.compile(r"@(\w+)\s*\{\s*([^,\s]+)\s*,")
+_BIB_FIELD = re.compile(r"\s*([\w-]+)\s*=\s*")
+
 
 class MarginNoteGenerator:
     def generate_note(self, content: str, image_path: str = "", caption: str = "") -> str:
@@ -23,24 +46,292 @@ class MarginNoteGenerator:
         return self.generate_note(bio, image_path, person_name)
 
 
+def normalize_title(title: str) -> str:
+    """'{Deep} Learning.' and 'deep learning' -> 'deep learning'"""
+    ascii_title = unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.findall(r"[a-z0-9]+", ascii_title.lower()))
+
+
+def normalize_doi(doi: str) -> str:
+    """'https://doi.org/10.1038/Nature14539' -> '10.1038/nature14539'"""
+    doi = doi.strip().lower()
+    return re.sub(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", "", doi)
+
+
+def escape_bibtex(value: str) -> str:
+    """'R&D 100%' -> 'R\\&D 100\\%' ('$x_1$' is left alone)"""
+    if not _NEEDS_ESCAPE.search(value):
+        return value
+    return _BIBTEX_SPECIALS.sub(lambda m: m.group(1) or f"\\{m.group(2)}", value)
+
+
+def iter_citations(text: str) -> Iterator[Tuple[str, int]]:
+    """(key, offset) for every key of every \\cite-like command in text."""
+    for match in _CITE.finditer(text):
+        offset = match.start(1)
+        for part in match.group(1).split(","):
+            key = part.strip()
+            if key:
+                yield key, offset + part.index(key[0])
+            offset += len(part) + 1
+
+
+def rename_citations(text: str, renames: Dict[str, str]) -> str:
+    """Replace citation keys in every \\cite-like command of text (old key -> new key)."""
+    parts = []
+    last = 0
+    for key, offset in iter_citations(text):
+        if key in renames:
+            parts.append(text[last:offset])
+            parts.append(renames[key])
+            last = offset + len(key)
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+def cited_keys(text: str) -> List[str]:
+    """Citation keys used in text, in order of first use."""
+    return list(dict.fromkeys(key for key, _ in iter_citations(text)))
+
+
+def _braced(text: str, start: int) -> Tuple[str, int]:
+    """Content of the {...} or "..." group at start and the index after it."""
+    if text[start] == '"':
+        end = text.index('"', start + 1)
+        return text[start + 1:end], end + 1
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == "{":
+            depth += 1
+        elif text[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:i], i + 1
+    raise ValueError(f"Unbalanced braces at offset {start}")
+
+
+def parse_bibtex(text: str) -> List[Dict[str, Any]]:
+    """
+    Entries of a .bib file as BibliographyManager dicts (entry_type, ID, fields).
+
+    Handles braced, quoted and bare (numbers, macros) values; @comment,
+    @string and @preamble blocks are skipped.
+    """
+    entries = []
+    for match in _BIB_ENTRY.finditer(text):
+        entry_type = match.group(1).lower()
+        if entry_type in ("comment", "string", "preamble"):
+            continue
+        entry: Dict[str, Any] = {"entry_type": entry_type, "ID": match.group(2)}
+        pos = match.end()
+        while True:
+            field = _BIB_FIELD.match(text, pos)
+            if not field:
+                break
+            pos = field.end()
+            if text[pos] in '{"':
+                value, pos = _braced(text, pos)
+            else:
+                bare = re.match(r"[^,}\s]+", text[pos:])
+                value = bare.group(0) if bare else ""
+                pos += len(value)
+            entry[field.group(1).lower()] = " ".join(value.split())
+            comma = re.match(r"\s*,", text[pos:])
+            if not comma:
+                break
+            pos += comma.end()
+        entries.append(entry)
+    return entries
+
+
+def _suffix(n: int) -> str:
+    """1 -> 'a', 26 -> 'z', 27 -> 'aa'"""
+    letters = ""
+    while n:
+        n, rest = divmod(n - 1, 26)
+        letters = chr(ord("a") + rest) + letters
+    return letters
+
+
 class BibliographyManager:
-    def __init__(self):
+    """
+    Indexed store of the book's bibliography entries.
+
+    Entries are indexed by key and by identity (normalized DOI, title+year),
+    so adding a citation is O(1): a citation already in the store (same DOI,
+    or same title and year, e.g. cited by several chapters) is merged into the existing
+    entry and keeps its key. When either side has no year, the title alone
+    matches. A new entry whose firstauthorYear key is
+    taken gets the next free suffix (Hinton2006, Hinton2006a, Hinton2006b).
+
+    The .bib output is streamed entry by entry in key order; each entry's
+    serialized form is cached until the entry changes through the manager.
+
+    With a path the store is a persistent per-book database (JSON) that
+    chapters add to incrementally across runs; prune() drops entries no
+    chapter cites any more.
+
+    Args:
+        path: Optional JSON database to load from and save to
+    """
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else None
         self.entries = []
+        # Cited keys the .bib was last written for
+        self.used: List[str] = []
+        # Keys of entries added or changed since the last load/save
+        self.changed: Set[str] = set()
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self._by_identity: Dict[str, str] = {}   # "doi:..." / "title:...:year" -> key
+        self._by_title: Dict[str, List[str]] = {}  # normalized title -> keys
+        self._next_suffix: Dict[str, int] = {}   # base key -> next suffix number
+        self._bibtex: Dict[str, str] = {}        # key -> serialized entry
+        if self.path and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._by_key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._by_key.get(key)
+
+    @staticmethod
+    def _identities(entry: Dict[str, Any]) -> List[str]:
+        identities = []
+        if entry.get('doi'):
+            identities.append(f"doi:{normalize_doi(str(entry['doi']))}")
+        if entry.get('title'):
+            title = normalize_title(str(entry['title']))
+            if title:
+                # Same-titled works ('Deep Learning' 2015 vs 2016) stay apart
+                identities.append(f"title:{title}:{entry.get('year') or ''}")
+        return identities
+
+    def _lookup(self, entry: Dict[str, Any]) -> Optional[str]:
+        """Key of the stored entry that entry is a duplicate of, if any."""
+        for identity in self._identities(entry):
+            key = self._by_identity.get(identity)
+            if key is not None:
+                return key
+        if entry.get('title'):
+            # Without a year on either side the title alone decides
+            for key in self._by_title.get(normalize_title(str(entry['title'])), ()):
+                if not entry.get('year') or not self._by_key[key].get('year'):
+                    return key
+        return None
+
+    def _index_title(self, key: str, entry: Dict[str, Any]):
+        if entry.get('title'):
+            keys = self._by_title.setdefault(normalize_title(str(entry['title'])), [])
+            if key not in keys:
+                keys.append(key)
+
+    def find(self, title: Optional[str] = None, doi: Optional[str] = None,
+             year: Optional[str] = None) -> Optional[str]:
+        """
+        Key of the entry with this DOI or (normalized) title and year, if any.
+        Without a year, the first entry with that title matches.
+        """
+        return self._lookup({'title': title, 'doi': doi, 'year': year})
 
     def add_entry(self, entry: Dict[str, Any]):
         """
-        Add a citation entry.
+        Add a citation entry and return its key.
         entry dict should have: entry_type, title, author, year, url, etc.
+        An explicit 'ID' is kept unless another entry already uses it.
         """
-        # Create a unique key
-        key = self._generate_key(entry)
+        identities = self._identities(entry)
+        key = self._lookup(entry)
+        if key is not None:
+            self._merge(key, entry, identities)
+            return key
+
+        entry = dict(entry)
+        key = entry.get('ID')
+        if not key or key in self._by_key:
+            key = self._unique_key(self._generate_key(entry))
         entry['ID'] = key
+        self.changed.add(key)
         self.entries.append(entry)
+        self._by_key[key] = entry
+        for identity in identities:
+            self._by_identity[identity] = key
+        self._index_title(key, entry)
+        return key
+
+    def add_entries(self, entries: Iterable[Dict[str, Any]]) -> List[str]:
+        """Add many entries in one pass; returns their keys in order."""
+        return [self.add_entry(entry) for entry in entries]
+
+    def _merge(self, key: str, entry: Dict[str, Any], identities: List[str]):
+        """Fill fields the stored entry lacks from a duplicate of it."""
+        existing = self._by_key[key]
+        for field, value in entry.items():
+            if field != 'ID' and value not in (None, "", []) and not existing.get(field):
+                existing[field] = value
+                self._bibtex.pop(key, None)
+                self.changed.add(key)
+        for identity in identities + self._identities(existing):
+            self._by_identity.setdefault(identity, key)
+        self._index_title(key, existing)
+
+    def prune(self, used: Iterable[str]) -> List[str]:
+        """Remove every entry whose key is not in used; returns the removed keys."""
+        used = set(used)
+        removed = [e['ID'] for e in self.entries if e['ID'] not in used]
+        if removed:
+            self.entries = [e for e in self.entries if e['ID'] in used]
+            for key in removed:
+                del self._by_key[key]
+                self._bibtex.pop(key, None)
+            self._by_identity = {i: k for i, k in self._by_identity.items() if k in used}
+            self._by_title = {t: kept for t, keys in self._by_title.items()
+                              if (kept := [k for k in keys if k in used])}
+            self.changed &= used
+        return removed
+
+    def load(self):
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        self.add_entries(data.get("entries", []))
+        self.used = list(data.get("used", []))
+        self.changed.clear()
+
+    def save(self, path: Optional[Union[str, Path]] = None) -> Path:
+        path = Path(path) if path else self.path
+        if path is None:
+            raise ValueError("No path given for the bibliography database")
+        data = {"v": DB_VERSION, "used": self.used, "entries": [self._by_key[k] for k in sorted(self._by_key)]}
+        atomic_write_text(path, json.dumps(data, indent=1, ensure_ascii=False))
+        self.changed.clear()
+        return path
+
+    def free_key(self, entry: Dict[str, Any], taken: Container[str] = ()) -> str:
+        """
+        A key for entry that is neither used in the store nor in taken, without
+        adding or reserving anything (safe to call from several threads).
+        """
+        base = self._generate_key(entry)
+        key, n = base, 0
+        while key in self._by_key or key in taken:
+            n += 1
+            key = f"{base}{_suffix(n)}"
         return key
 
+    def _unique_key(self, base: str) -> str:
+        if base not in self._by_key:
+            return base
+        n = self._next_suffix.get(base, 1)
+        while f"{base}{_suffix(n)}" in self._by_key:
+            n += 1
+        self._next_suffix[base] = n + 1
+        return f"{base}{_suffix(n)}"
+
     def _generate_key(self, entry: Dict[str, Any]) -> str:
         """Generate firstauthorYear key."""
-        authors = entry.get('author', ['Unknown'])
+        authors = entry.get('author') or ['Unknown']
         if isinstance(authors, list):
             first_author = authors[0].split()[-1] # Last name
         elif isinstance(authors, str):
@@ -52,36 +343,52 @@ class BibliographyManager:
             
         year = str(entry.get('year', '2026'))
         # Clean
-        import re
-        first_author = re.sub(r'[^a-zA-Z]', '', first_author)
+        first_author = re.sub(r'[^a-zA-Z]', '', first_author) or "Unknown"
         return f"{first_author}{year}"
 
-    def generate_bibtex(self) -> str:
-        """
-        Generate the full .bib file content.
-        Using bibtexparser or manual string formatting. Manual is often safer for simple needs.
-        """
-        bib_content = ""
-        for e in self.entries:
-            etype = e.get('entry_type', 'misc')
-            key = e['ID']
-            bib_content += f"@{etype}{{{key},\n"
-            
+    def format_entry(self, key: str) -> str:
+        """The BibTeX text of one entry (cached)."""
+        text = self._bibtex.get(key)
+        if text is None:
+            e = self._by_key[key]
+            parts = [f"@{e.get('entry_type', 'misc')}{{{key},\n"]
             for field, value in e.items():
-                if field in ['ID', 'entry_type']: continue
+                if field in _SKIP_FIELDS or value is None or value == "" or value == []:
+                    continue
                 if field == 'author':
                     # Ensure "Name1 and Name2" format
                     if isinstance(value, list):
-                        bib_content += f"  author = {{' and '.join(value)}},\n"
-                    elif '; ' in str(value):
-                        # Fix "Name; Name" -> "Name and Name"
-                        fixed_val = str(value).replace('; ', ' and ')
-                        bib_content += f"  author = {{{fixed_val}}},\n"
+                        value = ' and '.join(value)
                     else:
-                        bib_content += f"  author = {{{value}}},\n"
+                        # Fix "Name; Name" -> "Name and Name"
+                        value = str(value).replace('; ', ' and ')
                 else:
-                    # Escape tex special chars if needed, simplified here
-                    bib_content += f"  {field} = {{{value}}},\n"
-            
-            bib_content += "}\n\n"
-        return bib_content
+                    value = str(value)
+                if field not in VERBATIM_FIELDS:
+                    value = escape_bibtex(value)
+                parts.append(f"  {field} = {{{value}}},\n")
+            parts.append("}\n\n")
+            text = self._bibtex[key] = "".join(parts)
+        return text
+
+    def iter_bibtex(self, keys: Optional[Iterable[str]] = None) -> Iterator[str]:
+        """Serialized entries (all, or those in keys) in stable (key) order."""
+        selected = self._by_key if keys is None else set(keys) & self._by_key.keys()
+        for key in sorted(selected):
+            yield self.format_entry(key)
+
+    def write_bibtex(self, fh: TextIO, keys: Optional[Iterable[str]] = None) -> int:
+        """Stream the .bib content to a text file handle; returns the entry count."""
+        count = 0
+        for text in self.iter_bibtex(keys):
+            fh.write(text)
+            count += 1
+        return count
+
+    def generate_bibtex(self) -> str:
+        """
+        Generate the full .bib file content.
+        """
+        buffer = io.StringIO()
+        self.write_bibtex(buffer)
+        return buffer.getvalue()
@@ -0,0 +1,250 @@
+"""
+Margin Scheduler Module
+
+Spreads portrait margin notes (\\automarginnote) over a chapter so they do
+not pile up in the margin. Every mention of every person is indexed in one
+pass with a MultiPatternMatcher, then notes are placed greedily in order of
+first mention: each goes to the earliest mention of its person that keeps
+at least min_spacing lines to every note placed so far, or, if none does,
+to the mention farthest from its neighbours. Placed lines are kept sorted,
+so each candidate is checked with a binary search.
+"""
+
+import bisect
+import itertools
+import logging
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from slides_to_textbook.modules.people_registry import PeopleRegistry
+from slides_to_textbook.utils.file_utils import atomic_write_text
+from slides_to_textbook.utils.text_matching import MultiPatternMatcher
+
+# Start of a margin note and the image it shows
+_NOTE_START = re.compile(r"\\automarginnote\s*\{")
+_GRAPHIC = re.compile(r"\\includegraphics\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}")
+_CAMEL = re.compile(r"([a-z])([A-Z])")
+PORTRAIT_DIR = "Portraits"
+
+
+def is_portrait_path(image: str) -> bool:
+    """'Portraits/Ch/AlanTuring_Painting.png' -> True, 'Figures/Fig-SVM.png' -> False"""
+    return PORTRAIT_DIR in Path(image).parts
+
+
+def _camel_words(name: str) -> List[str]:
+    """'YannLeCun' -> ['Yann', 'Le', 'Cun']"""
+    return _CAMEL.sub(r"\1 \2", name).split()
+
+
+def _group_end(text: str, start: int) -> int:
+    """Index after the brace group opened at text[start] ('{'), or -1 if unbalanced."""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == "{":
+            depth += 1
+        elif text[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+def extract_margin_notes(
+    text: str,
+    is_portrait: Callable[[str], bool] = is_portrait_path
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Remove every portrait margin note from text.
+
+    A note is a portrait note if is_portrait(image path) is true (by default,
+    images under Portraits/); other margin notes, such as figures, stay put.
+
+    Returns:
+        (text without the notes, [{"command", "image", "line"}]) where line
+        is the 0-based line the note was on
+    """
+    notes = []
+    parts = []
+    pos = 0
+    line, counted = 0, 0
+    for match in _NOTE_START.finditer(text):
+        if match.start() < pos:
+            continue  # nested inside the previous note
+        end = _group_end(text, match.end() - 1)
+        if end < 0:
+            break
+        command = text[match.start():end]
+        graphic = _GRAPHIC.search(command)
+        if graphic is None or not is_portrait(graphic.group(1)):
+            continue
+        line += text.count("\n", counted, match.start())
+        counted = match.start()
+        notes.append({"command": command, "image": graphic.group(1), "line": line})
+        parts.append(text[pos:match.start()])
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts), notes
+
+
+class MarginNoteScheduler:
+    """
+    Place margin notes near mentions of their person, min_spacing lines apart.
+
+    Args:
+        min_spacing: Desired minimum number of lines between two notes
+        registry: Optional PeopleRegistry; its aliases count as mentions and
+            it maps portrait filenames to names
+    """
+
+    def __init__(self, min_spacing: int = 40, registry: Optional[PeopleRegistry] = None):
+        self.logger = logging.getLogger(__name__)
+        self.min_spacing = min_spacing
+        self.registry = registry
+
+    def name_for_image(self, image: str) -> str:
+        """'Portraits/Ch/YannLeCun_Painting.png' -> 'Yann LeCun'"""
+        if self.registry is not None:
+            person_id = self.registry.from_filename(image)
+            if person_id:
+                return self.registry.name(person_id)
+        words = _camel_words(Path(image).stem.split("_", 1)[0])
+        # A short piece between two words is a surname prefix: Le Cun -> LeCun, Mc Carthy -> McCarthy
+        for i in range(len(words) - 2, 0, -1):
+            if len(words[i]) <= 2:
+                words[i:i + 2] = [words[i] + words[i + 1]]
+        return " ".join(words)
+
+    def is_portrait(self, image: str) -> bool:
+        """Image under Portraits/ or, with a registry, named after a known person."""
+        if is_portrait_path(image):
+            return True
+        return self.registry is not None and self.registry.from_filename(image) is not None
+
+    def _spellings(self, name: str) -> List[str]:
+        if self.registry is not None:
+            person_id = self.registry.resolve(name)
+            if person_id:
+                return [self.registry.name(person_id), *self.registry.aliases(person_id)]
+        # Without a registry the filename is the only source of the name, so
+        # accept every spacing of its camel-case pieces (Yann LeCun, Yann Le Cun)
+        words = _camel_words(name)
+        if not 1 < len(words) <= 6:
+            return [name]
+        spellings = [name]
+        for gaps in itertools.product((" ", ""), repeat=len(words) - 1):
+            spellings.append(words[0] + "".join(gap + word for gap, word in zip(gaps, words[1:])))
+        return list(dict.fromkeys(spellings))
+
+    def index_mentions(self, lines: List[str], names: Iterable[str]) -> Dict[str, List[int]]:
+        """{name: sorted line numbers mentioning the name (or an alias)}, in one pass."""
+        names = list(dict.fromkeys(names))
+        patterns, owners = [], []
+        for name in names:
+            for spelling in self._spellings(name):
+                patterns.append(spelling)
+                owners.append(name)
+        mentions: Dict[str, List[int]] = {name: [] for name in names}
+        if not patterns:
+            return mentions
+
+        text = "\n".join(lines)
+        line_starts = [0]
+        for line in lines[:-1]:
+            line_starts.append(line_starts[-1] + len(line) + 1)
+        matcher = MultiPatternMatcher(patterns, case_sensitive=True)
+        for start, _, pattern_id in matcher.iter_matches(text):
+            line = bisect.bisect_right(line_starts, start) - 1
+            found = mentions[owners[pattern_id]]
+            if not found or found[-1] != line:
+                found.append(line)
+        for name, found in mentions.items():
+            # Matches arrive in end order, so alias hits can be out of order
+            mentions[name] = sorted(set(found))
+        return mentions
+
+    def schedule(
+        self,
+        lines: List[str],
+        notes: Mapping[str, str],
+        fallback_lines: Optional[Mapping[str, int]] = None
+    ) -> Dict[int, List[str]]:
+        """
+        Choose a line for every note.
+
+        Args:
+            lines: Chapter lines (without notes)
+            notes: {person name: note command}, e.g. from
+                MarginNoteGenerator.generate_person_note
+            fallback_lines: Line to use for a person never mentioned in lines
+
+        Returns:
+            {line: [note commands]}
+        """
+        fallback_lines = fallback_lines or {}
+        mentions = self.index_mentions(lines, notes)
+        order = []
+        for name in notes:
+            slots = mentions[name] or ([fallback_lines[name]] if name in fallback_lines else [])
+            if not slots:
+                self.logger.warning(f"No placement slot for {name}'s margin note")
+                continue
+            order.append((slots[0], name, slots))
+        order.sort(key=lambda item: item[0])
+
+        placed: List[int] = []
+        placements: Dict[int, List[str]] = {}
+        for _, name, slots in order:
+            line = self._choose(slots, placed)
+            bisect.insort(placed, line)
+            placements.setdefault(line, []).append(notes[name])
+            self.logger.debug(f"Margin note for {name} at line {line + 1} ({len(slots)} mentions)")
+        return placements
+
+    def _choose(self, slots: List[int], placed: List[int]) -> int:
+        """Earliest slot at least min_spacing from every placed line, else the most isolated slot."""
+        best, best_gap = slots[0], -1
+        for slot in slots:
+            i = bisect.bisect_left(placed, slot)
+            gap = min(
+                slot - placed[i - 1] if i > 0 else float("inf"),
+                placed[i] - slot if i < len(placed) else float("inf"),
+            )
+            if gap >= self.min_spacing:
+                return slot
+            if gap > best_gap:
+                best, best_gap = slot, gap
+        return best
+
+    def apply(self, text: str, notes: Mapping[str, str], fallback_lines: Optional[Mapping[str, int]] = None) -> str:
+        """Text with each note appended to the line schedule() chose for it."""
+        lines = text.split("\n")
+        placements = self.schedule(lines, notes, fallback_lines)
+        for line, commands in placements.items():
+            lines[line] = lines[line].rstrip() + "".join(commands)
+        return "\n".join(lines)
+
+    def reschedule(self, text: str) -> str:
+        """
+        Redistribute the portrait notes already in a chapter.
+
+        Notes are pulled out and placed again; each person's note is kept
+        once. A person the text never names stays on its original line.
+        """
+        body, found = extract_margin_notes(text, self.is_portrait)
+        notes: Dict[str, str] = {}
+        original: Dict[str, int] = {}
+        for note in found:
+            name = self.name_for_image(note["image"])
+            if name not in notes:
+                notes[name] = note["command"]
+                original[name] = note["line"]
+        return self.apply(body, notes, original)
+
+    def reschedule_file(self, path: Path) -> str:
+        """reschedule() a chapter file in place; returns the new text."""
+        path = Path(path)
+        text = self.reschedule(path.read_text(encoding="utf-8"))
+        atomic_write_text(path, text)
+        return text
@@ -0,0 +1,163 @@
+"""
+People Registry Module
+
+Canonical identities for the people mentioned in a book. Every person has a
+canonical ID ('yann-lecun'), a display name and any number of aliases.
+Lookups by name, alias, bare surname or portrait filename are single dict
+lookups, so 'Hinton', 'Geoffrey Hinton' and 'GeoffreyHinton_Painting.png'
+all resolve to the same person, and 'YannLeCun' never becomes 'Yann Le Cun'.
+
+The registry persists as a compact JSON index: {"v": 1, "people": {id: [name, *aliases]}}.
+"""
+
+import json
+import logging
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from slides_to_textbook.utils.file_utils import atomic_write_text
+
+INDEX_VERSION = 1
+
+
+def person_key(name: str) -> str:
+    """
+    Normalize a person's name to a canonical ID.
+
+    'Yann LeCun', 'yann  lecun' and 'Yánn LeCun' all map to 'yann-lecun'.
+    """
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    words = re.findall(r"[a-z0-9]+", ascii_name.lower())
+    return "-".join(words) or "unknown"
+
+
+def compact_key(name: str) -> str:
+    """Key without word boundaries: 'Yann Le Cun', 'YannLeCun' -> 'yannlecun'."""
+    return person_key(name).replace("-", "")
+
+
+def _filename_stem(filename: str) -> str:
+    """'Portraits/Ch/YannLeCun_Painting.png' -> 'YannLeCun'"""
+    stem = Path(filename).stem
+    return stem.split("_", 1)[0] if "_" in stem else stem
+
+
+class PeopleRegistry:
+    """
+    Registry of people with alias, surname and filename indexes.
+
+    Args:
+        path: Optional JSON index to load from and save to
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path) if path else None
+        self._lock = threading.RLock()
+        self._people: Dict[str, List[str]] = {}  # id -> [name, *aliases]
+        self._by_key: Dict[str, str] = {}        # person_key(name or alias) -> id
+        self._by_compact: Dict[str, str] = {}    # compact_key(name or alias) -> id
+        self._by_surname: Dict[str, Set[str]] = {}
+        if self.path and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._people)
+
+    def __contains__(self, name: str) -> bool:
+        return self.resolve(name) is not None
+
+    def _index(self, person_id: str, name: str):
+        self._by_key.setdefault(person_key(name), person_id)
+        self._by_compact.setdefault(compact_key(name), person_id)
+        words = person_key(name).split("-")
+        if len(words) > 1:
+            self._by_surname.setdefault(words[-1], set()).add(person_id)
+
+    def add(self, name: str, aliases: Iterable[str] = ()) -> str:
+        """
+        Register a person (or new aliases of a known one) and return the ID.
+
+        A name that already resolves exactly (by name, alias or compact form)
+        joins that person; surname-only matches never merge on add.
+        """
+        with self._lock:
+            person_id = self._by_key.get(person_key(name)) or self._by_compact.get(compact_key(name))
+            if person_id is None:
+                person_id = person_key(name)
+                self._people[person_id] = [name]
+                self._index(person_id, name)
+            for alias in aliases:
+                if alias not in self._people[person_id]:
+                    self._people[person_id].append(alias)
+                    self._index(person_id, alias)
+            return person_id
+
+    def resolve(self, name: str, surnames: bool = True) -> Optional[str]:
+        """
+        ID for a name, alias, bare surname or portrait filename (None if unknown).
+
+        A bare surname resolves only when exactly one known person has it,
+        and only with surnames=True.
+        """
+        key = person_key(name)
+        person_id = self._by_key.get(key) or self._by_compact.get(key.replace("-", ""))
+        if person_id is None and surnames and "-" not in key:
+            candidates = self._by_surname.get(key, ())
+            if len(candidates) == 1:
+                person_id = next(iter(candidates))
+        return person_id
+
+    def from_filename(self, filename: str) -> Optional[str]:
+        """ID for a portrait filename such as 'YannLeCun_Painting.png'."""
+        return self.resolve(_filename_stem(filename))
+
+    def name(self, person_id: str) -> str:
+        return self._people[person_id][0]
+
+    def aliases(self, person_id: str) -> List[str]:
+        return list(self._people[person_id][1:])
+
+    def canonical_name(self, name: str) -> str:
+        """Display name of the person name refers to, or name itself if unknown."""
+        person_id = self.resolve(name)
+        return self.name(person_id) if person_id else name
+
+    def canonicalize(self, names: Iterable[str]) -> List[str]:
+        """
+        Deduplicated canonical names, in order of first mention.
+
+        Full names are registered first, so a bare surname elsewhere in the
+        list folds into the matching full name.
+        """
+        names = list(names)
+        with self._lock:
+            for name in names:
+                if len(person_key(name).split("-")) > 1:
+                    self.add(name)
+            ids = [self.resolve(name) or self.add(name) for name in names]
+        return [self.name(person_id) for person_id in dict.fromkeys(ids)]
+
+    def filename(self, name: str, style: str = "Painting", suffix: str = ".png") -> str:
+        """Portrait filename for the canonical name: 'Yann LeCun' -> 'YannLeCun_Painting.png'."""
+        return f"{self.canonical_name(name).replace(' ', '')}_{style}{suffix}"
+
+    def load(self):
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        with self._lock:
+            for person_id, names in data.get("people", {}).items():
+                self._people[person_id] = list(names)
+                for name in names:
+                    self._index(person_id, name)
+
+    def save(self, path: Optional[Union[str, Path]] = None) -> Path:
+        path = Path(path) if path else self.path
+        if path is None:
+            raise ValueError("No path given for the people index")
+        with self._lock:
+            data = {"v": INDEX_VERSION, "people": self._people}
+            text = json.dumps(data, separators=(",", ":"), ensure_ascii=False, sort_keys=True)
+        return atomic_write_text(path, text)
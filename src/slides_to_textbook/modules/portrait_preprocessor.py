@@ -2,27 +2,152 @@
 Portrait Preprocessor Module
 
 Extracts names of historical figures and scientists from PDF lecture slides
-or LaTeX chapters to prepare input for the standalone PortraitGenerator CLI.
+or LaTeX chapters and generates their portraits with PortraitService.
 
 This module creates the bridge between PDF analysis and portrait generation.
 """
 
 import logging
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 import pdfplumber
 import re
 
+from slides_to_textbook.modules.people_registry import PeopleRegistry
+from slides_to_textbook.modules.portrait_service import EXISTS, GENERATED, LINKED, PortraitService
+
+# AI name extraction works on overlapping chunks so long documents are
+# covered end to end; the overlap keeps names on a boundary whole in one chunk.
+AI_CHUNK_SIZE = 12000
+AI_CHUNK_OVERLAP = 400
+
+# Cheap prefilter: two capitalized words in a row, or a citation command
+_NAME_CANDIDATE = re.compile(r"\b[A-Z][a-z]+\.?\s+(?:[A-Z]\.\s*)*[A-Z][A-Za-z'\-]+|\\cite")
+
+
+def chunk_text(content: str, size: int = AI_CHUNK_SIZE, overlap: int = AI_CHUNK_OVERLAP) -> List[str]:
+    """
+    Split content into chunks of at most size characters, consecutive chunks
+    sharing about overlap characters. Chunks end at whitespace where possible.
+    """
+    if len(content) <= size:
+        return [content] if content else []
+
+    chunks = []
+    start = 0
+    while True:
+        end = min(start + size, len(content))
+        if end < len(content):
+            brk = max(content.rfind(" ", end - overlap, end), content.rfind("\n", end - overlap, end))
+            if brk > start + overlap:
+                end = brk
+        chunks.append(content[start:end])
+        if end >= len(content):
+            return chunks
+        start = end - overlap
+
+
+def has_name_candidates(text: str) -> bool:
+    """True if text could mention a person (capitalized word pair or citation)."""
+    return _NAME_CANDIDATE.search(text) is not None
+
+
+class PatternNameExtractor:
+    """
+    Regex-based person extraction (the fallback when AI is unavailable).
+
+    Patterns are compiled once and the stop-phrase set is frozen, so one
+    instance can be reused across chapters and threads. A single combined
+    scan finds both kinds of candidate:
+
+    - Names with dates: "Arthur Samuel (1901-1990)" or "Geoffrey Hinton (1947-)"
+    - Names followed by biographical context: "Arthur Samuel developed", "Hinton's"
+    """
+
+    STOP_PHRASES = frozenset({
+        'Machine Learning', 'Deep Learning', 'Neural Networks',
+        'Artificial Intelligence', 'Computer Science', 'Data Science',
+        'Supervised Learning', 'Unsupervised Learning', 'Reinforcement Learning',
+        'Natural Language', 'Pattern Recognition', 'Computer Vision',
+        'Decision Trees', 'Random Forests', 'Support Vector',
+        'K Nearest', 'Logistic Regression', 'Linear Regression',
+        'Cross Validation', 'Feature Engineering', 'Model Selection',
+        'Training Data', 'Test Data', 'Validation Set',
+        'Fit Metrics', 'Performance Metrics', 'Loss Function',
+        'Excellent Manual', 'Mechanical Automata', 'Component Analysis',
+        'Dimensionality Reduction', 'Principal Component', 'Feature Extraction'
+    })
+
+    # Shared two-word prefix, then either an optional third word and a
+    # birth year, or a biographical cue directly after the second word.
+    PATTERN = re.compile(
+        r"(?P<name>[A-Z][a-z]+ [A-Z][a-z]+)"
+        r"(?:(?P<third>\s+[A-Z][a-z]+)?\s*\((?P<year>\d{4})[–\-]"
+        r"|(?P<cue>'s|,| developed| discovered| invented| proposed| created| introduced))"
+    )
+
+    def iter_candidates(self, content: str) -> Iterator[Tuple[str, str, bool]]:
+        """
+        Stream (name, context, dated) candidates in text order.
+
+        Stop phrases are filtered; duplicates are not.
+        """
+        stop = self.STOP_PHRASES
+        for match in self.PATTERN.finditer(content):
+            year = match.group("year")
+            if year:
+                name = match.group("name") + (match.group("third") or "")
+                if name not in stop:
+                    yield name, f"Born {year}", True
+            else:
+                name = match.group("name")
+                if name not in stop:
+                    # Context: up to 50 chars after the cue, cut at the first period
+                    start = match.end()
+                    end = start + 50
+                    period = content.find('.', start, end)
+                    yield name, content[start:end if period < 0 else period].strip(), False
+
+    def extract(self, content: str) -> List[Dict[str, Any]]:
+        """
+        Unique people in order of first mention. A birth year found anywhere
+        is preferred as context over biographical text.
+        """
+        people: Dict[str, Dict[str, Any]] = {}
+        dated = set()
+        for name, context, has_year in self.iter_candidates(content):
+            if name not in people:
+                people[name] = {"name": name, "context": context}
+            elif has_year and name not in dated:
+                people[name]["context"] = context
+            if has_year:
+                dated.add(name)
+        return list(people.values())
+
+
+PATTERN_EXTRACTOR = PatternNameExtractor()
+
 
 class PortraitPreprocessor:
     """
-    Extracts people names from PDFs or LaTeX files and prepares them
-    for batch portrait generation using the standalone PortraitGenerator CLI.
+    Extracts people names from PDFs or LaTeX files and generates their
+    portraits in-process (see process_and_generate).
+
+    Args:
+        max_ai_calls: Maximum concurrent AI extraction calls made by this
+            instance, however many sources and chunks are processed at once
     """
 
-    def __init__(self):
+    def __init__(self, max_ai_calls: int = 4):
         self.logger = logging.getLogger(__name__)
+        self.max_ai_calls = max(1, max_ai_calls)
+        # Sources and their chunks are processed by nested pools; this
+        # semaphore is what bounds the AI calls across all of them.
+        self._ai_slots = threading.BoundedSemaphore(self.max_ai_calls)
 
     def extract_from_pdf(self, pdf_path: Path, use_ai: bool = True) -> List[Dict[str, Any]]:
         """
@@ -74,6 +199,81 @@ class PortraitPreprocessor:
         self.logger.info(f"Found {len(people)} people in LaTeX")
         return people
 
+    def extract_batch(
+        self,
+        paths: Sequence[Path],
+        use_ai: bool = True,
+        max_workers: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract people from many PDFs and .tex files at once.
+
+        Text extraction and name extraction (one AI call per source) run
+        concurrently. Results are merged into a single list, deduplicated by
+        normalized name, in order of first appearance.
+
+        Args:
+            paths: PDF and .tex files (e.g. every lecture of a course)
+            use_ai: If True, use AI to identify names. If False, use regex patterns.
+            max_workers: Sources processed concurrently
+
+        Returns:
+            List of dicts: [{"name": ..., "context": ..., "sources": [{"source": ..., "context": ...}]}]
+        """
+        paths = [Path(p) for p in paths]
+        for path in paths:
+            if path.suffix.lower() not in ('.pdf', '.tex'):
+                raise ValueError(f"Unsupported file type: {path.suffix}")
+
+        extract = self._extract_with_ai if use_ai else self._extract_with_patterns
+
+        def process(path: Path) -> List[Dict[str, Any]]:
+            try:
+                return extract(self._read_source(path))
+            except Exception as e:
+                self.logger.error(f"People extraction failed for {path}: {e}")
+                return []
+
+        self.logger.info(f"Extracting people from {len(paths)} sources ({max_workers} workers)")
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="people") as pool:
+            per_source = list(pool.map(process, paths))
+
+        people = self._merge_people(zip(paths, per_source))
+        self.logger.info(f"Found {len(people)} unique people across {len(paths)} sources")
+        return people
+
+    def _read_source(self, path: Path) -> str:
+        if path.suffix.lower() == '.pdf':
+            return self._extract_pdf_text(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    @staticmethod
+    def _merge_people(results) -> List[Dict[str, Any]]:
+        """
+        Merge (source, people) pairs into one list of canonical people.
+
+        Names are resolved through a PeopleRegistry, so spelling variants and
+        a bare surname ("Hinton") join the matching full name.
+        """
+        results = [(source, people) for source, people in results]
+        registry = PeopleRegistry()
+        registry.canonicalize(p["name"] for _, people in results for p in people)
+
+        merged: Dict[str, Dict[str, Any]] = {}
+        for source, people in results:
+            for person in people:
+                person_id = registry.resolve(person["name"])
+                entry = merged.setdefault(person_id, {
+                    "name": registry.name(person_id),
+                    "context": "",
+                    "sources": [],
+                })
+                context = person.get("context", "")
+                entry["context"] = entry["context"] or context
+                entry["sources"].append({"source": str(source), "context": context})
+        return list(merged.values())
+
     def _extract_pdf_text(self, pdf_path: Path) -> str:
         """Extract all text from PDF."""
         pages_text = []
@@ -89,6 +289,11 @@ class PortraitPreprocessor:
         """
         Use AI to identify historical figures and scientists mentioned in content.
 
+        The whole content is covered: it is split into overlapping chunks,
+        chunks without any name candidates are skipped, and the rest are sent
+        concurrently (at most max_ai_calls at once across the instance).
+        Results are merged with name canonicalization.
+
         Args:
             content: Text content to analyze
 
@@ -97,8 +302,32 @@ class PortraitPreprocessor:
         """
         from slides_to_textbook.utils.api_clients import AIClient
 
+        chunks = chunk_text(content)
+        candidates = [chunk for chunk in chunks if has_name_candidates(chunk)]
+        if len(candidates) < len(chunks):
+            self.logger.info(f"Skipping {len(chunks) - len(candidates)}/{len(chunks)} chunks without name candidates")
+        if not candidates:
+            return []
+
         client = AIClient()
 
+        def extract(part: int) -> List[Dict[str, Any]]:
+            chunk = candidates[part]
+            try:
+                with self._ai_slots:
+                    return self._extract_chunk_with_ai(client, chunk, part + 1, len(candidates))
+            except Exception as e:
+                self.logger.error(f"AI extraction failed: {e}")
+                # Fallback to pattern-based extraction
+                self.logger.info("Falling back to pattern-based extraction")
+                return self._extract_with_patterns(chunk)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_ai_calls, len(candidates)), thread_name_prefix="names") as pool:
+            results = list(pool.map(extract, range(len(candidates))))
+
+        return self._merge_chunk_people(results)
+
+    def _extract_chunk_with_ai(self, client, chunk: str, part: int, parts: int) -> List[Dict[str, Any]]:
         prompt = f"""
         Analyze the following content and extract a list of all famous scientists,
         researchers, or historical figures mentioned.
@@ -119,44 +348,42 @@ class PortraitPreprocessor:
             ]
         }}
 
-        Content (first 15000 chars):
-        {content[:15000]}
+        Content (part {part} of {parts}):
+        {chunk}
         """
 
         system_prompt = "You are a data extraction agent. Output only valid JSON."
 
-        try:
-            response = client.generate_text(prompt, system_prompt)
+        response = client.generate_text(prompt, system_prompt)
+
+        # Parse JSON (handle markdown code blocks)
+        clean_json = response.strip()
+        if "```json" in clean_json:
+            clean_json = clean_json.split("```json")[1].split("```")[0]
+        elif "```" in clean_json:
+            clean_json = clean_json.split("```")[1].split("```")[0]
+
+        data = json.loads(clean_json)
+        people = data.get("people", [])
+
+        # Validate format
+        validated_people = []
+        for person in people:
+            if isinstance(person, dict) and "name" in person:
+                validated_people.append({
+                    "name": person["name"],
+                    "context": person.get("context", "")
+                })
+            elif isinstance(person, str):
+                # Handle case where AI returns just names
+                validated_people.append({"name": person, "context": ""})
 
-            # Parse JSON (handle markdown code blocks)
-            clean_json = response.strip()
-            if "```json" in clean_json:
-                clean_json = clean_json.split("```json")[1].split("```")[0]
-            elif "```" in clean_json:
-                clean_json = clean_json.split("```")[1].split("```")[0]
+        return validated_people
 
-            data = json.loads(clean_json)
-            people = data.get("people", [])
-
-            # Validate format
-            validated_people = []
-            for person in people:
-                if isinstance(person, dict) and "name" in person:
-                    validated_people.append({
-                        "name": person["name"],
-                        "context": person.get("context", "")
-                    })
-                elif isinstance(person, str):
-                    # Handle case where AI returns just names
-                    validated_people.append({"name": person, "context": ""})
-
-            return validated_people
-
-        except Exception as e:
-            self.logger.error(f"AI extraction failed: {e}")
-            # Fallback to pattern-based extraction
-            self.logger.info("Falling back to pattern-based extraction")
-            return self._extract_with_patterns(content)
+    def _merge_chunk_people(self, results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Merge per-chunk results into canonical people (see _merge_people)."""
+        merged = self._merge_people((None, people) for people in results)
+        return [{"name": p["name"], "context": p["context"]} for p in merged]
 
     def _extract_with_patterns(self, content: str) -> List[Dict[str, Any]]:
         """
@@ -164,7 +391,7 @@ class PortraitPreprocessor:
 
         Looks for patterns like:
         - Capitalized Names followed by dates (Arthur Samuel (1901-1990))
-        - Names in citations
+        - Names followed by biographical context (Arthur Samuel developed...)
 
         Args:
             content: Text to analyze
@@ -172,51 +399,7 @@ class PortraitPreprocessor:
         Returns:
             List of people
         """
-        people = []
-        seen_names = set()
-
-        # Common false positives to filter out
-        false_positives = {
-            'Machine Learning', 'Deep Learning', 'Neural Networks',
-            'Artificial Intelligence', 'Computer Science', 'Data Science',
-            'Supervised Learning', 'Unsupervised Learning', 'Reinforcement Learning',
-            'Natural Language', 'Pattern Recognition', 'Computer Vision',
-            'Decision Trees', 'Random Forests', 'Support Vector',
-            'K Nearest', 'Logistic Regression', 'Linear Regression',
-            'Cross Validation', 'Feature Engineering', 'Model Selection',
-            'Training Data', 'Test Data', 'Validation Set',
-            'Fit Metrics', 'Performance Metrics', 'Loss Function',
-            'Excellent Manual', 'Mechanical Automata', 'Component Analysis',
-            'Dimensionality Reduction', 'Principal Component', 'Feature Extraction'
-        }
-
-        # Pattern 1: Name with dates (birth-death)
-        # Matches: "Arthur Samuel (1901–1990)" or "Geoffrey Hinton (1947-)"
-        date_pattern = r'([A-Z][a-z]+ [A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s*\((\d{4})[–\-]'
-        for match in re.finditer(date_pattern, content):
-            name = match.group(1)
-            if name not in seen_names and name not in false_positives and len(name.split()) >= 2:
-                people.append({
-                    "name": name,
-                    "context": f"Born {match.group(2)}"
-                })
-                seen_names.add(name)
-
-        # Pattern 2: Names followed by biographical context
-        # Matches: "Arthur Samuel developed" or "Hinton's work on"
-        bio_pattern = r'([A-Z][a-z]+ [A-Z][a-z]+)(?:\'s|,| developed| discovered| invented| proposed| created| introduced)'
-        for match in re.finditer(bio_pattern, content):
-            name = match.group(1)
-            if name not in seen_names and name not in false_positives and len(name.split()) >= 2:
-                # Extract context (next 50 chars)
-                start_pos = match.end()
-                context = content[start_pos:start_pos + 50].split('.')[0]
-                people.append({
-                    "name": name,
-                    "context": context.strip()
-                })
-                seen_names.add(name)
-
+        people = PATTERN_EXTRACTOR.extract(content)
         self.logger.info(f"Pattern-based extraction found {len(people)} people")
         return people
 
@@ -260,32 +443,44 @@ class PortraitPreprocessor:
 
     def process_and_generate(
         self,
-        input_path: Path,
+        input_path: Union[Path, Sequence[Path]],
         output_dir: Path,
         use_ai: bool = True,
-        dry_run: bool = False
+        dry_run: bool = False,
+        max_workers: int = 4,
+        client=None,
+        store=None,
+        on_progress: Optional[Callable[[str, Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
-        Complete workflow: Extract names and optionally generate portraits.
+        Complete workflow: Extract names and generate their portraits.
 
         Args:
-            input_path: Path to PDF or .tex file
+            input_path: Path to PDF or .tex file, or a list of them (batch mode)
             output_dir: Directory for portrait output
             use_ai: Whether to use AI for extraction
             dry_run: If True, only extract names without generating portraits
+            max_workers: Sources processed / portraits generated concurrently
+            client: Image client (defaults to get_shared_image_client())
+            store: Optional shared PortraitStore
+            on_progress: Called with (person, result) as each portrait finishes
 
         Returns:
-            Dict with results: {"people": [...], "output_dir": Path, "generated": bool}
+            Dict with results: {"people": [...], "json_path": Path, "output_dir": Path,
+            "generated": bool, "portraits": {person: {"status", "path", "seconds", "error"}},
+            "seconds": float}. "generated" is True when every person has a portrait.
         """
         # Determine input type
-        if input_path.suffix.lower() == '.pdf':
+        if not isinstance(input_path, (str, Path)):
+            people = self.extract_batch(input_path, use_ai=use_ai, max_workers=max_workers)
+        elif input_path.suffix.lower() == '.pdf':
             people = self.extract_from_pdf(input_path, use_ai=use_ai)
         elif input_path.suffix.lower() == '.tex':
             people = self.extract_from_latex(input_path, use_ai=use_ai)
         else:
             raise ValueError(f"Unsupported file type: {input_path.suffix}")
 
-        # Save JSON for CLI
+        # Save the people list for review
         json_path = output_dir / "people_for_portraits.json"
         self.save_for_cli(people, json_path)
 
@@ -293,17 +488,30 @@ class PortraitPreprocessor:
             "people": people,
             "json_path": json_path,
             "output_dir": output_dir,
-            "generated": False
+            "generated": False,
+            "portraits": {},
+            "seconds": 0.0
         }
 
-        if not dry_run:
-            # TODO: Call standalone PortraitGenerator CLI here
-            self.logger.warning(
-                "Portrait generation via CLI not yet implemented. "
-                f"Run manually: portrait-generator batch --input {json_path} "
-                f"--output-dir {output_dir}"
-            )
-
+        if dry_run:
+            self.logger.warning(f"Dry run: portraits not generated for {len(people)} people (see {json_path})")
+            return result
+
+        def log_progress(person: str, portrait: Dict[str, Any]):
+            self.logger.info(f"Portrait {portrait['status']}: {person} ({portrait['seconds']:.1f}s)")
+            if on_progress:
+                on_progress(person, portrait)
+
+        start = time.perf_counter()
+        service = PortraitService(output_dir, client=client, max_workers=max_workers, store=store)
+        portraits = service.generate(
+            [p["name"] for p in people],
+            contexts={p["name"]: p.get("context", "") for p in people},
+            on_progress=log_progress
+        )
+        result["portraits"] = portraits
+        result["seconds"] = time.perf_counter() - start
+        result["generated"] = all(r["status"] in (EXISTS, LINKED, GENERATED) for r in portraits.values())
         return result
 
 
@@ -317,7 +525,8 @@ def main():  # pragma: no cover
     parser.add_argument(
         "input",
         type=Path,
-        help="Input PDF or LaTeX file"
+        nargs="+",
+        help="Input PDF or LaTeX file(s)"
     )
     parser.add_argument(
         "--output-dir",
@@ -352,7 +561,7 @@ def main():  # pragma: no cover
     preprocessor = PortraitPreprocessor()
 
     result = preprocessor.process_and_generate(
-        input_path=args.input,
+        input_path=args.input[0] if len(args.input) == 1 else args.input,
         output_dir=args.output_dir,
         use_ai=not args.no_ai,
         dry_run=args.dry_run
@@ -360,10 +569,12 @@ def main():  # pragma: no cover
 
     print(f"\n✓ Extracted {len(result['people'])} people")
     print(f"✓ Saved JSON: {result['json_path']}")
-    print(f"\nNext steps:")
-    print(f"  1. Review {result['json_path']}")
-    print(f"  2. Run: portrait-generator batch --input {result['json_path']} "
-          f"--output-dir {result['output_dir']}")
+    if args.dry_run:
+        print(f"\nReview {result['json_path']}, then rerun without --dry-run to generate portraits.")
+    else:
+        for person, portrait in result["portraits"].items():
+            print(f"  {portrait['status']:>9}  {person} ({portrait['seconds']:.1f}s)")
+        print(f"✓ Portraits finished in {result['seconds']:.1f}s -> {result['output_dir']}")
 
 
 if __name__ == "__main__":
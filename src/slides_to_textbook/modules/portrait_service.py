@@ -0,0 +1,277 @@
+"""
+Portrait Service Module
+
+In-process portrait generation built on utils.image_clients. Portraits are
+generated by a bounded pool of concurrent requests; each one is written
+atomically as soon as it completes, so a slow or failed person never holds
+back the rest and partial results survive timeouts. Requests go through an
+AsyncImageClient, so transient API errors are retried with backoff; with
+the default shared client, identical prompts from concurrent chapters also
+share one call.
+
+Each output directory keeps a portraits_manifest.json mapping person IDs to
+their files, so existing portraits are found by lookup rather than by
+guessing filenames.
+"""
+
+import io
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from slides_to_textbook.modules.people_registry import person_key
+from slides_to_textbook.modules.portrait_store import PortraitStore
+from slides_to_textbook.utils.cache import DiskCache, default_cache_dir
+from slides_to_textbook.utils.file_utils import atomic_write_bytes, atomic_write_text
+from slides_to_textbook.utils.image_clients import (
+    AsyncImageClient, ImageGenerationClient, SyncImageClient, get_shared_image_client
+)
+
+# Per-person result statuses
+EXISTS = "exists"
+LINKED = "linked"
+GENERATED = "generated"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+MANIFEST_NAME = "portraits_manifest.json"
+
+
+def portrait_filename(person: str, style: str = "Painting") -> str:
+    """'Arthur Samuel' -> 'ArthurSamuel_Painting.png'"""
+    return f"{person.replace(' ', '')}_{style}.png"
+
+
+class PortraitService:
+    """
+    Generate portraits for many people concurrently.
+
+    Args:
+        output_dir: Directory the portraits are written to
+        client: Image client (defaults to get_shared_image_client()); any
+            other client is wrapped in an AsyncImageClient without a disk cache
+        max_workers: Maximum concurrent generation requests
+        style: Style suffix used in filenames and prompts
+        resolution: Output size in pixels (width, height)
+        timeout: Seconds to wait for one person once generation has started
+        store: Shared PortraitStore; stored portraits are hardlinked into
+            output_dir instead of being generated again
+        max_retries: Retries after a failed request (injected clients; the
+            shared client uses its own settings)
+        retry_delay: Base delay in seconds of the exponential backoff
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        client: Optional[ImageGenerationClient] = None,
+        max_workers: int = 4,
+        style: str = "Painting",
+        resolution: Tuple[int, int] = (900, 1200),
+        timeout: float = 180,
+        store: Optional[PortraitStore] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = Path(output_dir)
+        self.client = client
+        self.max_workers = max_workers
+        self.style = style
+        self.resolution = resolution
+        self.timeout = timeout
+        self.store = store
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._wrapped: Optional[SyncImageClient] = None
+
+    def portrait_path(self, person: str) -> Path:
+        return self.output_dir / portrait_filename(person, self.style)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.output_dir / MANIFEST_NAME
+
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """{"<person-id>/<style>": {"name", "file", "style", "status", "seconds", "updated"}}"""
+        try:
+            return json.loads(self.manifest_path.read_text(encoding="utf-8")).get("portraits", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def existing_portrait(self, person: str, manifest: Dict[str, Dict[str, Any]]) -> Optional[Path]:
+        """Path of an existing portrait for person, looked up in the manifest."""
+        entry = manifest.get(f"{person_key(person)}/{self.style}")
+        if entry:
+            path = self.output_dir / entry["file"]
+            if path.exists():
+                return path
+        # Portraits written before the manifest existed
+        path = self.portrait_path(person)
+        return path if path.exists() else None
+
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]], results: Dict[str, Dict[str, Any]]):
+        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        for person, result in results.items():
+            if result["path"] is None:
+                continue
+            key = f"{person_key(person)}/{self.style}"
+            if result["status"] == EXISTS and key in manifest:
+                continue
+            manifest[key] = {
+                "name": person,
+                "file": Path(result["path"]).relative_to(self.output_dir).as_posix(),
+                "style": self.style,
+                "status": result["status"],
+                "seconds": result["seconds"],
+                "updated": now,
+            }
+        atomic_write_text(self.manifest_path, json.dumps({"portraits": manifest}, indent=2, sort_keys=True))
+
+    def build_prompt(self, person: str, context: str = "") -> str:
+        details = f"\n        CONTEXT: {context}" if context else ""
+        return f"""Generate a high-end, publication-quality portrait of {person}.{details}
+        COMPOSITION: Head and shoulders, face filling most of the frame. Minimal background. NO wasted whitespace.
+        ASPECT RATIO: Vertical (3:4).
+        STYLE: Hyper-detailed oil painting, faithful to the person's era and known appearance.
+        REQUIREMENTS: No text. No borders.
+        """
+
+    def image_client(self) -> Optional[SyncImageClient]:
+        """The client requests go through: the shared one, or self.client with retries."""
+        if self.client is None:
+            return get_shared_image_client()
+        if isinstance(self.client, SyncImageClient):
+            return self.client
+        if self._wrapped is None:
+            self._wrapped = SyncImageClient(AsyncImageClient(
+                self.client,
+                max_concurrency=max(1, self.max_workers),
+                max_retries=self.max_retries,
+                base_delay=self.retry_delay,
+                cache=DiskCache(default_cache_dir(), "images", enabled=False)
+            ))
+        return self._wrapped
+
+    def _render(self, client: SyncImageClient, prompt: str) -> bytes:
+        image = client.generate(prompt, resolution=self.resolution)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def generate(
+        self,
+        people: List[str],
+        contexts: Optional[Dict[str, str]] = None,
+        on_progress: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate missing portraits.
+
+        Args:
+            people: Names to generate portraits for
+            contexts: Optional per-person context added to the prompt
+            on_progress: Called with (person, result) as each person finishes
+
+        Returns:
+            {person: {"status", "path", "seconds", "error"}} where status is one
+            of "exists", "linked", "generated", "failed" or "timeout"
+        """
+        contexts = contexts or {}
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        manifest = self.load_manifest()
+
+        def finish(person: str, status: str, seconds: float = 0.0, error: Optional[str] = None,
+                   path: Optional[Path] = None):
+            if path is None and status in (EXISTS, LINKED, GENERATED):
+                path = self.portrait_path(person)
+            results[person] = {
+                "status": status,
+                "path": path,
+                "seconds": seconds,
+                "error": error,
+            }
+            if on_progress:
+                on_progress(person, results[person])
+
+        missing = []
+        for person in dict.fromkeys(people):
+            existing = self.existing_portrait(person, manifest)
+            if existing:
+                finish(person, EXISTS, path=existing)
+            elif self.store and self.store.link_into(person, self.portrait_path(person), self.style):
+                finish(person, LINKED)
+            else:
+                missing.append(person)
+
+        if not missing:
+            self._save_manifest(manifest, results)
+            return results
+
+        client = self.image_client()
+        if client is None:
+            for person in missing:
+                finish(person, FAILED, error="No image client configured (missing GOOGLE_API_KEY)")
+            self._save_manifest(manifest, results)
+            return results
+
+        self.logger.info(f"Generating {len(missing)} portraits with {self.max_workers} workers")
+        started: Dict[str, float] = {}
+        started_lock = threading.Lock()
+
+        def work(person: str) -> float:
+            with started_lock:
+                started[person] = time.monotonic()
+            if self.store:
+                with self.store.lock_for(person, self.style):
+                    # Another chapter may have generated this person meanwhile
+                    if not self.store.link_into(person, self.portrait_path(person), self.style):
+                        prompt = self.build_prompt(person, contexts.get(person, ""))
+                        image_bytes = self._render(client, prompt)
+                        self.store.put(person, image_bytes, self.style, prompt=prompt, context=contexts.get(person, ""))
+                        self.store.link_into(person, self.portrait_path(person), self.style)
+            else:
+                image_bytes = self._render(client, self.build_prompt(person, contexts.get(person, "")))
+                atomic_write_bytes(self.portrait_path(person), image_bytes)
+            return time.monotonic() - started[person]
+
+        pool = ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="portrait")
+        pending = {pool.submit(work, person): person for person in missing}
+        try:
+            while pending:
+                done, _ = wait(list(pending), timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    person = pending.pop(future)
+                    try:
+                        seconds = future.result()
+                        self.logger.info(f"Portrait ready: {person} ({seconds:.1f}s)")
+                        finish(person, GENERATED, seconds)
+                    except Exception as e:
+                        self.logger.error(f"Portrait failed: {person}: {e}")
+                        finish(person, FAILED, time.monotonic() - started.get(person, time.monotonic()), str(e))
+
+                # Give up on requests that have run too long; the worker keeps
+                # going and its atomic write still lands if it finishes later.
+                now = time.monotonic()
+                with started_lock:
+                    expired = [f for f, p in pending.items() if p in started and now - started[p] > self.timeout]
+                for future in expired:
+                    person = pending.pop(future)
+                    self.logger.warning(f"Portrait timed out after {self.timeout}s: {person}")
+                    finish(person, TIMEOUT, now - started[person], f"Timed out after {self.timeout}s")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._save_manifest(manifest, results)
+
+        counts = {}
+        for result in results.values():
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        self.logger.info(f"Portrait generation finished: {counts}")
+        return results
@@ -0,0 +1,138 @@
+"""
+Portrait Store Module
+
+A central portrait store shared by every chapter and book. Portraits are
+keyed by a person's registered canonical ID and style, stored once with
+their metadata (dates, generating prompt, content hash) and exposed to
+chapter directories through hardlinks, so a person is generated at most
+once. Because the store spans books, only full names, aliases and compact
+spellings match a stored person; a bare surname such as 'Hinton' never
+does, as it may mean someone else in another book.
+
+Layout:
+    <root>/<person-id>/<Style>.png
+    <root>/<person-id>/<Style>.json
+    <root>/people.json        (PeopleRegistry index of stored people)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from slides_to_textbook.modules.people_registry import PeopleRegistry, person_key
+from slides_to_textbook.utils.cache import default_cache_dir
+from slides_to_textbook.utils.file_utils import atomic_write_bytes, atomic_write_text
+
+
+def default_store_dir() -> Path:
+    return default_cache_dir() / "portraits"
+
+
+class PortraitStore:
+    """Content store for portraits, shared across chapters and books."""
+
+    # Per-identity locks shared by every store instance in this process, so
+    # two chapters asking for the same person generate it only once.
+    _locks: Dict[str, threading.Lock] = {}
+    # One registry per store root, so every instance assigns the same IDs
+    _registries: Dict[Path, PeopleRegistry] = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root) if root else default_store_dir()
+        with self._locks_guard:
+            key = self.root.resolve()
+            if key not in self._registries:
+                self._registries[key] = PeopleRegistry(self.root / "people.json")
+            self.registry = self._registries[key]
+
+    def person_id(self, name: str) -> str:
+        """Stored ID for name; bare surnames never match across books."""
+        return self.registry.resolve(name, surnames=False) or person_key(name)
+
+    def lock_for(self, name: str, style: str = "Painting") -> threading.Lock:
+        """
+        Lock to hold while checking for and generating one portrait.
+
+        The name is registered first, so every spelling of one person
+        gets the same lock.
+        """
+        person_id = self.registry.add(name)
+        key = str(self.root / person_id / f"{style}.png")
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def image_path(self, name: str, style: str = "Painting") -> Path:
+        return self.root / self.person_id(name) / f"{style}.png"
+
+    def metadata_path(self, name: str, style: str = "Painting") -> Path:
+        return self.root / self.person_id(name) / f"{style}.json"
+
+    def get(self, name: str, style: str = "Painting") -> Optional[Path]:
+        """Return the stored portrait path, or None if the person is not stored."""
+        path = self.image_path(name, style)
+        return path if path.exists() else None
+
+    def metadata(self, name: str, style: str = "Painting") -> Dict[str, Any]:
+        try:
+            return json.loads(self.metadata_path(name, style).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def put(self, name: str, image_bytes: bytes, style: str = "Painting", **metadata: Any) -> Path:
+        """
+        Store a portrait and its metadata (e.g. prompt=..., dates=...).
+        """
+        person_id = self.registry.add(name)
+        self.registry.save()
+        path = atomic_write_bytes(self.root / person_id / f"{style}.png", image_bytes)
+        record = {
+            "name": self.registry.name(person_id),
+            "key": person_id,
+            "style": style,
+            "sha256": hashlib.sha256(image_bytes).hexdigest(),
+            "created": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            **metadata,
+        }
+        atomic_write_text(self.root / person_id / f"{style}.json", json.dumps(record, indent=2))
+        self.logger.info(f"Stored portrait: {name} ({style})")
+        return path
+
+    def link_into(self, name: str, dest: Path, style: str = "Painting") -> Optional[Path]:
+        """
+        Expose a stored portrait at dest via a hardlink (copy across filesystems).
+
+        Returns dest, or None if the person is not in the store.
+        """
+        source = self.get(name, style)
+        if source is None:
+            return None
+
+        dest = Path(dest)
+        if dest.exists():
+            if os.path.samefile(source, dest):
+                return dest
+            dest.unlink()
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source, dest)
+        except OSError:
+            shutil.copy2(source, dest)
+        return dest
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Metadata for every stored portrait."""
+        records = []
+        for meta_file in sorted(self.root.glob("*/*.json")):
+            try:
+                records.append(json.loads(meta_file.read_text(encoding="utf-8")))
+            except json.JSONDecodeError:
+                self.logger.warning(f"Skipping unreadable portrait metadata: {meta_file}")
+        return records
@@ -3,17 +3,30 @@ import os
 import re
 import subprocess
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class QualityValidator:
     """
     Validates the quality of the generated book content.
     Enforces "Zero Tolerance" for placeholders and low-quality assets.
+
+    With compile_chapters=True every chapter is also compiled standalone
+    (in parallel, see BookCompiler.compile_chapters) and LaTeX errors are
+    reported per chapter.
     """
-    def __init__(self, book_dir: Path):
+    def __init__(
+        self,
+        book_dir: Path,
+        compile_chapters: bool = False,
+        engine: str = "pdflatex",
+        max_workers: Optional[int] = None
+    ):
         self.logger = logging.getLogger(__name__)
         self.book_dir = book_dir
         self.figures_dir = book_dir / "Figures"
+        self.compile_chapters = compile_chapters
+        self.engine = engine
+        self.max_workers = max_workers
 
     def validate(self) -> Dict[str, Any]:
         """Run all validation checks."""
@@ -33,6 +46,13 @@ class QualityValidator:
         # 3. Check LaTeX Compilation (Dry run or syntax check)
         self._check_latex_structure(report)
 
+        # 4. Check citation keys against the bibliography
+        self._check_citations(report)
+
+        # 5. Compile every chapter standalone
+        if self.compile_chapters:
+            self._check_chapter_compilation(report)
+
         if report["errors"]:
             report["status"] = "failed"
         
@@ -107,3 +127,40 @@ class QualityValidator:
             report["errors"].append("bibliography.bib missing")
         elif bib_file.stat().st_size < 100:
              report["errors"].append("bibliography.bib is suspiciously empty")
+
+    def _check_citations(self, report: Dict[str, Any]):
+        """Unknown citation keys are errors, uncited bibliography entries warnings."""
+        from slides_to_textbook.modules.citation_checker import CitationChecker, suggestion_hint
+
+        if not (self.book_dir / "bibliography.bib").exists():
+            return
+        result = CitationChecker(self.book_dir).check()
+        for item in result["unknown"]:
+            report["errors"].append(
+                f"Unknown citation key '{item['key']}' in {item['file']} line {item['line']}{suggestion_hint(item)}"
+            )
+        if result["unused"]:
+            report["warnings"].append(f"{len(result['unused'])} bibliography entries are never cited: {', '.join(result['unused'])}")
+
+    def _check_chapter_compilation(self, report: Dict[str, Any]):
+        """Compile each chapter standalone and report its LaTeX errors."""
+        from slides_to_textbook.modules.book_compiler import BookCompiler
+
+        if not (self.book_dir / "main.tex").exists():
+            return
+        compiler = BookCompiler(self.book_dir, engine=self.engine)
+        try:
+            results = compiler.compile_chapters(max_workers=self.max_workers)
+        except FileNotFoundError as e:
+            report["warnings"].append(f"Chapter compilation skipped: {e}")
+            return
+
+        report["chapters"] = results
+        for chapter, result in results.items():
+            if result["success"]:
+                continue
+            if not result["errors"]:
+                report["errors"].append(f"{chapter} failed to compile (no error found in the log)")
+            for error in result["errors"]:
+                location = f" line {error['line']}" if error["line"] else ""
+                report["errors"].append(f"{chapter} does not compile{location}: {error['message']}")
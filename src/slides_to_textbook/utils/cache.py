@@ -0,0 +1,71 @@
+"""
+Content-addressed on-disk cache for pipeline results.
+
+Entries are keyed by a SHA-256 digest of their inputs and stored under a
+namespace directory, e.g. ~/.cache/slides_to_textbook/analyze/ab/abcd....json.
+Writes are atomic, so concurrent workers can share one cache directory.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from slides_to_textbook.utils.file_utils import atomic_write_bytes
+
+
+def default_cache_dir() -> Path:
+    """Return $XDG_CACHE_HOME/slides_to_textbook (or ~/.cache/slides_to_textbook)."""
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "slides_to_textbook"
+
+
+def make_key(*parts: Any) -> str:
+    """Stable SHA-256 key for JSON-serialisable parts (bytes are hashed raw)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            digest.update(part)
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """A namespace of cached JSON documents or binary blobs."""
+
+    def __init__(self, root: Union[str, Path], namespace: str, enabled: bool = True):
+        self.root = Path(root) / namespace
+        self.enabled = enabled
+
+    def path_for(self, key: str, suffix: str = ".json") -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def get_json(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        path = self.path_for(key)
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def set_json(self, key: str, value: Any) -> Optional[Path]:
+        if not self.enabled:
+            return None
+        return atomic_write_bytes(self.path_for(key), json.dumps(value, indent=2).encode("utf-8"))
+
+    def get_bytes(self, key: str, suffix: str = ".bin") -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        try:
+            return self.path_for(key, suffix).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def set_bytes(self, key: str, data: bytes, suffix: str = ".bin") -> Optional[Path]:
+        if not self.enabled:
+            return None
+        return atomic_write_bytes(self.path_for(key, suffix), data)
@@ -0,0 +1,96 @@
+"""
+Filesystem helpers shared by the pipeline modules.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Tuple, Union
+
+# Read once at import: os.umask() can only be queried by setting it, which
+# is not safe to do while other threads are creating files.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write_text(path: Union[str, Path], text: str, encoding: str = "utf-8") -> Path:
+    """
+    Write text to path atomically.
+
+    The content goes to a temporary file in the same directory which then
+    replaces the target, so readers never observe a half-written file.
+    """
+    return atomic_write_bytes(path, text.encode(encoding))
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes) -> Path:
+    """Write bytes to path atomically (temp file + rename)."""
+    return atomic_write_chunks(path, [data])
+
+
+def atomic_write_chunks(path: Union[str, Path], chunks: Iterable[bytes]) -> Path:
+    """Stream chunks to path atomically, without joining them in memory first."""
+    path = Path(path)
+    _stream_atomically(path, chunks)
+    return path
+
+
+def atomic_write_chunks_if_changed(
+    path: Union[str, Path],
+    chunks: Iterable[bytes],
+    unchanged: Callable[[str], bool]
+) -> Tuple[str, bool]:
+    """
+    Stream chunks to a temporary file next to path, hashing them on the way.
+
+    The temporary file replaces path unless unchanged(sha256 hex digest) is
+    true, in which case it is discarded and path is left untouched. chunks
+    is consumed exactly once.
+
+    Returns:
+        (digest, written)
+    """
+    return _stream_atomically(Path(path), chunks, unchanged)
+
+
+def _stream_atomically(
+    path: Path,
+    chunks: Iterable[bytes],
+    unchanged: Optional[Callable[[str], bool]] = None
+) -> Tuple[str, bool]:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    hasher = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                hasher.update(chunk)
+                f.write(chunk)
+        digest = hasher.hexdigest()
+        if unchanged is not None and unchanged(digest):
+            os.unlink(tmp_name)
+            return digest, False
+        # mkstemp creates 0600 files; keep the mode a plain open() would give
+        os.chmod(tmp_name, _target_mode(path))
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return digest, True
+
+
+def _target_mode(path: Path) -> int:
+    if path.exists():
+        return path.stat().st_mode & 0o777
+    return 0o666 & ~_UMASK
+
+
+def hash_file(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -5,14 +5,20 @@ IMPORTANT: This module uses Google Gemini 2.0 Flash or Pro with specific prompti
 strategies for high-quality scientific and historical image generation.
 """
 
+import asyncio
 import io
+import random
 import time
 import logging
 import os
+import threading
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Union
 from PIL import Image
 
+from slides_to_textbook.utils.cache import DiskCache, default_cache_dir, make_key
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
@@ -98,3 +104,148 @@ def get_image_client() -> Optional[ImageGenerationClient]:
     if key:
         return GeminiImageClient(key)
     return None
+
+
+class AsyncImageClient:
+    """
+    Async front-end for a synchronous ImageGenerationClient.
+
+    - Bounded concurrency: at most max_concurrency requests run at once.
+    - Retries: failures are retried with exponential backoff and jitter.
+    - Single-flight: concurrent requests for the same prompt share one call.
+    - Caching: results are stored as PNG in a prompt-keyed on-disk cache.
+
+    Every caller gets its own decoded Image, so callers may modify results.
+    """
+
+    def __init__(
+        self,
+        client: ImageGenerationClient,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        cache: Optional[DiskCache] = None
+    ) -> None:
+        self.client = client
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cache = cache if cache is not None else DiskCache(default_cache_dir(), "images")
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[str, "asyncio.Future[bytes]"] = {}
+        self.calls = 0
+
+    def cache_key(self, prompt: str, resolution: tuple[int, int], **kwargs) -> str:
+        model = getattr(self.client, "model_name", type(self.client).__name__)
+        return make_key("image", model, prompt, list(resolution), kwargs)
+
+    async def generate(
+        self,
+        prompt: str,
+        resolution: tuple[int, int] = (1024, 1024),
+        **kwargs
+    ) -> Image.Image:
+        """Generate (or fetch from cache) the image for prompt."""
+        key = self.cache_key(prompt, resolution, **kwargs)
+
+        cached = self.cache.get_bytes(key, ".png")
+        if cached is not None:
+            logger.info("Image cache hit")
+            return Image.open(io.BytesIO(cached))
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(key, prompt, resolution, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info("Joining in-flight request for identical prompt")
+
+        data = await asyncio.shield(future)
+        return Image.open(io.BytesIO(data))
+
+    async def generate_many(
+        self,
+        prompts: List[str],
+        resolution: tuple[int, int] = (1024, 1024),
+        **kwargs
+    ) -> List[Union[Image.Image, Exception]]:
+        """Generate several prompts concurrently; failures are returned, not raised."""
+        return await asyncio.gather(
+            *(self.generate(p, resolution, **kwargs) for p in prompts),
+            return_exceptions=True
+        )
+
+    async def _fetch(self, key: str, prompt: str, resolution: tuple[int, int], **kwargs) -> bytes:
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self.calls += 1
+                    image = await asyncio.to_thread(self.client.generate, prompt, resolution, **kwargs)
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        logger.error(f"Image generation failed after {attempt + 1} attempts: {e}")
+                        raise
+                    delay = min(self.max_delay, self.base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+                    logger.warning(f"Image generation attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        data = buffer.getvalue()
+        self.cache.set_bytes(key, data, ".png")
+        return data
+
+
+class SyncImageClient:
+    """
+    Blocking front-end for an AsyncImageClient, for thread-based callers.
+
+    The async client runs on one event loop in a daemon thread and generate()
+    waits for its result, so threads calling generate() concurrently share
+    its concurrency bound, retries, single-flight and cache.
+    """
+
+    def __init__(self, client: AsyncImageClient) -> None:
+        self.client = client
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="image-client", daemon=True)
+        self._thread.start()
+
+    @property
+    def model_name(self) -> str:
+        inner = self.client.client
+        return getattr(inner, "model_name", type(inner).__name__)
+
+    def generate(
+        self,
+        prompt: str,
+        resolution: tuple[int, int] = (1024, 1024),
+        **kwargs
+    ) -> Image.Image:
+        """Generate (or fetch from cache) the image for prompt, blocking until done."""
+        future = asyncio.run_coroutine_threadsafe(self.client.generate(prompt, resolution, **kwargs), self._loop)
+        return future.result()
+
+
+_shared_client: Optional[SyncImageClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_image_client(cache_dir: Optional[Path] = None) -> Optional[SyncImageClient]:
+    """
+    Process-wide SyncImageClient over get_image_client(), or None if no
+    image client is configured. Images are cached under
+    <cache_dir>/images (default: default_cache_dir()).
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            client = get_image_client()
+            if client is None:
+                return None
+            cache = DiskCache(cache_dir or default_cache_dir(), "images")
+            _shared_client = SyncImageClient(AsyncImageClient(client, cache=cache))
+        return _shared_client
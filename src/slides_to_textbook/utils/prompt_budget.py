@@ -0,0 +1,90 @@
+"""
+Token-budgeted prompt assembly.
+
+Ranks context items (history paragraphs, concepts, people, citations) by
+relevance to a query such as a section title and keeps the most relevant
+ones that fit within a token budget.
+"""
+
+import math
+import re
+from typing import Dict, List, Optional
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in",
+    "into", "is", "it", "its", "of", "on", "or", "that", "the", "their",
+    "this", "to", "use", "was", "were", "with", "citep",
+})
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def _terms(text: str) -> set:
+    terms = set()
+    for word in WORD_PATTERN.findall(text.lower()):
+        if len(word) < 3 or word in STOPWORDS:
+            continue
+        # Light stemming so "networks" matches "network"
+        if word.endswith("ies") and len(word) > 4:
+            word = word[:-3] + "y"
+        elif word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.add(word)
+    return terms
+
+
+class PromptAssembler:
+    """
+    Select context items for a prompt under a token budget.
+
+    Items are scored by term overlap with the query (normalised by item
+    length) and added greedily in score order; ties keep the original order.
+    The selection is returned per group in the original order so prompts
+    read the same way as unbudgeted ones.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None):
+        self.token_budget = token_budget
+
+    def score(self, query_terms: set, item: str) -> float:
+        item_terms = _terms(item)
+        if not item_terms or not query_terms:
+            return 0.0
+        return len(query_terms & item_terms) / math.sqrt(len(item_terms))
+
+    def select(self, query: str, groups: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """
+        Args:
+            query: Text the items should be relevant to (e.g. section title)
+            groups: Named lists of context items
+
+        Returns:
+            The same groups containing only the selected items
+        """
+        if self.token_budget is None:
+            return {name: list(items) for name, items in groups.items()}
+
+        query_terms = _terms(query)
+        candidates = []
+        for name, items in groups.items():
+            for index, item in enumerate(items):
+                candidates.append((-self.score(query_terms, item), len(candidates), name, index, item))
+        candidates.sort()
+
+        remaining = self.token_budget
+        chosen = {name: set() for name in groups}
+        for _, _, name, index, item in candidates:
+            cost = estimate_tokens(item)
+            if cost <= remaining:
+                chosen[name].add(index)
+                remaining -= cost
+
+        return {
+            name: [item for index, item in enumerate(items) if index in chosen[name]]
+            for name, items in groups.items()
+        }
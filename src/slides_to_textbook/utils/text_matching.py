@@ -0,0 +1,105 @@
+"""
+Multi-pattern text matching utilities.
+
+Provides an Aho-Corasick automaton so that many names (concepts, people,
+asset filenames) can be located in a chapter with a single pass over the
+text instead of one scan per name.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+def lower_preserving_offsets(text: str) -> str:
+    """
+    Lowercase text without changing its length.
+
+    str.lower() can expand some characters (e.g. 'İ' -> 'i̇'), which would
+    shift match offsets. Such characters are left untouched.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class MultiPatternMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of patterns.
+
+    Patterns are matched as plain substrings. With case_sensitive=False,
+    both patterns and text are lowercased; offsets still refer to the
+    original text.
+    """
+
+    def __init__(self, patterns: Iterable[str], case_sensitive: bool = False):
+        self.case_sensitive = case_sensitive
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _normalize(self, text: str) -> str:
+        return text if self.case_sensitive else lower_preserving_offsets(text)
+
+    def _add(self, pattern: str):
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        key = self._normalize(pattern)
+        if not key:
+            return
+
+        state = 0
+        for char in key:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(pattern_id)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                if state:
+                    fallback = self._fail[state]
+                    while fallback and char not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield (start, end, pattern_id) for every occurrence, in order of end offset.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(self._normalize(text)):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                end = index + 1
+                for pattern_id in out[state]:
+                    yield end - len(self.patterns[pattern_id]), end, pattern_id
+
+    def first_matches(self, text: str) -> Dict[int, Tuple[int, int]]:
+        """
+        Return {pattern_id: (start, end)} for the earliest occurrence of each pattern.
+        """
+        first: Dict[int, Tuple[int, int]] = {}
+        for start, end, pattern_id in self.iter_matches(text):
+            # Occurrences of one pattern arrive in increasing order
+            if pattern_id not in first:
+                first[pattern_id] = (start, end)
+        return first
@@ -0,0 +1,62 @@
+import json
+import numpy as np
+from PIL import Image
+from slides_to_textbook.modules.asset_checker import (
+    AssetChecker, REPORT_NAME, scan_image, whitespace_borders
+)
+
+def save_framed(path, size=(800, 1000), box=(100, 200, 700, 900), fmt=None):
+    image = Image.new("RGB", size, "white")
+    image.paste((30, 60, 90), box)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path, fmt)
+    return path
+
+def test_whitespace_borders_vectorized():
+    pixels = np.full((10, 20, 3), 255, dtype=np.uint8)
+    pixels[2:7, 3:15] = 0
+    assert whitespace_borders(pixels) == (2, 3, 3, 5)
+    assert whitespace_borders(np.full((4, 4), 255, dtype=np.uint8)) is None
+
+def test_scan_image_scales_preview_borders(tmp_path):
+    result = scan_image(save_framed(tmp_path / "a.png"), preview_size=100)
+
+    assert not result["blank"]
+    b = result["borders"]
+    # Within one preview pixel (10px) of the true borders, never past them
+    assert 190 <= b["top"] <= 200
+    assert 90 <= b["left"] <= 100
+    assert 90 <= b["bottom"] <= 100
+    assert 90 <= b["right"] <= 100
+
+def test_run_flags_crops_and_writes_report(tmp_path):
+    save_framed(tmp_path / "Chapter-A" / "wide.jpg", fmt="JPEG")
+    tight = Image.new("RGB", (300, 300), (10, 10, 10))
+    tight.save(tmp_path / "tight.png")
+
+    report = AssetChecker(tmp_path, threshold=0.05).run(crop=True)
+
+    by_path = {r["path"]: r for r in report["images"]}
+    assert by_path["Chapter-A/wide.jpg"]["cropped"]
+    assert not by_path["tight.png"]["flagged"]
+    assert report["summary"] == {"scanned": 2, "flagged": 1, "cropped": 1, "blank": 0, "errors": 0}
+    with Image.open(tmp_path / "Chapter-A" / "wide.jpg") as cropped:
+        assert cropped.size[0] < 800 and cropped.size[1] < 1000
+    assert json.loads((tmp_path / REPORT_NAME).read_text())["summary"]["cropped"] == 1
+
+def test_print_variants_are_not_scanned(tmp_path):
+    save_framed(tmp_path / "Figures" / "plot.png")
+    variant = save_framed(tmp_path / "Print" / "Figures" / "plot.png")
+    before = variant.read_bytes()
+
+    report = AssetChecker(tmp_path).run(crop=True)
+
+    assert [r["path"] for r in report["images"]] == ["Figures/plot.png"]
+    assert variant.read_bytes() == before
+
+def test_unreadable_image_is_reported(tmp_path):
+    (tmp_path / "broken.png").write_bytes(b"not an image")
+
+    report = AssetChecker(tmp_path).run()
+
+    assert report["summary"]["errors"] == 1
@@ -0,0 +1,91 @@
+import json
+import random
+from PIL import Image
+from slides_to_textbook.modules.asset_checker import scan_image, whitespace_bbox
+from slides_to_textbook.modules.asset_pipeline import AssetPipeline, MANIFEST_NAME, is_photographic
+
+def make_photo(path, size=(900, 1200), border=100):
+    """Noisy 'painting' surrounded by a white border."""
+    rng = random.Random(0)
+    image = Image.new("RGB", size, "white")
+    inner = Image.new("RGB", (size[0] - 2 * border, size[1] - 2 * border))
+    inner.putdata([tuple(rng.randrange(200) for _ in range(3)) for _ in range(inner.width * inner.height)])
+    image.paste(inner, (border, border))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path)
+    return path
+
+def make_diagram(path, size=(2000, 1000)):
+    image = Image.new("RGB", size, "white")
+    image.paste((0, 0, 0), (100, 100, 1900, 900))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path)
+    return path
+
+def test_whitespace_bbox():
+    image = Image.new("RGB", (50, 40), "white")
+    image.paste((10, 10, 10), (5, 6, 20, 30))
+    assert whitespace_bbox(image) == (5, 6, 20, 30)
+    assert whitespace_bbox(Image.new("RGB", (5, 5), "white")) is None
+
+def test_crop_uses_the_checker_whitespace_rule(tmp_path):
+    # Pale yellow: whitespace by grey level (L ~ 251) but content per channel
+    image = Image.new("RGB", (200, 100), "white")
+    image.paste((252, 252, 240), (20, 10, 180, 90))
+    image.paste((0, 0, 0), (60, 40, 140, 60))
+    source = tmp_path / "Figures" / "pale.png"
+    source.parent.mkdir()
+    image.save(source)
+
+    record = AssetPipeline(tmp_path).run()["Figures/pale.png"]
+
+    assert record["crop"] == [20, 10, 180, 90] == list(whitespace_bbox(image))
+    # The preview scan agrees up to the one-pixel margin it keeps
+    scan = scan_image(source, preview_size=200)["crop"]
+    assert [abs(a - b) for a, b in zip(scan, record["crop"])] == [1, 1, 1, 1]
+
+def test_is_photographic():
+    assert not is_photographic(Image.new("RGB", (200, 200), "white"))
+
+def test_portrait_is_cropped_downsampled_and_jpeg(tmp_path):
+    source = make_photo(tmp_path / "Portraits" / "Chapter-Intro" / "AlanTuring_Painting.png")
+    pipeline = AssetPipeline(tmp_path, dpi=300)
+
+    record = pipeline.run()["Portraits/Chapter-Intro/AlanTuring_Painting.png"]
+
+    assert record["variant"] == "Print/Portraits/Chapter-Intro/AlanTuring_Painting.jpg"
+    assert record["format"] == "jpeg"
+    assert record["crop"] == [100, 100, 800, 1100]
+    assert record["variant_size"][0] == 540
+    assert record["variant_bytes"] < source.stat().st_size
+    with Image.open(tmp_path / record["variant"]) as variant:
+        assert variant.size == tuple(record["variant_size"])
+
+def test_diagram_stays_png(tmp_path):
+    make_diagram(tmp_path / "Figures" / "plot.png")
+
+    record = AssetPipeline(tmp_path).run()["Figures/plot.png"]
+
+    assert record["format"] == "png"
+    assert record["variant_size"][0] == 1440
+
+def test_manifest_records_variants_and_skips_unchanged(tmp_path, monkeypatch):
+    make_diagram(tmp_path / "Figures" / "plot.png")
+    AssetPipeline(tmp_path).run()
+
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert set(manifest["images"]) == {"Figures/plot.png"}
+
+    calls = []
+    monkeypatch.setattr("slides_to_textbook.modules.asset_pipeline.process_image",
+                        lambda *a, **k: calls.append(a))
+    AssetPipeline(tmp_path).run()
+    assert calls == []
+
+def test_changed_settings_regenerate_variant(tmp_path):
+    make_diagram(tmp_path / "Figures" / "plot.png")
+    AssetPipeline(tmp_path, dpi=300).run()
+
+    record = AssetPipeline(tmp_path, dpi=150).run()["Figures/plot.png"]
+
+    assert record["variant_size"][0] == 720
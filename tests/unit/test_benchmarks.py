@@ -0,0 +1,34 @@
+import pytest
+from slides_to_textbook.benchmarks import (
+    bench_asset_injection, bench_bibtex_writer, bench_margin_schedule, bench_person_patterns,
+    bench_preamble_format, run_benchmarks
+)
+
+def test_bench_asset_injection_small():
+    result = bench_asset_injection(size_kb=20, n_assets=20)
+    assert result["assets"] == 20
+    assert result["input_bytes"] >= 20 * 1024
+    assert result["output_bytes"] == result["reference_bytes"] > result["input_bytes"]
+    assert result["reference_seconds"] > 0
+
+def test_bench_person_patterns_matches_reference():
+    result = bench_person_patterns(size_kb=50, n_people=40)
+    assert result["people"] == result["reference_people"] > 0
+    assert result["mb_per_s"] > 0 and result["reference_mb_per_s"] > 0
+
+def test_bench_preamble_format_without_engine():
+    result = bench_preamble_format(engine="no-such-latex")
+    assert result["skipped"] == "no-such-latex not found"
+
+def test_bench_bibtex_writer_small():
+    result = bench_bibtex_writer(n_entries=200)
+    assert result["entries"] == 200
+    assert result["output_bytes"] > 0 and result["reference_bytes"] > 0
+
+def test_bench_margin_schedule_places_every_note():
+    result = bench_margin_schedule(n_lines=300, n_people=10)
+    assert result["placed"] == result["notes"] == 10
+
+def test_run_benchmarks_unknown():
+    with pytest.raises(ValueError):
+        run_benchmarks(["does_not_exist"])
@@ -0,0 +1,183 @@
+import subprocess
+import pytest
+from slides_to_textbook.modules.book_compiler import (
+    BookCompiler, parse_log_errors, standalone_chapter, static_preamble
+)
+
+class FakeTeX:
+    """Stands in for pdflatex/bibtex: records calls and writes job outputs."""
+
+    def __init__(self, logs=None):
+        self.calls = []
+        self.logs = list(logs or [])
+
+    def __call__(self, cmd, cwd, **kwargs):
+        self.calls.append(cmd)
+        if cmd[0] == "bibtex":
+            (cwd / f"{cmd[1]}.bbl").write_text("bbl")
+            return subprocess.CompletedProcess(cmd, 0)
+        job = next(a.split("=", 1)[1] for a in cmd if a.startswith("-jobname="))
+        log = self.logs.pop(0) if self.logs else "Output written"
+        (cwd / f"{job}.log").write_text(log)
+        failed = log.startswith("!")
+        if not failed:
+            suffix = "fmt" if "-ini" in cmd else "pdf"
+            (cwd / f"{job}.{suffix}").write_bytes(b"%PDF")
+        return subprocess.CompletedProcess(cmd, 1 if failed else 0)
+
+@pytest.fixture
+def book(tmp_path):
+    (tmp_path / "main.tex").write_text("\\include{Chapter-A}\\include{Chapter-B}")
+    (tmp_path / "Chapter-A.tex").write_text("A")
+    (tmp_path / "Chapter-B.tex").write_text("B")
+    (tmp_path / "bibliography.bib").write_text("@book{x}")
+    return tmp_path
+
+@pytest.fixture
+def tex(monkeypatch):
+    fake = FakeTeX()
+    monkeypatch.setattr("slides_to_textbook.modules.book_compiler.subprocess.run", fake)
+    monkeypatch.setattr("slides_to_textbook.modules.book_compiler.shutil.which", lambda tool: f"/usr/bin/{tool}")
+    return fake
+
+def tools(calls):
+    return [c[0] for c in calls]
+
+def test_first_compile_runs_bibtex_and_reports_timings(book, tex):
+    result = BookCompiler(book).compile()
+
+    assert result["success"] and not result["skipped"]
+    assert tools(tex.calls) == ["pdflatex", "bibtex", "pdflatex"]
+    assert [s["step"] for s in result["steps"]] == ["pdflatex #1", "bibtex", "pdflatex #2"]
+    assert result["changed"] == ["Chapter-A.tex", "Chapter-B.tex", "bibliography.bib", "main.tex"]
+
+def test_unchanged_book_is_skipped(book, tex):
+    compiler = BookCompiler(book)
+    compiler.compile()
+    tex.calls.clear()
+
+    result = compiler.compile()
+
+    assert result["skipped"]
+    assert tex.calls == []
+
+def test_chapter_change_skips_bibtex(book, tex):
+    compiler = BookCompiler(book)
+    compiler.compile()
+    tex.calls.clear()
+    (book / "Chapter-B.tex").write_text("B2")
+
+    result = compiler.compile()
+
+    assert result["changed"] == ["Chapter-B.tex"]
+    assert tools(tex.calls) == ["pdflatex"]
+
+def test_reruns_until_references_settle(book, tex):
+    tex.logs = ["ok", "LaTeX Warning: Label(s) may have changed. Rerun to get cross-references right.", "ok"]
+
+    result = BookCompiler(book).compile()
+
+    assert result["passes"] == 3
+
+def test_includeonly_preview(book, tex):
+    result = BookCompiler(book).compile(only=["Chapter-B.tex"])
+
+    assert result["job"] == "preview"
+    assert result["pdf"] == book / "preview.pdf"
+    assert tex.calls[0][-1] == "\\includeonly{Chapter-B}\\input{main.tex}"
+
+def test_failed_compile_parses_errors_and_retries_next_time(book, tex):
+    tex.logs = ["! Undefined control sequence.\nl.12 \\foo\n"]
+    compiler = BookCompiler(book)
+
+    result = compiler.compile()
+
+    assert not result["success"]
+    assert result["errors"] == [{"message": "Undefined control sequence.", "file": None, "line": 12}]
+    assert compiler.changed_files() != []
+
+def test_parse_file_line_errors():
+    log = "./Chapter-A.tex:7: Missing $ inserted.\n"
+    assert parse_log_errors(log) == [{"message": "Missing $ inserted.", "file": "./Chapter-A.tex", "line": 7}]
+
+def test_missing_engine_raises(book, monkeypatch):
+    monkeypatch.setattr("slides_to_textbook.modules.book_compiler.shutil.which", lambda tool: None)
+    with pytest.raises(FileNotFoundError):
+        BookCompiler(book).compile()
+
+PREAMBLE = "\\documentclass{book}\\usepackage{tikz}\n\\csname endofdump\\endcsname\n"
+
+def formats(calls):
+    return [c for c in calls if "-ini" in c]
+
+def test_static_preamble():
+    assert static_preamble(PREAMBLE + "\\begin{document}") == "\\documentclass{book}\\usepackage{tikz}\n"
+    assert static_preamble("\\documentclass{book}") is None
+
+def test_format_is_dumped_once_and_reused(book, tex):
+    (book / "main.tex").write_text(PREAMBLE + "\\include{Chapter-A}")
+    compiler = BookCompiler(book)
+
+    result = compiler.compile()
+
+    assert formats(tex.calls)[0][-2:] == ["mylatexformat.ltx", "main.tex"]
+    assert result["steps"][0]["step"] == "format"
+    assert all("-fmt=preamble" in c for c in tex.calls if c[0] == "pdflatex" and "-ini" not in c)
+
+    tex.calls.clear()
+    (book / "Chapter-A.tex").write_text("A2")
+    compiler.compile()
+    assert formats(tex.calls) == []
+    assert "-fmt=preamble" in tex.calls[0]
+
+def test_preamble_change_rebuilds_format(book, tex):
+    (book / "main.tex").write_text(PREAMBLE + "\\include{Chapter-A}")
+    compiler = BookCompiler(book)
+    compiler.compile()
+    tex.calls.clear()
+
+    (book / "main.tex").write_text("\\usepackage{mhchem}" + PREAMBLE + "\\include{Chapter-A}")
+    compiler.compile()
+
+    assert len(formats(tex.calls)) == 1
+
+def test_failed_dump_falls_back_without_retrying(book, tex):
+    (book / "main.tex").write_text(PREAMBLE + "\\include{Chapter-A}")
+    tex.logs = ["! LaTeX Error: File `mylatexformat.ltx' not found."]
+    compiler = BookCompiler(book)
+
+    result = compiler.compile()
+
+    assert result["success"]
+    assert not any("-fmt=preamble" in c for c in tex.calls)
+    tex.calls.clear()
+    compiler.compile(force=True)
+    assert formats(tex.calls) == []
+
+def test_format_disabled(book, tex):
+    (book / "main.tex").write_text(PREAMBLE + "\\include{Chapter-A}")
+    BookCompiler(book, use_format=False).compile()
+    assert formats(tex.calls) == []
+
+BOOK = PREAMBLE + "\\title{T}\n\\begin{document}\n\\include{Chapter-A}\n\\include{Chapter-B}\n\\end{document}\n"
+
+def test_standalone_chapter_keeps_preamble():
+    tex = standalone_chapter(BOOK, "Chapter-B")
+    assert tex.startswith(PREAMBLE + "\\title{T}\n\\begin{document}")
+    assert "\\input{Chapter-B}" in tex and "Chapter-A" not in tex
+
+def test_compile_chapters_in_isolated_dirs(book, tex):
+    (book / "main.tex").write_text(BOOK)
+    tex.logs = ["ok", "ok", "! Undefined control sequence.\nl.3 \\foo"]
+    before = {p.name for p in book.iterdir()}
+
+    results = BookCompiler(book).compile_chapters(max_workers=1)
+
+    assert results["Chapter-A"]["success"]
+    assert results["Chapter-B"]["errors"] == [
+        {"message": "Undefined control sequence.", "file": None, "line": 3}
+    ]
+    chapter_calls = [c for c in tex.calls if "-ini" not in c]
+    assert all(c[-2:] == ["-fmt=preamble", "standalone.tex"] for c in chapter_calls)
+    created = {p.name for p in book.iterdir()} - before
+    assert created <= {"preamble.fmt", "preamble.log", ".compile_state.json"}
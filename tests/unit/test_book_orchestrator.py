@@ -0,0 +1,173 @@
+import json
+import threading
+import pytest
+from unittest.mock import patch
+from slides_to_textbook.modules.latex_builder import LaTeXBuilder
+from slides_to_textbook.modules.latex_components import BibliographyManager
+from slides_to_textbook.modules.book_orchestrator import (
+    BookOrchestrator, load_book_config, safe_chapter_name, DEFAULT_WORKERS
+)
+
+def write_topic(path, title, people=None):
+    path.write_text(json.dumps({
+        "title": title,
+        "description": f"{title} description",
+        "sections": ["Basics"],
+        "concepts": [],
+        "people": people or [],
+        "research": {
+            "historical_context": "History.",
+            "citations": [{"title": f"{title} Paper", "author": ["Ada Lovelace"], "year": "1843", "entry_type": "article"}]
+        }
+    }))
+
+@pytest.fixture
+def config_file(tmp_path):
+    write_topic(tmp_path / "t1.json", "Introduction", ["Arthur Samuel"])
+    write_topic(tmp_path / "t2.json", "Neural Networks")
+    config = {
+        "book_title": "ML Book",
+        "output_dir": "out",
+        "lectures": [{"topic_json": "t1.json"}, {"topic_json": "t2.json"}],
+        "workers": {"author": 2},
+        "extract_people": False,
+        "cache_dir": str(tmp_path / "cache")
+    }
+    path = tmp_path / "book.json"
+    path.write_text(json.dumps(config))
+    return path
+
+def test_load_book_config_resolves_paths(config_file, tmp_path):
+    config = load_book_config(config_file)
+    assert config["output_dir"] == str(tmp_path / "out")
+    assert config["lectures"][0]["topic_json"] == str(tmp_path / "t1.json")
+    assert config["workers"] == {**DEFAULT_WORKERS, "author": 2}
+
+def test_load_book_config_rejects_unknown_stage(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps({"output_dir": "o", "lectures": [{"pdf": "a.pdf"}], "workers": {"bogus": 1}}))
+    with pytest.raises(ValueError):
+        load_book_config(path)
+
+def test_safe_chapter_name():
+    assert safe_chapter_name("Neural Networks & SVMs") == "NeuralNetworksSVMs"
+
+@patch('slides_to_textbook.modules.book_orchestrator.ContentAuthor')
+def test_run_builds_all_chapters(mock_author, config_file, tmp_path):
+    mock_author.return_value.generate_chapter_content.side_effect = lambda topic, **kw: (
+        f"Body of {topic['title']} \\citep{{{','.join(kw['citation_map'].values())}}}"
+    )
+    orchestrator = BookOrchestrator(load_book_config(config_file))
+
+    with patch.object(BookOrchestrator, "_generate_portraits", return_value={}) as mock_portraits:
+        result = orchestrator.run()
+
+    out = tmp_path / "out"
+    assert [c["status"] for c in result["chapters"]] == ["completed", "completed"]
+    assert "Body of Neural Networks" in (out / "Chapter-NeuralNetworks.tex").read_text()
+    main_tex = (out / "main.tex").read_text()
+    assert "\\include{Chapter-Introduction}" in main_tex and "\\include{Chapter-NeuralNetworks}" in main_tex
+    assert "Introduction Paper" in (out / "bibliography.bib").read_text()
+    mock_portraits.assert_called_once()
+
+@patch('slides_to_textbook.modules.book_orchestrator.ContentAuthor')
+def test_failed_chapter_does_not_block_others(mock_author, config_file, tmp_path):
+    def generate(topic, **kw):
+        if topic["title"] == "Introduction":
+            raise RuntimeError("model down")
+        return "ok"
+    mock_author.return_value.generate_chapter_content.side_effect = generate
+    orchestrator = BookOrchestrator(load_book_config(config_file))
+
+    with patch.object(BookOrchestrator, "_generate_portraits", return_value={}):
+        result = orchestrator.run()
+
+    intro, nn = result["chapters"]
+    assert intro["status"] == "failed"
+    assert intro["stages"]["author"]["error"] == "model down"
+    assert intro["stages"]["build"]["status"] == "pending"
+    assert nn["status"] == "completed"
+    main_tex = (tmp_path / "out" / "main.tex").read_text()
+    assert "\\include{Chapter-NeuralNetworks}" in main_tex
+    assert "Chapter-Introduction.tex" not in main_tex
+
+@patch('slides_to_textbook.modules.book_orchestrator.ContentAuthor')
+def test_bibliography_persists_and_keeps_only_cited_entries(mock_author, config_file, tmp_path):
+    # Only the Introduction chapter cites its paper
+    mock_author.return_value.generate_chapter_content.side_effect = lambda topic, **kw: (
+        f"\\citep{{{kw['citation_map']['Introduction Paper']}}}" if topic["title"] == "Introduction"
+        else "No citations"
+    )
+    config = load_book_config(config_file)
+    with patch.object(BookOrchestrator, "_generate_portraits", return_value={}):
+        BookOrchestrator(config).run()
+
+    out = tmp_path / "out"
+    bib = (out / "bibliography.bib").read_text()
+    assert "Introduction Paper" in bib and "Neural Networks Paper" not in bib
+    db = json.loads((out / "bibliography.json").read_text())
+    assert len(db["used"]) == 1 and [e["title"] for e in db["entries"]] == ["Introduction Paper"]
+
+    # Same citations again: the .bib is not regenerated
+    with patch.object(BookOrchestrator, "_generate_portraits", return_value={}), \
+            patch.object(LaTeXBuilder, "write_bibliography") as write:
+        BookOrchestrator(config).run()
+    write.assert_not_called()
+
+@patch('slides_to_textbook.modules.book_orchestrator.ContentAuthor')
+def test_bibliography_keys_follow_chapter_order(mock_author, config_file, tmp_path):
+    # Both chapters cite a different Lovelace 1843 paper; the later chapter
+    # gets the suffix even when it finishes research first
+    mock_author.return_value.generate_chapter_content.side_effect = lambda topic, **kw: (
+        f"\\citep{{{kw['citation_map'][topic['title'] + ' Paper']}}}"
+    )
+    research = BookOrchestrator._stage_research
+    nn_done = threading.Event()
+
+    def slow_intro(self, chapter):
+        if chapter["title"] == "Introduction":
+            nn_done.wait(5)
+        research(self, chapter)
+        if chapter["title"] == "Neural Networks":
+            nn_done.set()
+
+    with patch.object(BookOrchestrator, "_generate_portraits", return_value={}), \
+            patch.object(BookOrchestrator, "_stage_research", slow_intro):
+        result = BookOrchestrator(load_book_config(config_file)).run()
+
+    intro, nn = result["chapters"]
+    assert intro["citation_map"] == {"Introduction Paper": "Lovelace1843"}
+    assert nn["citation_map"] == {"Neural Networks Paper": "Lovelace1843a"}
+    out = tmp_path / "out"
+    assert (out / "Chapter-Introduction.tex").read_text().count("\\citep{Lovelace1843}") == 1
+    assert "\\citep{Lovelace1843a}" in (out / "Chapter-NeuralNetworks.tex").read_text()
+    assert "Lovelace1843a" in (out / "bibliography.bib").read_text()
+
+@patch('slides_to_textbook.modules.book_orchestrator.ContentAuthor')
+def test_new_citation_never_takes_an_existing_key(mock_author, tmp_path):
+    # The book already has X as Hinton2006; the chapter cites X and a new 2006 Hinton paper Y
+    x = {"title": "A fast learning algorithm for deep belief nets", "author": ["Geoffrey Hinton"],
+         "year": "2006", "entry_type": "article"}
+    y = {"title": "Reducing the dimensionality of data", "author": ["Geoffrey Hinton"],
+         "year": "2006", "entry_type": "article"}
+    out = tmp_path / "out"
+    out.mkdir()
+    existing = BibliographyManager(out / "bibliography.json")
+    assert existing.add_entry(x) == "Hinton2006"
+    existing.save()
+    (tmp_path / "t1.json").write_text(json.dumps({
+        "title": "Deep Nets", "sections": [], "concepts": [], "people": [],
+        "research": {"historical_context": "History.", "citations": [x, y]}
+    }))
+    config_path = tmp_path / "book.json"
+    config_path.write_text(json.dumps({"output_dir": "out", "lectures": [{"topic_json": "t1.json"}],
+                                       "extract_people": False, "cache_dir": str(tmp_path / "cache")}))
+    mock_author.return_value.generate_chapter_content.side_effect = lambda topic, **kw: (
+        f"X \\citep{{{kw['citation_map'][x['title']]}}}, Y \\citep{{{kw['citation_map'][y['title']]}}}."
+    )
+
+    with patch.object(BookOrchestrator, "_generate_portraits", return_value={}):
+        result = BookOrchestrator(load_book_config(config_path)).run()
+
+    assert result["chapters"][0]["citation_map"] == {x["title"]: "Hinton2006", y["title"]: "Hinton2006a"}
+    assert "X \\citep{Hinton2006}, Y \\citep{Hinton2006a}." in (out / "Chapter-DeepNets.tex").read_text()
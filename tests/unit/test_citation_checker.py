@@ -0,0 +1,67 @@
+import pytest
+from slides_to_textbook.modules.citation_checker import CitationChecker
+
+BIB = """
+@article{LeCun2015,
+  title={Deep learning},
+  year={2015},
+}
+
+@article{Hinton2006a,
+  title={Reducing the dimensionality of data},
+  year={2006},
+}
+
+@book{Bishop2006,
+  title={Pattern Recognition},
+}
+"""
+
+@pytest.fixture
+def book(tmp_path):
+    (tmp_path / "bibliography.bib").write_text(BIB)
+    (tmp_path / "Chapter-A.tex").write_text("Intro \\citep{LeCun2015}.\nMore \\citep{lecun2015, Hinton2006}.\n")
+    (tmp_path / "Chapter-B.tex").write_text("Line one\nLine two \\citet{Nobody1999}\n")
+    return tmp_path
+
+def test_reports_unknown_and_unused(book):
+    report = CitationChecker(book).check()
+
+    assert report["cited"] == {"LeCun2015": 1}
+    assert report["unknown"] == [
+        {"key": "lecun2015", "file": "Chapter-A.tex", "line": 2, "suggestion": "LeCun2015",
+         "candidates": ["LeCun2015"]},
+        {"key": "Hinton2006", "file": "Chapter-A.tex", "line": 2, "suggestion": "Hinton2006a",
+         "candidates": ["Hinton2006a"]},
+        {"key": "Nobody1999", "file": "Chapter-B.tex", "line": 2, "suggestion": None, "candidates": []},
+    ]
+    assert report["unused"] == ["Hinton2006a", "Bishop2006"]
+    assert report["fixed"] == 0
+
+def test_fix_rewrites_near_misses(book):
+    report = CitationChecker(book).check(fix=True)
+
+    assert report["fixed"] == 2
+    assert (book / "Chapter-A.tex").read_text() == "Intro \\citep{LeCun2015}.\nMore \\citep{LeCun2015, Hinton2006a}.\n"
+    assert "Nobody1999" in (book / "Chapter-B.tex").read_text()
+
+    again = CitationChecker(book).check()
+    assert [u["key"] for u in again["unknown"]] == ["Nobody1999"]
+    assert again["unused"] == ["Bishop2006"]
+
+def test_ambiguous_near_miss_is_reported_not_fixed(book):
+    bib = book / "bibliography.bib"
+    bib.write_text(bib.read_text() + "\n@article{Hinton2006b,\n  title={Another},\n  year={2006},\n}\n")
+
+    report = CitationChecker(book).check(fix=True)
+
+    hinton = next(u for u in report["unknown"] if u["key"] == "Hinton2006")
+    assert hinton["suggestion"] is None
+    assert hinton["candidates"] == ["Hinton2006a", "Hinton2006b"]
+    assert report["fixed"] == 1
+    assert (book / "Chapter-A.tex").read_text() == "Intro \\citep{LeCun2015}.\nMore \\citep{LeCun2015, Hinton2006}.\n"
+
+def test_nocite_star_is_not_a_key(book):
+    (book / "Chapter-C.tex").write_text("\\nocite{*}\n")
+    report = CitationChecker(book).check()
+    assert "*" not in [u["key"] for u in report["unknown"]]
@@ -0,0 +1,127 @@
+import json
+import pytest
+from unittest.mock import patch
+from slides_to_textbook import cli
+
+def test_no_command_prints_help(capsys):
+    assert cli.main([]) == 1
+    assert "usage" in capsys.readouterr().out
+
+@patch('slides_to_textbook.modules.content_author.ContentAuthor.regenerate_sections')
+def test_regenerate_command(mock_regen, tmp_path):
+    topic = tmp_path / "topic.json"
+    topic.write_text(json.dumps({"title": "Intro"}))
+    chapter = tmp_path / "Chapter-Intro.tex"
+    chapter.write_text("\\section{A}\nx\n")
+    mock_regen.return_value = ["A", "B"]
+
+    code = cli.main(["regenerate", str(chapter), "-s", "A", "-s", "B", "--topic-json", str(topic)])
+
+    assert code == 0
+    args, kwargs = mock_regen.call_args
+    assert args[1] == ["A", "B"]
+    assert args[2] == {"title": "Intro"}
+
+def test_regenerate_requires_section(tmp_path):
+    with pytest.raises(SystemExit):
+        cli.main(["regenerate", str(tmp_path / "c.tex"), "--topic-json", "t.json"])
+
+def test_cli_import_is_lightweight():
+    import subprocess, sys
+    code = (
+        "import sys, slides_to_textbook.cli as c; c.build_parser(); "
+        "heavy = [m for m in ('anthropic', 'pdfplumber', 'jinja2', 'google.genai') if m in sys.modules]; "
+        "print(heavy)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+def test_build_command_uses_existing_chapters(tmp_path, capsys):
+    (tmp_path / "Chapter-A.tex").write_text("a")
+    (tmp_path / "Chapter-B.tex").write_text("b")
+
+    code = cli.main(["build", "-o", str(tmp_path), "--book-title", "Book", "--cache-dir", str(tmp_path / "cache")])
+
+    assert code == 0
+    main_tex = (tmp_path / "main.tex").read_text()
+    assert main_tex.index("\\include{Chapter-A}") < main_tex.index("\\include{Chapter-B}")
+
+def test_build_command_without_chapters_fails(tmp_path):
+    assert cli.main(["build", "-o", str(tmp_path)]) == 1
+
+def test_validate_command_reports_failure(tmp_path, capsys):
+    assert cli.main(["validate", "-o", str(tmp_path)]) == 1
+    assert "main.tex missing" in capsys.readouterr().out
+
+@patch('slides_to_textbook.benchmarks.run_benchmarks')
+def test_bench_command(mock_run, capsys):
+    mock_run.return_value = {"asset_injection": {"seconds": 0.1}}
+    assert cli.main(["bench", "asset_injection"]) == 0
+    mock_run.assert_called_once_with(["asset_injection"])
+    assert json.loads(capsys.readouterr().out)["asset_injection"]["seconds"] == 0.1
+
+@patch('slides_to_textbook.modules.pdf_analyzer.PDFAnalyzer')
+def test_analyze_command_caches_results(mock_analyzer, tmp_path):
+    pdf = tmp_path / "Lecture-1.pdf"
+    pdf.write_bytes(b"%PDF-1.4 fake")
+    mock_analyzer.return_value.analyze_pdf.return_value = {"analysis": {"title": "Intro"}}
+    argv = ["analyze", str(pdf), "-o", str(tmp_path / "out"), "--cache-dir", str(tmp_path / "cache")]
+
+    assert cli.main(argv) == 0
+    assert cli.main(argv) == 0
+
+    assert mock_analyzer.return_value.analyze_pdf.call_count == 1
+    assert json.loads((tmp_path / "out" / "Lecture-1.topic.json").read_text()) == {"title": "Intro"}
+
+@patch('slides_to_textbook.modules.book_orchestrator.BookOrchestrator')
+@patch('slides_to_textbook.modules.book_orchestrator.load_book_config')
+def test_run_command_overrides(mock_load, mock_orchestrator, tmp_path):
+    mock_load.return_value = {"output_dir": "x", "lectures": [{}], "workers": {"analyze": 4, "author": 4}}
+    mock_orchestrator.return_value.run.return_value = {"chapters": [{"title": "A", "status": "completed"}], "seconds": 1.0}
+
+    code = cli.main(["run", "book.json", "-j", "2", "-o", str(tmp_path)])
+
+    assert code == 0
+    config = mock_orchestrator.call_args[0][0]
+    assert config["workers"] == {"analyze": 2, "author": 2}
+    assert config["output_dir"] == str(tmp_path)
+
+def test_assets_command(tmp_path, capsys):
+    from PIL import Image
+    (tmp_path / "Figures").mkdir()
+    Image.new("RGB", (3000, 1500), "black").save(tmp_path / "Figures" / "wide.png")
+
+    assert cli.main(["assets", "-o", str(tmp_path), "--dpi", "100"]) == 0
+
+    assert "1 images" in capsys.readouterr().out
+    assert (tmp_path / "Print" / "Figures" / "wide.png").exists()
+
+def test_whitespace_command(tmp_path, capsys):
+    from PIL import Image
+    image = Image.new("RGB", (400, 400), "white")
+    image.paste((0, 0, 0), (100, 100, 300, 300))
+    image.save(tmp_path / "p.png")
+
+    assert cli.main(["whitespace", "-o", str(tmp_path), "--crop"]) == 0
+
+    out = capsys.readouterr().out
+    assert "p.png" in out and "1 cropped" in out
+
+def test_citations_command(tmp_path, capsys):
+    (tmp_path / "bibliography.bib").write_text("@book{LeCun2015,\n  title={T},\n}\n")
+    (tmp_path / "Chapter-A.tex").write_text("\\citep{lecun2015}")
+
+    assert cli.main(["citations", "-o", str(tmp_path)]) == 1
+    assert cli.main(["citations", "-o", str(tmp_path), "--fix"]) == 0
+
+    assert "lecun2015 -> LeCun2015" in capsys.readouterr().out
+    assert (tmp_path / "Chapter-A.tex").read_text() == "\\citep{LeCun2015}"
+
+def test_layout_command(tmp_path, capsys):
+    chapter = tmp_path / "Chapter-A.tex"
+    note = "\\automarginnote{\\includegraphics[width=\\linewidth]{Portraits/A/AlanTuring_Painting.png}}"
+    chapter.write_text(f"Intro{note}\nAlan Turing here")
+
+    assert cli.main(["layout", "-o", str(tmp_path)]) == 0
+
+    assert chapter.read_text() == f"Intro\nAlan Turing here{note}"
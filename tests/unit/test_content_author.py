@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import Mock, patch
-from slides_to_textbook.modules.content_author import ContentAuthor
+from slides_to_textbook.modules.content_author import ContentAuthor, split_sections
 
 @pytest.fixture
 def author():
@@ -40,3 +40,128 @@ def test_generate_section_failure(mock_ai_client, author):
     
     content = author._generate_section("Test Section", {})
     assert "% Error generating section" in content
+
+def test_inject_missing_assets_first_mention(author):
+    content = "Intro paragraph.\n\nWe discuss Regression and arthur samuel here.\n\nLater, Arthur Samuel again."
+    assets_map = {
+        "figures": {"Regression": "Fig-Regression.png"},
+        "portraits": {"Arthur Samuel": "Portraits/Chapter-Intro/ArthurSamuel_Painting.png"}
+    }
+
+    result = author._inject_missing_assets(content, assets_map)
+
+    # Portrait note follows the first (case-insensitive) mention only
+    assert result.count("ArthurSamuel_Painting.png") == 1
+    assert "arthur samuel\\automarginnote{" in result
+    # Figure goes after the paragraph containing the first mention
+    head, tail = result.split("\\begin{figure}", 1)
+    assert "here." in head
+    assert "Later, Arthur Samuel again." in tail
+    assert "\\includegraphics[width=0.9\\linewidth]{Figures/Fig-Regression.png}" in result
+
+def test_inject_missing_assets_skips_present_and_unmentioned(author):
+    content = "Regression is here.\n\\includegraphics{Figures/Fig-Regression.png}"
+    assets_map = {
+        "figures": {"Regression": "Fig-Regression.png", "Clustering": "Fig-Clustering.png"},
+        "portraits": {}
+    }
+
+    result = author._inject_missing_assets(content, assets_map)
+
+    assert result == content
+
+def test_inject_missing_assets_strips_ai_portraits(author):
+    content = "Hinton\\automarginnote{\\includegraphics[width=\\linewidth]{Portraits/X/Old.png}} worked."
+    assets_map = {"figures": {}, "portraits": {"Hinton": "Portraits/X/Hinton.png"}}
+
+    result = author._inject_missing_assets(content, assets_map)
+
+    assert "Old.png" not in result
+    assert result == "Hinton\\automarginnote{\\includegraphics[width=\\linewidth]{Portraits/X/Hinton.png}} worked."
+
+def test_inject_missing_assets_nested_names_keep_sequential_order(author):
+    content = "Work by Alan Turing here.\n\nNeural Network and Neural Network again."
+    note = "\\automarginnote{{\\includegraphics[width=\\linewidth]{{Portraits/X/{}.png}}}}"
+    assets_map = {"figures": {}, "portraits": {
+        "Turing": "Portraits/X/Turing.png",
+        "Alan Turing": "Portraits/X/AlanTuring.png",
+        "Neural": "Portraits/X/Neural.png",
+        "Neural Network": "Portraits/X/NeuralNetwork.png",
+    }}
+
+    result = author._inject_missing_assets(content, assets_map)
+
+    # Same as inserting the notes one by one: a later note on the same name
+    # goes first, and a name split by an earlier note moves to its next mention
+    assert result == (
+        "Work by Alan Turing" + note.format("AlanTuring") + note.format("Turing") + " here.\n\n"
+        "Neural" + note.format("Neural") + " Network and Neural Network" + note.format("NeuralNetwork") + " again."
+    )
+
+def test_inject_missing_assets_matches_reference(author):
+    from slides_to_textbook.benchmarks import _reference_inject_missing_assets
+
+    content = "Alan Turing met Ada Lovelace.\n\nTuring and Lovelace, then Hinton.\n\nGeoffrey Hinton."
+    assets_map = {"figures": {"Hinton": "Fig-Hinton.png"}, "portraits": {
+        "Lovelace": "Portraits/X/Lovelace.png",
+        "Ada Lovelace": "Portraits/X/AdaLovelace.png",
+        "Geoffrey Hinton": "Portraits/X/GeoffreyHinton.png",
+        "Alan Turing": "Portraits/X/AlanTuring.png",
+    }}
+
+    assert author._inject_missing_assets(content, assets_map) == _reference_inject_missing_assets(content, assets_map)
+
+def test_split_sections():
+    content = "\\chapter{X}\n\\section{Introduction}\nIntro text.\n\n\\section{Overfitting}\nBody.\n"
+    sections = split_sections(content)
+    assert [s[0] for s in sections] == ["Introduction", "Overfitting"]
+    title, start, end = sections[1]
+    assert content[start:end] == "Body.\n"
+
+def test_regenerate_sections_in_place(author, tmp_path):
+    chapter = tmp_path / "Chapter-Intro.tex"
+    chapter.write_text(
+        "\\chapter{ Intro }\n\\section{Introduction}\nKeep me.\n\n"
+        "\\section{Overfitting}\nOld weak text.\n\n\\section{Summary}\nAlso keep.\n"
+    )
+    author.ai_client = Mock()
+    author.ai_client.generate_text.return_value = "Overfitting\nFresh text about Hinton."
+    assets_map = {"figures": {}, "portraits": {"Hinton": "Portraits/X/Hinton.png"}}
+
+    regenerated = author.regenerate_sections(chapter, ["Overfitting"], {"title": "Intro"}, assets_map=assets_map)
+
+    assert regenerated == ["Overfitting"]
+    assert author.ai_client.generate_text.call_count == 1
+    result = chapter.read_text()
+    assert "Old weak text." not in result
+    assert "Keep me." in result and "Also keep." in result
+    assert "\\section{Overfitting}\nFresh text about Hinton\\automarginnote{" in result
+    assert list(tmp_path.iterdir()) == [chapter]
+
+def test_regenerate_sections_unknown_title(author, tmp_path):
+    chapter = tmp_path / "Chapter-Intro.tex"
+    chapter.write_text("\\section{Introduction}\nText\n")
+    author.ai_client = Mock()
+    with pytest.raises(ValueError):
+        author.regenerate_sections(chapter, ["Missing"], {})
+    author.ai_client.generate_text.assert_not_called()
+
+def test_prompt_budget_reports_savings():
+    author = ContentAuthor(prompt_token_budget=20)
+    author.ai_client = Mock()
+    author.ai_client.generate_text.return_value = "text"
+    topic_data = {
+        "title": "ML",
+        "concepts": ["Overfitting"] + [f"Unrelated concept number {i}" for i in range(30)],
+        "people": ["Arthur Samuel"],
+    }
+
+    author._generate_section("Overfitting", topic_data)
+
+    prompt = author.ai_client.generate_text.call_args[0][0]
+    assert "Overfitting" in prompt
+    assert "Unrelated concept number 29" not in prompt
+    stats = author.prompt_stats[-1]
+    assert stats["section"] == "Overfitting"
+    assert stats["saved_tokens"] > 0
+    assert stats["full_tokens"] == stats["prompt_tokens"] + stats["saved_tokens"]
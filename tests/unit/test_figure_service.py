@@ -0,0 +1,38 @@
+from PIL import Image
+from slides_to_textbook.modules.figure_service import FigureService
+
+class FakeClient:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.prompts = []
+
+    def generate(self, prompt, resolution=(1024, 1024), **kwargs):
+        self.prompts.append(prompt)
+        if any(name in prompt for name in self.fail):
+            raise RuntimeError("quota exceeded")
+        return Image.new("RGBA", resolution, "white")
+
+def test_generate_skips_existing_and_writes_new(tmp_path):
+    (tmp_path / "Fig-Old.png").write_bytes(b"existing")
+    client = FakeClient(fail=["broken"])
+    service = FigureService(tmp_path, client=client, resolution=(40, 30))
+
+    results = service.generate({
+        "Fig-Old.png": "an old figure",
+        "Fig-New.png": "a new figure",
+        "Fig-Photo.jpg": "a photo",
+        "Fig-Broken.png": "a broken figure",
+    })
+
+    assert results["Fig-Old.png"]["status"] == "exists"
+    assert results["Fig-New.png"]["status"] == "generated"
+    assert Image.open(tmp_path / "Fig-New.png").size == (40, 30)
+    assert Image.open(tmp_path / "Fig-Photo.jpg").format == "JPEG"
+    assert results["Fig-Broken.png"]["status"] == "failed"
+    assert "quota" in results["Fig-Broken.png"]["error"]
+    assert len(client.prompts) == 3
+
+def test_no_client_marks_failed(tmp_path, monkeypatch):
+    monkeypatch.setattr("slides_to_textbook.modules.figure_service.get_shared_image_client", lambda: None)
+    results = FigureService(tmp_path).generate({"Fig-A.png": "a figure"})
+    assert results["Fig-A.png"]["status"] == "failed"
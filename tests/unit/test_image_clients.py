@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from PIL import Image
+from slides_to_textbook.modules.portrait_service import PortraitService
+from slides_to_textbook.utils import image_clients
+from slides_to_textbook.utils.cache import DiskCache
+from slides_to_textbook.utils.image_clients import (
+    AsyncImageClient, ImageGenerationClient, SyncImageClient, get_shared_image_client
+)
+
+class FakeClient(ImageGenerationClient):
+    def __init__(self, failures=0, delay=0.05):
+        super().__init__("key")
+        self.failures = failures
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    def generate(self, prompt, resolution=(1024, 1024), **kwargs):
+        self.calls.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("503 overloaded")
+            return Image.new("RGB", resolution, "white")
+        finally:
+            self.active -= 1
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(tmp_path, "images")
+
+def test_identical_prompts_share_one_call(cache):
+    fake = FakeClient()
+    client = AsyncImageClient(fake, cache=cache)
+
+    async def run():
+        return await asyncio.gather(*(client.generate("a cat", (8, 8)) for _ in range(5)))
+
+    images = asyncio.run(run())
+    assert len(fake.calls) == 1
+    assert all(img.size == (8, 8) for img in images)
+    assert len({id(img) for img in images}) == 5
+
+def test_concurrency_is_bounded(cache):
+    fake = FakeClient()
+    client = AsyncImageClient(fake, max_concurrency=2, cache=cache)
+
+    results = asyncio.run(client.generate_many([f"p{i}" for i in range(6)], (4, 4)))
+
+    assert len(fake.calls) == 6
+    assert fake.peak <= 2
+    assert all(isinstance(r, Image.Image) for r in results)
+
+def test_retries_with_backoff(cache):
+    fake = FakeClient(failures=2, delay=0)
+    client = AsyncImageClient(fake, max_retries=3, base_delay=0, cache=cache)
+
+    image = asyncio.run(client.generate("retry me", (4, 4)))
+
+    assert image.size == (4, 4)
+    assert len(fake.calls) == 3
+
+def test_gives_up_after_max_retries(cache):
+    fake = FakeClient(failures=5, delay=0)
+    client = AsyncImageClient(fake, max_retries=1, base_delay=0, cache=cache)
+
+    results = asyncio.run(client.generate_many(["doomed"], (4, 4)))
+
+    assert isinstance(results[0], RuntimeError)
+    assert len(fake.calls) == 2
+
+def test_results_come_from_disk_cache(cache):
+    asyncio.run(AsyncImageClient(FakeClient(), cache=cache).generate("cached", (4, 4)))
+    fake = FakeClient()
+
+    image = asyncio.run(AsyncImageClient(fake, cache=cache).generate("cached", (4, 4)))
+
+    assert image.size == (4, 4)
+    assert fake.calls == []
+
+def test_sync_client_concurrent_callers_share_one_call(cache):
+    fake = FakeClient(delay=0.2)
+    client = SyncImageClient(AsyncImageClient(fake, cache=cache))
+    images = []
+
+    threads = [threading.Thread(target=lambda: images.append(client.generate("a dog", (8, 8)))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake.calls == ["a dog"]
+    assert [img.size for img in images] == [(8, 8), (8, 8)]
+
+def test_portrait_services_share_one_call_per_prompt(cache, tmp_path):
+    fake = FakeClient(delay=0.2)
+    shared = SyncImageClient(AsyncImageClient(fake, cache=cache))
+    services = [PortraitService(tmp_path / chapter, client=shared, resolution=(8, 8)) for chapter in ("A", "B")]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(lambda service: service.generate(["Ada Lovelace"]), services))
+
+    assert len(fake.calls) == 1
+    assert all(r["Ada Lovelace"]["status"] == "generated" for r in results)
+    assert (tmp_path / "A" / "AdaLovelace_Painting.png").exists()
+    assert (tmp_path / "B" / "AdaLovelace_Painting.png").exists()
+
+def test_shared_client_is_reused(monkeypatch, tmp_path):
+    monkeypatch.setattr(image_clients, "_shared_client", None)
+    monkeypatch.setattr(image_clients, "get_image_client", lambda: FakeClient())
+
+    first = get_shared_image_client(tmp_path)
+
+    assert isinstance(first, SyncImageClient)
+    assert get_shared_image_client() is first
+    assert first.client.cache.root == tmp_path / "images"
+
+def test_shared_client_none_without_key(monkeypatch):
+    monkeypatch.setattr(image_clients, "_shared_client", None)
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    assert get_shared_image_client() is None
@@ -1,7 +1,15 @@
 import pytest
 import shutil
 from pathlib import Path
-from slides_to_textbook.modules.latex_builder import LaTeXBuilder
+from slides_to_textbook.modules.latex_builder import LaTeXBuilder, get_template_env
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    # Keep template bytecode out of the real ~/.cache
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    get_template_env.cache_clear()
+    yield tmp_path / "cache"
+    get_template_env.cache_clear()
 
 @pytest.fixture
 def output_dir(tmp_path):
@@ -42,3 +50,82 @@ def test_build_book(builder, output_dir):
 def test_write_bib(builder, output_dir):
     builder.write_bibliography("test")
     assert (output_dir / "bibliography.bib").read_text() == "test"
+
+def _chapters():
+    return [{"title": f"Ch {i}", "safe_title": f"Ch{i}", "content": f"Body {i}", "file_name": f"Chapter-{i}.tex"}
+            for i in range(14)]
+
+def _build(builder):
+    chapters = _chapters()
+    written = [builder.build_chapter(c) for c in chapters]
+    written.append(builder.build_book("ML Book", chapters))
+    written.append(builder.write_bibliography("@book{x}"))
+    return written
+
+def _mtimes(output_dir):
+    return {p.name: p.stat().st_mtime_ns for p in output_dir.iterdir() if p.is_file()}
+
+def test_noop_rebuild_writes_nothing(output_dir):
+    assert all(_build(LaTeXBuilder(output_dir)))
+    before = _mtimes(output_dir)
+
+    # A fresh builder (new process) relies on the persisted manifest
+    assert not any(_build(LaTeXBuilder(output_dir)))
+    assert _mtimes(output_dir) == before
+
+def test_only_changed_chapter_is_written(builder, output_dir):
+    _build(builder)
+    chapter = _chapters()[3]
+    chapter["content"] = "Edited"
+
+    assert builder.build_chapter(chapter)
+    assert not builder.build_chapter(_chapters()[4])
+    assert "Edited" in (output_dir / "Chapter-3.tex").read_text()
+
+def test_external_edit_is_overwritten(builder, output_dir):
+    builder.write_bibliography("@book{x}")
+    (output_dir / "bibliography.bib").write_text("hand edited")
+
+    assert builder.write_bibliography("@book{x}")
+    assert (output_dir / "bibliography.bib").read_text() == "@book{x}"
+
+def test_book_title_is_rendered(builder, output_dir):
+    builder.build_book("ML Book", [{"file_name": "Chapter-1.tex"}])
+    content = (output_dir / "main.tex").read_text()
+    assert "{ ML Book }" in content
+    assert "\\include{Chapter-1}" in content
+
+def test_builders_share_one_environment(tmp_path):
+    assert LaTeXBuilder(tmp_path / "a").env is LaTeXBuilder(tmp_path / "b").env
+
+def test_bytecode_cache_on_disk(cache_home):
+    get_template_env()
+    assert len(list((cache_home / "slides_to_textbook" / "jinja").glob("*.cache"))) == 2
+
+def test_large_chapter_is_streamed_intact(builder, output_dir):
+    content = "\n".join(f"Line {i} of a long chapter." for i in range(20000))
+    chapter = {"title": "Long", "safe_title": "Long", "content": content, "file_name": "Chapter-Long.tex"}
+
+    assert builder.build_chapter(chapter)
+
+    expected = builder.env.get_template("chapter.tex.jinja2").render(chapter=chapter)
+    assert (output_dir / "Chapter-Long.tex").read_text() == expected
+
+def test_bytecode_cache_follows_cache_dir(tmp_path):
+    builder = LaTeXBuilder(tmp_path / "out", cache_dir=tmp_path / "custom")
+    assert builder.env is get_template_env(tmp_path / "custom")
+    assert len(list((tmp_path / "custom" / "jinja").glob("*.cache"))) == 2
+
+def test_changed_file_is_rendered_once(builder, output_dir):
+    builder.write_bibliography("@book{x}")
+    renders = []
+
+    def chunks():
+        renders.append(1)
+        yield "@book{y}"
+
+    assert builder._write_stream("bibliography.bib", chunks())
+    assert not builder._write_stream("bibliography.bib", chunks())
+    assert len(renders) == 2
+    assert (output_dir / "bibliography.bib").read_text() == "@book{y}"
+    assert not list(output_dir.glob("*.tmp"))
@@ -1,5 +1,9 @@
 import pytest
-from slides_to_textbook.modules.latex_components import MarginNoteGenerator, BibliographyManager
+import io
+from slides_to_textbook.modules.latex_components import (
+    MarginNoteGenerator, BibliographyManager, cited_keys, escape_bibtex, parse_bibtex,
+    rename_citations
+)
 
 def test_margin_note_simple():
     gen = MarginNoteGenerator()
@@ -35,3 +39,117 @@ def test_bib_generate():
     content = bib.generate_bibtex()
     assert "@article{Doe2023," in content
     assert "title = {A Paper}," in content
+
+def test_bib_key_collisions_get_suffixes():
+    bib = BibliographyManager()
+    keys = bib.add_entries([
+        {"title": "A fast learning algorithm for deep belief nets", "author": ["Geoffrey Hinton"], "year": "2006"},
+        {"title": "Reducing the dimensionality of data", "author": ["Geoffrey Hinton"], "year": "2006"},
+        {"title": "Third paper", "author": ["Geoffrey Hinton"], "year": "2006"},
+    ])
+    assert keys == ["Hinton2006", "Hinton2006a", "Hinton2006b"]
+    assert bib.get("Hinton2006a")["title"] == "Reducing the dimensionality of data"
+
+def test_bib_duplicates_are_merged():
+    bib = BibliographyManager()
+    key = bib.add_entry({"title": "Deep Learning", "author": ["Yann LeCun"], "year": "2015"})
+    again = bib.add_entry({"title": "{Deep} learning.", "author": ["Yann LeCun"], "year": "2015",
+                           "doi": "10.1038/nature14539", "journal": "Nature"})
+    by_doi = bib.add_entry({"title": "Deep learning (review)", "doi": "https://doi.org/10.1038/NATURE14539"})
+
+    assert key == again == by_doi == "LeCun2015"
+    assert len(bib) == 1
+    assert bib.get(key)["journal"] == "Nature"
+    assert bib.add_entry({"title": "Deep Learning", "author": ["Ian Goodfellow"], "year": "2016"}) != key
+    assert bib.find(title="deep learning", year="2015") == bib.find(doi="doi:10.1038/nature14539") == key
+
+def test_bib_title_alone_matches_without_year():
+    bib = BibliographyManager()
+    key = bib.add_entry({"title": "Deep Learning", "author": ["Yann LeCun"], "year": "2015"})
+    assert bib.find(title="Deep learning") == key
+    assert bib.add_entry({"title": "deep learning", "journal": "Nature"}) == key
+    assert bib.get(key)["journal"] == "Nature"
+
+    undated = bib.add_entry({"title": "Perceptrons", "author": ["Marvin Minsky"]})
+    assert bib.add_entry({"title": "Perceptrons", "year": "1969"}) == undated
+    assert bib.get(undated)["year"] == "1969"
+    # Once dated, a different year is a different work again
+    assert bib.add_entry({"title": "Perceptrons", "author": ["Marvin Minsky"], "year": "1988"}) != undated
+    assert len(bib) == 3
+
+def test_bib_explicit_key_is_kept_unless_taken():
+    bib = BibliographyManager()
+    assert bib.add_entry({"ID": "samuel1959some", "title": "Some studies", "author": ["Arthur Samuel"]}) == "samuel1959some"
+    assert bib.add_entry({"ID": "samuel1959some", "title": "Other", "author": ["Arthur Samuel"], "year": "1959"}) == "Samuel1959"
+
+def test_escape_bibtex_keeps_math_and_escapes():
+    assert escape_bibtex("R&D 100% #1 a_b") == "R\\&D 100\\% \\#1 a\\_b"
+    assert escape_bibtex("$k_1$-means \\& more") == "$k_1$-means \\& more"
+
+def test_bibtex_is_sorted_escaped_and_streamed():
+    bib = BibliographyManager()
+    bib.add_entry({"title": "Q&A", "author": ["Zed Zulu"], "year": "2001", "url": "http://x.org/a_b%20c"})
+    bib.add_entry({"title": "Alpha", "author": "Ann Able; Bob Baker", "year": "1999", "entry_type": "book"})
+
+    fh = io.StringIO()
+    assert bib.write_bibtex(fh) == 2
+    text = fh.getvalue()
+
+    assert text.index("@book{Able1999,") < text.index("@misc{Zulu2001,")
+    assert "author = {Ann Able and Bob Baker}," in text
+    assert "title = {Q\\&A}," in text
+    assert "url = {http://x.org/a_b%20c}," in text
+    assert text == bib.generate_bibtex()
+
+def test_bibtex_cache_refreshes_after_merge():
+    bib = BibliographyManager()
+    key = bib.add_entry({"title": "Deep Learning", "author": ["Yann LeCun"], "year": "2015"})
+    assert "journal" not in bib.format_entry(key)
+    bib.add_entry({"title": "Deep learning", "year": "2015", "journal": "Nature"})
+    assert "journal = {Nature}," in bib.format_entry(key)
+
+def test_cited_keys():
+    text = "See \\citep{a, b} and \\citet*[see][p.~3]{c}; again \\cite{a}. \\nocite{ d }"
+    assert cited_keys(text) == ["a", "b", "c", "d"]
+
+def test_rename_citations_swaps_keys_in_place():
+    text = "See \\citep[p. 3]{a, b} and \\citet{b}; a stays."
+    assert rename_citations(text, {"a": "b", "b": "a"}) == "See \\citep[p. 3]{b, a} and \\citet{a}; a stays."
+
+def test_parse_bibtex():
+    entries = parse_bibtex("""
+@comment{ignored}
+@Article{lecun2015deep,
+  title={{Deep} learning},
+  author = "LeCun, Yann and Bengio, Yoshua",
+  year = 2015,
+}
+""")
+    assert entries == [{"entry_type": "article", "ID": "lecun2015deep", "title": "{Deep} learning",
+                        "author": "LeCun, Yann and Bengio, Yoshua", "year": "2015"}]
+
+def test_bib_database_persists_and_prunes(tmp_path):
+    path = tmp_path / "bibliography.json"
+    bib = BibliographyManager(path)
+    kept = bib.add_entry({"title": "Kept", "author": ["Ada Lovelace"], "year": "1843"})
+    dropped = bib.add_entry({"title": "Dropped", "author": ["Alan Turing"], "year": "1950"})
+
+    assert bib.prune([kept]) == [dropped]
+    bib.used = [kept]
+    bib.save()
+
+    again = BibliographyManager(path)
+    assert again.used == [kept] and not again.changed
+    assert [e["title"] for e in again.entries] == ["Kept"]
+    assert again.find(title="Dropped", year="1950") is None
+    # Re-adding a known citation is not a change
+    again.add_entry({"title": "kept", "author": ["Ada Lovelace"], "year": "1843"})
+    assert not again.changed
+
+def test_bibtex_subset():
+    bib = BibliographyManager()
+    a = bib.add_entry({"title": "A", "author": ["X Y"], "year": "1"})
+    bib.add_entry({"title": "B", "author": ["Z W"], "year": "2"})
+    assert bib.generate_bibtex().count("@") == 2
+    fh = io.StringIO()
+    assert bib.write_bibtex(fh, keys=[a, "missing"]) == 1
@@ -0,0 +1,87 @@
+from slides_to_textbook.modules.latex_components import MarginNoteGenerator
+from slides_to_textbook.modules.margin_scheduler import MarginNoteScheduler, extract_margin_notes
+from slides_to_textbook.modules.people_registry import PeopleRegistry
+
+def note(stem):
+    return f"\\automarginnote{{\\includegraphics[width=\\linewidth]{{Portraits/Ch/{stem}_Painting.png}}}}"
+
+def test_extract_margin_notes():
+    text = f"a\nb {note('AlanTuring')} c\nd {note('AdaLovelace')}\n\\automarginnote{{plain}}"
+    body, notes = extract_margin_notes(text)
+    assert body == "a\nb  c\nd \n\\automarginnote{plain}"
+    assert [(n["image"], n["line"]) for n in notes] == [
+        ("Portraits/Ch/AlanTuring_Painting.png", 1),
+        ("Portraits/Ch/AdaLovelace_Painting.png", 2),
+    ]
+
+def test_index_mentions_uses_aliases():
+    registry = PeopleRegistry()
+    registry.add("Geoffrey Hinton", aliases=["Hinton"])
+    scheduler = MarginNoteScheduler(registry=registry)
+    lines = ["intro", "Hinton said", "x", "Geoffrey Hinton again"]
+    assert scheduler.index_mentions(lines, ["Geoffrey Hinton"]) == {"Geoffrey Hinton": [1, 3]}
+
+def test_notes_keep_spacing_when_possible():
+    lines = ["filler"] * 100
+    for i in (0, 5, 60):
+        lines[i] = "Alan Turing " + lines[i]
+    for i in (2, 70):
+        lines[i] = "Ada Lovelace " + lines[i]
+    scheduler = MarginNoteScheduler(min_spacing=40)
+
+    placements = scheduler.schedule(lines, {"Alan Turing": "T", "Ada Lovelace": "L"})
+
+    # Turing takes his first mention; Lovelace moves past line 2 to line 70
+    assert placements == {0: ["T"], 70: ["L"]}
+
+def test_crowded_chapter_uses_most_isolated_mention():
+    lines = ["Alan Turing", "Ada Lovelace", "x", "x", "Ada Lovelace"]
+    placements = MarginNoteScheduler(min_spacing=40).schedule(lines, {"Alan Turing": "T", "Ada Lovelace": "L"})
+    assert placements == {0: ["T"], 4: ["L"]}
+
+def test_apply_takes_margin_note_generator_output():
+    generator = MarginNoteGenerator()
+    notes = {"Alan Turing": generator.generate_person_note("Alan Turing", "1912-1954", "Portraits/AlanTuring.png")}
+    text = "Intro\nAlan Turing proposed a test.\nEnd"
+
+    result = MarginNoteScheduler().apply(text, notes)
+
+    assert result.split("\n")[1] == "Alan Turing proposed a test." + notes["Alan Turing"]
+
+def test_reschedule_spreads_existing_notes_and_dedupes():
+    lines = ["filler"] * 90
+    lines[1] = f"Alan Turing and Ada Lovelace {note('AlanTuring')}{note('AdaLovelace')}{note('AlanTuring')}"
+    lines[80] = "Ada Lovelace later"
+    lines[85] = f"Nobody mentioned here {note('GraceHopper')}"
+
+    result = MarginNoteScheduler(min_spacing=40).reschedule("\n".join(lines)).split("\n")
+
+    assert result[1] == "Alan Turing and Ada Lovelace" + note("AlanTuring")
+    assert result[80] == "Ada Lovelace later" + note("AdaLovelace")
+    assert result[85] == "Nobody mentioned here" + note("GraceHopper")
+    assert sum(line.count("\\automarginnote") for line in result) == 3
+
+def test_camel_case_surnames_match_without_registry():
+    scheduler = MarginNoteScheduler(min_spacing=5)
+    assert scheduler.name_for_image("Portraits/Ch/YannLeCun_Painting.png") == "Yann LeCun"
+    assert scheduler.name_for_image("Portraits/Ch/JohnMcCarthy_Painting.png") == "John McCarthy"
+
+    lines = ["filler"] * 20
+    lines[2] = f"intro{note('YannLeCun')}"
+    lines[15] = "Yann LeCun built LeNet"
+
+    result = scheduler.reschedule("\n".join(lines)).split("\n")
+
+    assert result[2] == "intro"
+    assert result[15] == "Yann LeCun built LeNet" + note("YannLeCun")
+
+def test_non_portrait_notes_are_left_untouched():
+    figure = "\\automarginnote{\\includegraphics[width=\\linewidth]{Figures/Fig-Turing_Machine.png}}"
+    other = "\\automarginnote{\\includegraphics[width=\\linewidth]{Figures/Fig-Turing_Test.png}}"
+    text = f"a {figure}\nb {other}\nAlan Turing{note('AlanTuring')}"
+
+    body, notes = extract_margin_notes(text)
+
+    assert body == f"a {figure}\nb {other}\nAlan Turing"
+    assert [n["image"] for n in notes] == ["Portraits/Ch/AlanTuring_Painting.png"]
+    assert MarginNoteScheduler().reschedule(text) == text
@@ -0,0 +1,60 @@
+import json
+from slides_to_textbook.modules.people_registry import PeopleRegistry, compact_key, person_key
+
+def test_keys():
+    assert person_key("Yann LeCun") == "yann-lecun"
+    assert compact_key("Yann Le Cun") == compact_key("YannLeCun") == "yannlecun"
+
+def test_aliases_surnames_and_filenames_resolve():
+    registry = PeopleRegistry()
+    hinton = registry.add("Geoffrey Hinton", aliases=["Geoff Hinton"])
+    lecun = registry.add("Yann LeCun")
+
+    assert registry.resolve("geoffrey  hinton") == hinton
+    assert registry.resolve("Geoff Hinton") == hinton
+    assert registry.resolve("Hinton") == hinton
+    assert registry.resolve("Yann Le Cun") == lecun
+    assert registry.from_filename("Portraits/Chapter-Intro/YannLeCun_Painting.png") == lecun
+    assert registry.name(registry.from_filename("YannLeCun.jpg")) == "Yann LeCun"
+    assert registry.resolve("Alan Turing") is None
+
+def test_ambiguous_surname_does_not_resolve():
+    registry = PeopleRegistry()
+    registry.add("Geoffrey Hinton")
+    registry.add("Charles Hinton")
+
+    assert registry.resolve("Hinton") is None
+    assert len(registry) == 2
+
+def test_canonicalize_folds_variants_in_order():
+    registry = PeopleRegistry()
+
+    names = registry.canonicalize(["Hinton", "Yann LeCun", "Geoffrey Hinton", "yann lecun", "Turing"])
+
+    assert names == ["Geoffrey Hinton", "Yann LeCun", "Turing"]
+
+def test_filename_uses_canonical_name():
+    registry = PeopleRegistry()
+    registry.add("Yann LeCun")
+
+    assert registry.filename("yann le cun") == "YannLeCun_Painting.png"
+
+def test_compact_index_round_trip(tmp_path):
+    path = tmp_path / "people.json"
+    registry = PeopleRegistry(path)
+    person_id = registry.add("Geoffrey Hinton", aliases=["G. E. Hinton"])
+    registry.save()
+
+    data = json.loads(path.read_text())
+    assert data == {"v": 1, "people": {"geoffrey-hinton": ["Geoffrey Hinton", "G. E. Hinton"]}}
+
+    reloaded = PeopleRegistry(path)
+    assert reloaded.resolve("G E Hinton") == person_id
+    assert reloaded.resolve("Hinton") == person_id
+
+def test_resolve_without_surnames():
+    registry = PeopleRegistry()
+    registry.add("Geoffrey Hinton")
+    assert registry.resolve("Hinton") == "geoffrey-hinton"
+    assert registry.resolve("Hinton", surnames=False) is None
+    assert registry.resolve("GeoffreyHinton", surnames=False) == "geoffrey-hinton"
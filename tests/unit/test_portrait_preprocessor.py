@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from PIL import Image
+from slides_to_textbook.modules.portrait_preprocessor import (
+    PATTERN_EXTRACTOR, PatternNameExtractor, PortraitPreprocessor, chunk_text, has_name_candidates
+)
+
+@pytest.fixture
+def chapters(tmp_path):
+    a = tmp_path / "Chapter-A.tex"
+    a.write_text("Alan Turing (1912-1954) proposed the test. Ada Lovelace (1815-1852) wrote programs.")
+    b = tmp_path / "Chapter-B.tex"
+    b.write_text("Geoffrey Hinton (1947-) popularised backprop. Alan Turing, again.")
+    return [a, b]
+
+def test_extract_batch_merges_and_dedupes(chapters):
+    people = PortraitPreprocessor().extract_batch(chapters, use_ai=False)
+
+    assert [p["name"] for p in people] == ["Alan Turing", "Ada Lovelace", "Geoffrey Hinton"]
+    turing = people[0]
+    assert turing["context"] == "Born 1912"
+    assert [s["source"] for s in turing["sources"]] == [str(chapters[0]), str(chapters[1])]
+
+def test_extract_batch_runs_ai_calls_concurrently(chapters):
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_ai(self, content):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return [{"name": "Alan Turing", "context": content[:10]}]
+
+    with patch.object(PortraitPreprocessor, "_extract_with_ai", fake_ai):
+        people = PortraitPreprocessor().extract_batch(chapters, use_ai=True, max_workers=2)
+
+    assert peak[0] == 2
+    assert len(people) == 1 and len(people[0]["sources"]) == 2
+
+def test_ai_calls_are_bounded_across_sources_and_chunks(tmp_path):
+    filler = "the model is trained with gradient descent. " * 600
+    sources = []
+    for i in range(4):
+        path = tmp_path / f"Chapter-{i}.tex"
+        path.write_text(f"Alan Turing {i}. {filler}Ada Lovelace {i}. {filler}Geoffrey Hinton {i}.")
+        sources.append(path)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_generate(prompt, system_prompt):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return json.dumps({"people": []})
+
+    with patch("slides_to_textbook.utils.api_clients.AIClient") as MockClient:
+        MockClient.return_value.generate_text.side_effect = fake_generate
+        PortraitPreprocessor(max_ai_calls=3).extract_batch(sources, use_ai=True, max_workers=4)
+
+    assert MockClient.return_value.generate_text.call_count > 4
+    assert peak[0] == 3
+
+def test_extract_batch_skips_failed_source(chapters, tmp_path):
+    missing = tmp_path / "missing.tex"
+
+    people = PortraitPreprocessor().extract_batch(chapters + [missing], use_ai=False)
+
+    assert len(people) == 3
+
+def test_extract_batch_rejects_unsupported_files(tmp_path):
+    with pytest.raises(ValueError):
+        PortraitPreprocessor().extract_batch([tmp_path / "notes.docx"], use_ai=False)
+
+def test_process_and_generate_accepts_list(chapters, tmp_path):
+    result = PortraitPreprocessor().process_and_generate(chapters, tmp_path / "out", use_ai=False, dry_run=True)
+
+    assert len(result["people"]) == 3
+    assert result["json_path"].exists()
+
+def test_chunk_text_overlaps_and_covers_everything():
+    text = " ".join(f"word{i}" for i in range(5000))
+
+    chunks = chunk_text(text, size=1000, overlap=100)
+
+    assert all(len(c) <= 1000 for c in chunks)
+    assert all(b[:100] == a[-100:] for a, b in zip(chunks, chunks[1:]))
+    assert chunks[0] == text[:len(chunks[0])] and text.endswith(chunks[-1])
+
+def test_has_name_candidates():
+    assert has_name_candidates("as shown by Geoffrey E. Hinton")
+    assert has_name_candidates(r"see \citep{lecun1998}")
+    assert not has_name_candidates("the loss $L = x^2$ is minimised by gradient descent")
+
+def test_ai_extraction_covers_late_mentions_and_canonicalizes():
+    filler = "the model is trained with gradient descent. " * 800
+    content = "Geoffrey Hinton (1947-) pioneered backprop. " + filler + "Later Hinton and Yann LeCun showed more."
+    prompts = []
+
+    def fake_generate(prompt, system_prompt):
+        prompts.append(prompt)
+        names = [n for n in ("Geoffrey Hinton", "Hinton", "Yann LeCun") if n in prompt.split("Content (part")[1]]
+        return json.dumps({"people": [{"name": n, "context": ""} for n in names]})
+
+    with patch("slides_to_textbook.utils.api_clients.AIClient") as MockClient:
+        MockClient.return_value.generate_text.side_effect = fake_generate
+        people = PortraitPreprocessor()._extract_with_ai(content)
+
+    assert [p["name"] for p in people] == ["Geoffrey Hinton", "Yann LeCun"]
+    # Filler-only chunks are never sent
+    assert 1 < len(prompts) < len(chunk_text(content))
+
+def test_failed_chunk_falls_back_to_patterns():
+    with patch("slides_to_textbook.utils.api_clients.AIClient") as MockClient:
+        MockClient.return_value.generate_text.return_value = "not json"
+        people = PortraitPreprocessor()._extract_with_ai("Alan Turing (1912-1954) built machines.")
+
+    assert [p["name"] for p in people] == ["Alan Turing"]
+
+def test_pattern_extractor_streams_candidates_in_text_order():
+    text = "Alan Turing's machine. Machine Learning, later. Ada Lovelace (1815-1852) wrote. Alan Turing (1912-1954)."
+
+    candidates = list(PATTERN_EXTRACTOR.iter_candidates(text))
+
+    assert candidates == [
+        ("Alan Turing", "machine", False),
+        ("Ada Lovelace", "Born 1815", True),
+        ("Alan Turing", "Born 1912", True),
+    ]
+
+def test_pattern_extractor_prefers_birth_year_context():
+    people = PATTERN_EXTRACTOR.extract("Alan Turing's machine. Alan Turing (1912-1954).")
+
+    assert people == [{"name": "Alan Turing", "context": "Born 1912"}]
+    assert isinstance(PatternNameExtractor.STOP_PHRASES, frozenset)
+
+class FakeImageClient:
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, prompt, resolution=(1024, 1024), **kwargs):
+        self.prompts.append(prompt)
+        return Image.new("RGB", (4, 4))
+
+def test_process_and_generate_generates_and_skips_existing(chapters, tmp_path):
+    client = FakeImageClient()
+    progress = []
+    out = tmp_path / "portraits"
+
+    result = PortraitPreprocessor().process_and_generate(
+        chapters, out, use_ai=False, client=client, on_progress=lambda person, r: progress.append(person)
+    )
+
+    assert result["generated"]
+    assert {r["status"] for r in result["portraits"].values()} == {"generated"}
+    assert sorted(progress) == sorted(result["portraits"])
+    assert (out / "AlanTuring_Painting.png").exists()
+    assert all(r["seconds"] >= 0 for r in result["portraits"].values())
+
+    again = PortraitPreprocessor().process_and_generate(chapters, out, use_ai=False, client=client)
+
+    assert {r["status"] for r in again["portraits"].values()} == {"exists"}
+    assert len(client.prompts) == 3
+
+def test_process_and_generate_reports_missing_client(chapters, tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+
+    result = PortraitPreprocessor().process_and_generate(chapters[0], tmp_path, use_ai=False)
+
+    assert not result["generated"]
+    assert {r["status"] for r in result["portraits"].values()} == {"failed"}
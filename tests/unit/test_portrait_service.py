@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+from PIL import Image
+from slides_to_textbook.modules.portrait_service import MANIFEST_NAME, PortraitService, portrait_filename
+
+class FakeClient:
+    def __init__(self, slow=(), fail=(), delay=0.0):
+        self.slow = set(slow)
+        self.fail = set(fail)
+        self.delay = delay
+        self.prompts = []
+        self.release = threading.Event()
+
+    def generate(self, prompt, resolution=(1024, 1024), **kwargs):
+        self.prompts.append(prompt)
+        if any(name in prompt for name in self.fail):
+            raise RuntimeError("quota exceeded")
+        if any(name in prompt for name in self.slow):
+            self.release.wait(5)
+        time.sleep(self.delay)
+        return Image.new("RGB", resolution, "gray")
+
+def test_portrait_filename():
+    assert portrait_filename("Arthur Samuel") == "ArthurSamuel_Painting.png"
+
+def test_generate_skips_existing_and_writes_new(tmp_path):
+    (tmp_path / "AlanTuring_Painting.png").write_bytes(b"existing")
+    client = FakeClient()
+    progress = []
+    service = PortraitService(tmp_path, client=client, max_workers=2, resolution=(30, 40))
+
+    results = service.generate(["Alan Turing", "Ada Lovelace"], on_progress=lambda p, r: progress.append(p))
+
+    assert results["Alan Turing"]["status"] == "exists"
+    assert results["Ada Lovelace"]["status"] == "generated"
+    assert Image.open(results["Ada Lovelace"]["path"]).size == (30, 40)
+    assert sorted(progress) == ["Ada Lovelace", "Alan Turing"]
+    assert len(client.prompts) == 1
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_failure_and_timeout_do_not_block_others(tmp_path):
+    client = FakeClient(slow=["Slow Person"], fail=["Broken Person"])
+    service = PortraitService(tmp_path, client=client, max_workers=3, timeout=0.5, retry_delay=0)
+
+    try:
+        results = service.generate(["Slow Person", "Broken Person", "Fine Person"])
+    finally:
+        client.release.set()
+
+    assert results["Fine Person"]["status"] == "generated"
+    assert results["Broken Person"]["status"] == "failed"
+    assert "quota" in results["Broken Person"]["error"]
+    assert results["Slow Person"]["status"] == "timeout"
+    assert results["Slow Person"]["path"] is None
+
+def test_transient_errors_are_retried(tmp_path):
+    class FlakyClient(FakeClient):
+        def generate(self, prompt, resolution=(1024, 1024), **kwargs):
+            if len(self.prompts) < 2:
+                self.prompts.append(prompt)
+                raise RuntimeError("503 unavailable")
+            return super().generate(prompt, resolution, **kwargs)
+
+    client = FlakyClient()
+    results = PortraitService(tmp_path, client=client, resolution=(8, 8), retry_delay=0).generate(["Grace Hopper"])
+
+    assert results["Grace Hopper"]["status"] == "generated"
+    assert len(client.prompts) == 3
+
+def test_gives_up_after_max_retries(tmp_path):
+    client = FakeClient(fail=["Broken Person"])
+    results = PortraitService(tmp_path, client=client, max_retries=1, retry_delay=0).generate(["Broken Person"])
+
+    assert results["Broken Person"]["status"] == "failed"
+    assert len(client.prompts) == 2
+
+def test_no_client_marks_failed(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    results = PortraitService(tmp_path).generate(["Someone"])
+    assert results["Someone"]["status"] == "failed"
+
+def test_manifest_records_portraits_and_resolves_variants(tmp_path):
+    client = FakeClient()
+    PortraitService(tmp_path, client=client).generate(["Yann LeCun"])
+
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())["portraits"]
+    assert manifest["yann-lecun/Painting"]["file"] == "YannLeCun_Painting.png"
+    assert manifest["yann-lecun/Painting"]["updated"].endswith("Z")
+    assert manifest["yann-lecun/Painting"]["status"] == "generated"
+
+    results = PortraitService(tmp_path, client=client).generate(["yann  lecun"])
+
+    assert results["yann  lecun"]["status"] == "exists"
+    assert results["yann  lecun"]["path"] == tmp_path / "YannLeCun_Painting.png"
+    assert len(client.prompts) == 1
@@ -0,0 +1,79 @@
+import os
+from slides_to_textbook.modules.portrait_store import PortraitStore, person_key
+from slides_to_textbook.modules.portrait_service import PortraitService
+from PIL import Image
+
+class FakeClient:
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, prompt, resolution=(1024, 1024), **kwargs):
+        self.prompts.append(prompt)
+        return Image.new("RGB", resolution, "gray")
+
+def test_person_key_normalizes():
+    assert person_key("Yann LeCun") == "yann-lecun"
+    assert person_key("  yann   lecun ") == "yann-lecun"
+    assert person_key("Yánn LeCun") == "yann-lecun"
+
+def test_put_get_and_metadata(tmp_path):
+    store = PortraitStore(tmp_path / "store")
+    assert store.get("Alan Turing") is None
+
+    store.put("Alan Turing", b"png-bytes", prompt="a portrait", dates="1912-1954")
+
+    assert store.get("alan turing").read_bytes() == b"png-bytes"
+    meta = store.metadata("Alan Turing")
+    assert meta["dates"] == "1912-1954"
+    assert meta["prompt"] == "a portrait"
+    assert len(store.entries()) == 1
+
+def test_link_into_uses_hardlink(tmp_path):
+    store = PortraitStore(tmp_path / "store")
+    store.put("Alan Turing", b"png-bytes")
+    dest = tmp_path / "Book" / "Portraits" / "Chapter-1" / "AlanTuring_Painting.png"
+
+    assert store.link_into("Alan Turing", dest) == dest
+    assert os.path.samefile(dest, store.get("Alan Turing"))
+    assert store.link_into("Nobody", tmp_path / "x.png") is None
+
+def test_service_generates_each_person_once_across_chapters(tmp_path):
+    store = PortraitStore(tmp_path / "store")
+    client = FakeClient()
+
+    first = PortraitService(tmp_path / "ch1", client=client, store=store, resolution=(10, 10))
+    second = PortraitService(tmp_path / "ch2", client=client, store=store, resolution=(10, 10))
+    r1 = first.generate(["Alan Turing"])
+    r2 = second.generate(["Alan Turing"])
+
+    assert r1["Alan Turing"]["status"] == "generated"
+    assert r2["Alan Turing"]["status"] == "linked"
+    assert len(client.prompts) == 1
+    assert "Alan Turing" in store.metadata("Alan Turing")["prompt"]
+
+def test_store_resolves_aliases_to_stored_person(tmp_path):
+    store = PortraitStore(tmp_path)
+    store.put("Yann LeCun", b"png")
+
+    assert store.get("Yann Le Cun") == store.get("YannLeCun") == tmp_path / "yann-lecun" / "Painting.png"
+    assert PortraitStore(tmp_path).get("yann  lecun") is not None
+
+def test_bare_surname_never_matches_stored_person(tmp_path):
+    store = PortraitStore(tmp_path / "store")
+    store.put("Geoffrey Hinton", b"geoffrey")
+    client = FakeClient()
+
+    # Another book's "Hinton" may be someone else: generated, not linked
+    results = PortraitService(tmp_path / "other-book", client=client, store=store, resolution=(4, 4)).generate(["Hinton"])
+
+    assert store.get("Hinton") != store.get("Geoffrey Hinton")
+    assert results["Hinton"]["status"] == "generated"
+    assert (tmp_path / "store" / "geoffrey-hinton" / "Painting.png").read_bytes() == b"geoffrey"
+    assert len(client.prompts) == 1
+
+def test_lock_is_keyed_on_registered_id(tmp_path):
+    store = PortraitStore(tmp_path)
+
+    # Both spellings of a person not yet in the store share one lock
+    assert store.lock_for("Yann LeCun") is PortraitStore(tmp_path).lock_for("Yann Le Cun")
+    assert store.lock_for("Yann LeCun") is not store.lock_for("LeCun")
@@ -0,0 +1,25 @@
+from slides_to_textbook.utils.prompt_budget import PromptAssembler, estimate_tokens
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+def test_no_budget_keeps_everything():
+    groups = {"concepts": ["A", "B"], "people": ["C"]}
+    assert PromptAssembler(None).select("anything", groups) == groups
+
+def test_budget_prefers_relevant_items_and_keeps_order():
+    groups = {
+        "concepts": ["Gradient descent optimisation", "Convolutional neural networks", "Decision trees"],
+        "people": ["Yann LeCun", "Leo Breiman"],
+    }
+    budget = estimate_tokens("Convolutional neural networks") + estimate_tokens("Decision trees")
+    selected = PromptAssembler(budget).select("Neural Network Architectures", groups)
+
+    assert "Convolutional neural networks" in selected["concepts"]
+    total = sum(estimate_tokens(i) for items in selected.values() for i in items)
+    assert total <= budget
+    # Original order is preserved within a group
+    concepts = groups["concepts"]
+    assert selected["concepts"] == [c for c in concepts if c in selected["concepts"]]
@@ -0,0 +1,36 @@
+from slides_to_textbook.modules.quality_validator import QualityValidator
+
+def test_chapter_compile_errors_are_reported(tmp_path, monkeypatch):
+    (tmp_path / "main.tex").write_text("\\documentclass{book}\\begin{document}\\end{document}")
+    results = {
+        "Chapter-A": {"success": True, "seconds": 0.1, "errors": []},
+        "Chapter-B": {"success": False, "seconds": 0.1,
+                      "errors": [{"message": "Missing $ inserted.", "file": "Chapter-B.tex", "line": 9}]},
+    }
+    monkeypatch.setattr(
+        "slides_to_textbook.modules.book_compiler.BookCompiler.compile_chapters",
+        lambda self, max_workers=None: results
+    )
+
+    report = QualityValidator(tmp_path, compile_chapters=True).validate()
+
+    assert report["status"] == "failed"
+    assert "Chapter-B does not compile line 9: Missing $ inserted." in report["errors"]
+    assert report["chapters"] == results
+
+def test_missing_engine_is_a_warning(tmp_path, monkeypatch):
+    (tmp_path / "main.tex").write_text("\\documentclass{book}\\begin{document}\\end{document}")
+    (tmp_path / "Chapter-A.tex").write_text("A")
+    monkeypatch.setattr("slides_to_textbook.modules.book_compiler.shutil.which", lambda tool: None)
+
+    report = QualityValidator(tmp_path, compile_chapters=True).validate()
+
+    assert any("Chapter compilation skipped" in w for w in report["warnings"])
+
+def test_unknown_citation_keys_fail_validation(tmp_path):
+    (tmp_path / "bibliography.bib").write_text("@book{Known2000,\n  title={T},\n}\n")
+    (tmp_path / "Chapter-A.tex").write_text("\\citep{Known2000} \\citep{Typo2000}")
+
+    report = QualityValidator(tmp_path).validate()
+
+    assert any("Unknown citation key 'Typo2000' in Chapter-A.tex line 1" in e for e in report["errors"])
@@ -0,0 +1,27 @@
+from slides_to_textbook.utils.text_matching import MultiPatternMatcher, lower_preserving_offsets
+
+def test_finds_overlapping_patterns():
+    matcher = MultiPatternMatcher(["he", "she", "his", "hers"])
+    matches = sorted(matcher.iter_matches("ushers"))
+    found = [(matcher.patterns[pid], start, end) for start, end, pid in matches]
+    assert ("she", 1, 4) in found
+    assert ("he", 2, 4) in found
+    assert ("hers", 2, 6) in found
+    assert all(p != "his" for p, _, _ in found)
+
+def test_first_matches_case_insensitive():
+    matcher = MultiPatternMatcher(["Yann LeCun", "LeCun"])
+    first = matcher.first_matches("Work by yann lecun; later LeCun again.")
+    assert first[0] == (8, 18)
+    assert first[1] == (13, 18)
+
+def test_case_sensitive():
+    matcher = MultiPatternMatcher(["Figures/a.png"], case_sensitive=True)
+    assert matcher.first_matches("figures/a.png") == {}
+    assert matcher.first_matches("x Figures/a.png") == {0: (2, 15)}
+
+def test_lower_preserving_offsets():
+    text = "İstanbul ABC"
+    lowered = lower_preserving_offsets(text)
+    assert len(lowered) == len(text)
+    assert lowered.endswith("abc")